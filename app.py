@@ -4,6 +4,7 @@ Analisis Pengaruh Faktor Lingkungan terhadap Tingkat Keselamatan Jalan di Inggri
 Berdasarkan Data UK Co-Benefits Atlas
 """
 from flask import Flask, render_template
+import click
 import sys
 import os
 from pathlib import Path
@@ -15,6 +16,7 @@ from config import Config
 from models.data_loader import DataLoader
 from controllers.main_controller import MainController
 from controllers.api_controller import APIController
+from controllers.metrics_controller import MetricsController
 
 def create_app(config_class=Config):
     """Application factory pattern untuk membuat Flask app"""
@@ -23,15 +25,39 @@ def create_app(config_class=Config):
     
     # Initialize data loader
     data_loader = DataLoader()
+    app.extensions['data_loader'] = data_loader
     
     # Initialize controllers
     main_controller = MainController(data_loader)
     api_controller = APIController(data_loader)
+    # Process pool query berat (None jika QUERY_POOL_WORKERS=0); dimulai oleh gunicorn.conf.py
+    app.extensions['query_pool'] = api_controller.query_pool
+    
+    # Instrumentasi request dan endpoint /metrics
+    if app.config.get('METRICS_ENABLED'):
+        app.register_blueprint(MetricsController(data_loader).bp)
     
     # Register routes
     app.register_blueprint(main_controller.bp)
     app.register_blueprint(api_controller.bp, url_prefix='/api')
     
+    # Setiap request memakai satu versi dataset walaupun reload terjadi di tengah request
+    app.before_request(data_loader.pin)
+    app.teardown_request(lambda exc: data_loader.unpin())
+    
+    if app.config.get('WARM_UP_ON_START'):
+        data_loader.warm_up()
+    
+    # Reload otomatis saat normalized_data.csv / GeoJSON berubah
+    if app.config.get('DATA_RELOAD_INTERVAL'):
+        data_loader.start_watcher(app.config['DATA_RELOAD_INTERVAL'])
+    
+    @app.cli.command('warm-up')
+    def warm_up_command():
+        """Bangun cache data dan geometri (mis. saat deploy)"""
+        for step, seconds in data_loader.warm_up().items():
+            click.echo(f'{step:<10} {seconds * 1000:10.1f} ms')
+    
     return app
 
 # Create app instance
@@ -0,0 +1,19 @@
+"""
+ASGI Entry Point
+Aplikasi Flask yang sama untuk server async (uvicorn, hypercorn)
+
+Butuh asgiref (opsional): pip install asgiref uvicorn
+Jalankan dengan: uvicorn asgi:app --workers 4
+"""
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app as flask_app
+
+# Handler Flask dijalankan di thread pool asgiref, sehingga event loop tidak
+# tertahan; query berat tetap dikirim ke process pool (QUERY_POOL_WORKERS)
+app = WsgiToAsgi(flask_app)
+
+# Setiap worker uvicorn meng-import modul ini sendiri: buat pool sebelum request pertama
+query_pool = flask_app.extensions.get('query_pool')
+if query_pool is not None:
+    query_pool.start()
@@ -0,0 +1,348 @@
+"""
+Benchmark
+Latency, throughput dan memori untuk method DataLoader dan endpoint /api/*
+
+Contoh:
+    python benchmark.py --output results.json
+    python benchmark.py --csv data/synthetic/normalized_data_la10_y1_bt1.csv --compare results.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+
+parser = argparse.ArgumentParser(description='Benchmark DataLoader dan endpoint API')
+parser.add_argument('--csv', type=Path, help='CSV data (default: Config.CSV_FILE), mis. hasil generate_synthetic_data.py')
+parser.add_argument('--geojson', type=Path, help='GeoJSON batas wilayah (default: Config.GEOJSON_FILE)')
+parser.add_argument('--backend', choices=['memory', 'sqlite'], help='Engine query (default: Config.QUERY_BACKEND)')
+parser.add_argument('--iterations', type=int, default=30, help='Jumlah pengukuran per kasus (default: 30)')
+parser.add_argument('--warmup', type=int, default=3, help='Pemanggilan awal yang tidak diukur (default: 3)')
+parser.add_argument('--max-time', type=float, default=10.0,
+                    help='Batas waktu warmup dan pengukuran per kasus dalam detik (default: 10)')
+parser.add_argument('--filter', help='Hanya jalankan kasus yang namanya mengandung teks ini')
+parser.add_argument('--response-cache', action='store_true',
+                    help='Aktifkan cache respons API (default: nonaktif agar yang diukur adalah komputasinya)')
+parser.add_argument('--output', type=Path, help='Simpan hasil ke file JSON')
+parser.add_argument('--compare', type=Path, help='Bandingkan dengan file JSON hasil run sebelumnya')
+args = parser.parse_args()
+
+if args.csv:
+    Config.CSV_FILE = args.csv.resolve()
+    Config.DATA_CACHE_DIR = Config.CSV_FILE.parent / '.cache'
+if args.geojson:
+    Config.GEOJSON_FILE = args.geojson.resolve()
+if args.backend:
+    Config.QUERY_BACKEND = args.backend
+if not args.response_cache:
+    Config.RESPONSE_CACHE_MAX_ENTRIES = 0
+    Config.TILE_CACHE_MAX_ENTRIES = 0
+
+from app import create_app
+from models.data_loader import DataLoader
+from models.data_cache import DataCache
+from models.data_cube import DataCube
+from models.tiles import tiles_for_bounds
+from models.spatial_index import SpatialIndex
+from models import validation
+from controllers.serialization import TYPED_ARRAYS_MIMETYPE
+
+
+def measure(fn):
+    """Ukur fn: persentil latency, throughput dan puncak alokasi memori"""
+    start = time.perf_counter()
+    for _ in range(args.warmup):
+        fn()
+        if time.perf_counter() - start > args.max_time:
+            break
+
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < args.iterations:
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+        if time.perf_counter() - start > args.max_time:
+            break
+    total = time.perf_counter() - start
+
+    # Diukur terpisah karena tracemalloc memperlambat eksekusi
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = np.array(samples) * 1000
+    p50, p90, p95, p99 = np.percentile(ms, [50, 90, 95, 99]).tolist()
+    return {
+        'iterations': len(samples),
+        'mean_ms': float(ms.mean()),
+        'min_ms': float(ms.min()),
+        'p50_ms': p50,
+        'p90_ms': p90,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'max_ms': float(ms.max()),
+        'throughput_per_s': len(samples) / total,
+        'peak_alloc_bytes': peak
+    }
+
+
+def request(client, url, accept=None, body=None):
+    """Fungsi benchmark untuk GET url (POST jika ada body JSON); status dan ukuran body ikut dicatat"""
+    info = {}
+    headers = {'Accept': accept} if accept else {}
+
+    def fn():
+        if body is None:
+            response = client.get(url, headers=headers)
+        else:
+            response = client.post(url, headers=headers, json=body)
+        info['status'] = response.status_code
+        info['response_bytes'] = len(response.get_data())
+    return fn, info
+
+
+def loader_cases(data_loader, sample):
+    """Kasus benchmark untuk setiap method publik DataLoader"""
+    year, benefit_type, la = sample['year'], sample['benefit_type'], sample['local_authority']
+    years = data_loader.get_years()
+    cases = {
+        'load.csv_parse': lambda: DataLoader()._parse_index(),
+        'load.cube': lambda: DataCube(data_loader.index),
+        'get_local_authorities': data_loader.get_local_authorities,
+        'get_nations': data_loader.get_nations,
+        'get_years': data_loader.get_years,
+        'get_benefit_types': data_loader.get_benefit_types,
+        'get_data_for_map': lambda: data_loader.get_data_for_map(year, benefit_type),
+        'get_data_for_chart': lambda: data_loader.get_data_for_chart(la),
+        'get_data_for_chart[2 types]': lambda: data_loader.get_data_for_chart(la, data_loader.get_benefit_types()[:2]),
+        'get_correlation_data[all years]': lambda: data_loader.get_correlation_data(),
+        'get_correlation_data[year]': lambda: data_loader.get_correlation_data(year),
+        'get_correlation_data[spearman]': lambda: data_loader.get_correlation_data(None, 'spearman'),
+        'get_correlation_data[by nation]': lambda: data_loader.get_correlation_data(None, group_by='nation'),
+        'load.correlation': lambda: data_loader._load_correlation(),
+        'get_aggregated_data[nation]': lambda: data_loader.get_aggregated_data('nation'),
+        'get_aggregated_data[local_authority]': lambda: data_loader.get_aggregated_data('local_authority'),
+        'get_summary_statistics': data_loader.get_summary_statistics,
+        'get_summary_statistics[year]': lambda: data_loader.get_summary_statistics(year),
+        'get_class_breaks[jenks]': lambda: data_loader.get_class_breaks(benefit_type, year, 'jenks'),
+        'load.summary_stats': lambda: data_loader._load_summary_stats(),
+        'get_trend_data': lambda: data_loader.get_trend_data(la),
+        'get_heatmap_data[all years]': lambda: data_loader.get_heatmap_data(benefit_type),
+        'get_heatmap_data[10 years]': lambda: data_loader.get_heatmap_data(benefit_type, years[0], years[min(9, len(years) - 1)]),
+        'get_top_areas': lambda: data_loader.get_top_areas(benefit_type, year),
+        'get_rankings': lambda: data_loader.get_rankings(benefit_type, year),
+        'get_rankings[n=10]': lambda: data_loader.get_rankings(benefit_type, year, 10),
+        'get_rank_trajectory': lambda: data_loader.get_rank_trajectory(la, benefit_type),
+        'get_comparison': lambda: data_loader.get_comparison(years[0], years[-1]),
+        'get_comparison[columnar]': lambda: data_loader.get_comparison(years[0], years[-1], columnar=True),
+        'validation.check_index': lambda: validation.check_index(
+            data_loader.index, validation.ValidationReport(),
+            Config.VALIDATION_VALUE_RANGES, Config.VALIDATION_OUTLIER_IQR
+        ),
+    }
+    if Config.DATA_CACHE_ENABLED:
+        cases['load.binary_cache'] = lambda: DataCache(Config.DATA_CACHE_DIR).load(Config.CSV_FILE)
+    if Path(Config.GEOJSON_FILE).exists():
+        z = 7
+        x, y = tiles_for_bounds(data_loader.tile_index.bounds, z)[0]
+        cases['get_geojson_blob'] = data_loader.get_geojson_blob
+        cases['get_tile'] = lambda: data_loader.get_tile(z, x, y, year, benefit_type)
+        sample['tile'] = (z, x, y)
+        
+        lon_min, lat_min, lon_max, lat_max = data_loader.tile_index.bounds
+        lon, lat = (lon_min + lon_max) / 2, (lat_min + lat_max) / 2
+        bbox = (lon - 0.5, lat - 0.5, lon + 0.5, lat + 0.5)
+        cases['load.spatial_index'] = lambda: SpatialIndex(data_loader.topology, Config.MATCHING_PROPERTY)
+        cases['locate'] = lambda: data_loader.locate(lat, lon)
+        cases['get_areas_in_bbox'] = lambda: data_loader.get_areas_in_bbox(bbox)
+        cases['get_data_for_map[bbox]'] = lambda: data_loader.get_data_for_map(year, benefit_type, bbox=bbox)
+        sample['point'], sample['bbox'] = (lat, lon), ','.join(f'{value:g}' for value in bbox)
+    return cases
+
+
+def api_urls(sample):
+    """URL benchmark per endpoint Flask (string, tuple (url, header Accept), atau dict {url, json} untuk POST)"""
+    year, benefit_type, la = sample['year'], sample['benefit_type'], sample['local_authority']
+    urls = {
+        'main.index': ['/'],
+        'main.health': ['/health'],
+        'api.metadata': ['/api/metadata'],
+        'metrics.metrics': ['/metrics'],
+        'api.map_data': [f'/api/map-data?year={year}&benefit_type={benefit_type}'],
+        'api.chart_data': [f'/api/chart-data?local_authority={la}'],
+        'api.correlation': ['/api/correlation', f'/api/correlation?year={year}',
+                            '/api/correlation?method=spearman', '/api/correlation?group_by=nation'],
+        'api.trend_data': [f'/api/trend-data?local_authority={la}'],
+        'api.heatmap_data': [f'/api/heatmap-data?benefit_type={benefit_type}',
+                             f'/api/heatmap-data?benefit_type={benefit_type}&format=columnar',
+                             (f'/api/heatmap-data?benefit_type={benefit_type}', TYPED_ARRAYS_MIMETYPE)],
+        'api.summary_stats': ['/api/summary-stats', f'/api/summary-stats?year={year}'],
+        'api.class_breaks': [f'/api/class-breaks?benefit_type={benefit_type}&year={year}',
+                             f'/api/class-breaks?benefit_type={benefit_type}&year={year}&method=jenks'],
+        'api.top_areas': [f'/api/top-areas?benefit_type={benefit_type}&year={year}'],
+        'api.rankings': [f'/api/rankings?benefit_type={benefit_type}&year={year}',
+                         f'/api/rankings?benefit_type={benefit_type}&year={year}&n=10&format=columnar'],
+        'api.rank_trajectory': [f'/api/rank-trajectory?local_authority={la}&benefit_type={benefit_type}'],
+        'api.comparison': ['/api/comparison', f'/api/comparison?benefit_type={benefit_type}&sort=pct_change&format=columnar'],
+        'api.aggregated_data': ['/api/aggregated-data?group_by=nation',
+                                '/api/aggregated-data?group_by=local_authority',
+                                '/api/aggregated-data?group_by=local_authority&format=columnar',
+                                ('/api/aggregated-data?group_by=local_authority', TYPED_ARRAYS_MIMETYPE),
+                                '/api/aggregated-data?group_by=local_authority&limit=1000',
+                                '/api/aggregated-data?group_by=local_authority&format=ndjson',
+                                '/api/aggregated-data?group_by=local_authority&format=csv'],
+        'api.export': ['/api/export', f'/api/export?benefit_type={benefit_type}&format=ndjson'],
+        'api.batch': [{'url': '/api/batch', 'json': {'queries': [
+            {'id': 'map', 'endpoint': 'map-data', 'params': {'year': year, 'benefit_type': benefit_type, 'format': 'columnar'}},
+            {'id': 'breaks', 'endpoint': 'class-breaks', 'params': {'year': year, 'benefit_type': benefit_type, 'method': 'jenks'}},
+            {'id': 'top', 'endpoint': 'top-areas', 'params': {'year': year, 'benefit_type': benefit_type, 'order': 'desc'}},
+            {'id': 'bottom', 'endpoint': 'top-areas', 'params': {'year': year, 'benefit_type': benefit_type, 'order': 'asc'}},
+            {'id': 'heatmap', 'endpoint': 'heatmap-data', 'params': {'benefit_type': benefit_type, 'format': 'columnar'}},
+            {'id': 'correlation', 'endpoint': 'correlation', 'params': {'year': year}},
+            {'id': 'chart', 'endpoint': 'chart-data', 'params': {'local_authority': la, 'format': 'columnar'}}
+        ]}}],
+    }
+    if Path(Config.GEOJSON_FILE).exists():
+        z, x, y = sample['tile']
+        urls['api.geojson'] = ['/api/geojson', '/api/geojson?level=low']
+        urls['api.tiles'] = [f'/api/tiles/{z}/{x}/{y}?year={year}&benefit_type={benefit_type}']
+        lat, lon = sample['point']
+        urls['api.locate'] = [f'/api/locate?lat={lat:g}&lon={lon:g}']
+        urls['api.areas_in_bbox'] = [f'/api/areas-in-bbox?bbox={sample["bbox"]}']
+        urls['api.map_data'].append(f'/api/map-data?year={year}&benefit_type={benefit_type}&bbox={sample["bbox"]}')
+    return urls
+
+
+def selected(name):
+    return not args.filter or args.filter in name
+
+
+def print_row(name, result, previous=None):
+    change = ''
+    if previous:
+        change = f"{result['p50_ms'] / previous['p50_ms']:7.2f}x" if previous.get('p50_ms') else ''
+    print(f"  {name:<56} {result['p50_ms']:9.2f} {result['p99_ms']:9.2f} "
+          f"{result['throughput_per_s']:9.1f} {result['peak_alloc_bytes'] / 1e6:8.2f} {change}")
+
+
+app = create_app()
+client = app.test_client()
+data_loader = app.extensions['data_loader']
+
+start = time.perf_counter()
+index = data_loader.index
+load_seconds = time.perf_counter() - start
+
+sample = {
+    'year': Config.DEFAULT_YEAR if Config.DEFAULT_YEAR in index.years else index.years[0],
+    'benefit_type': index.benefit_types[0],
+    'local_authority': index.local_authorities[0],
+}
+
+previous = {}
+if args.compare:
+    with open(args.compare, 'r', encoding='utf-8') as f:
+        previous = json.load(f)['results']
+
+print("=" * 60)
+print("BENCHMARK DATALOADER DAN API")
+print("=" * 60)
+print(f"\nData: {Config.CSV_FILE}")
+print(f"  {len(index):,} baris, {len(index.local_authorities):,} LA, "
+      f"{len(index.years)} tahun, {len(index.benefit_types)} benefit type")
+print(f"  Load index: {load_seconds * 1000:.1f} ms")
+print(f"  Engine query: {Config.QUERY_BACKEND}")
+print(f"  Cache respons API: {'aktif' if args.response_cache else 'nonaktif'}")
+print(f"\n  {'kasus':<56} {'p50 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'peak MB':>8}")
+
+results = {}
+cases = loader_cases(data_loader, sample)
+print("\n[DataLoader]")
+for name, fn in cases.items():
+    if selected(name):
+        results[name] = measure(fn)
+        print_row(name, results[name], previous.get(name))
+
+missing = sorted(
+    name for name in dir(DataLoader)
+    if name.startswith('get_') and not any(case.split('[')[0] == name for case in cases)
+)
+
+print("\n[API]")
+urls = api_urls(sample)
+for endpoint, endpoint_urls in urls.items():
+    for url in endpoint_urls:
+        body = None
+        if isinstance(url, dict):
+            url, body = url['url'], url['json']
+        url, accept = url if isinstance(url, tuple) else (url, None)
+        name = f'{"GET" if body is None else "POST"} {url}' + (f' [{accept}]' if accept else '')
+        if body is not None:
+            name += f' [{len(body["queries"])} queries]'
+        if not selected(name):
+            continue
+        fn, info = request(client, url, accept, body)
+        results[name] = {**measure(fn), **info}
+        print_row(name, results[name], previous.get(name))
+        if info['status'] != 200:
+            print(f"    ! status {info['status']}")
+
+missing += sorted(
+    rule.rule for rule in app.url_map.iter_rules()
+    if rule.endpoint != 'static' and rule.endpoint not in urls
+)
+if missing:
+    print(f"\n! Tidak di-benchmark: {', '.join(missing)}")
+
+peak_rss = None
+if resource is not None:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss *= 1 if sys.platform == 'darwin' else 1024
+    print(f"\nPeak RSS proses: {peak_rss / 1e6:.1f} MB")
+
+if args.output:
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'csv': str(Config.CSV_FILE),
+            'rows': len(index),
+            'local_authorities': len(index.local_authorities),
+            'years': len(index.years),
+            'benefit_types': len(index.benefit_types),
+            'load_index_ms': load_seconds * 1000,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'response_cache': args.response_cache,
+            'query_backend': Config.QUERY_BACKEND,
+            'peak_rss_bytes': peak_rss
+        },
+        'results': results
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Hasil disimpan di: {args.output}")
+
+print("=" * 60)
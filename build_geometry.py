@@ -0,0 +1,29 @@
+"""
+Build Simplified Geometry
+Membuat file batas wilayah tersimpel (GeoJSON/TopoJSON) untuk /api/geojson?level=...
+"""
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from models.data_loader import DataLoader
+from models.geometry import level_path
+
+print("=" * 60)
+print("BUILD GEOMETRI TERSIMPEL")
+print("=" * 60)
+
+source = Path(Config.GEOJSON_FILE)
+print(f"\nSumber: {source.name} ({source.stat().st_size / 1024:.0f} KB)")
+
+outputs = DataLoader().build_geometry_levels()
+
+for (level, fmt), body in sorted(outputs.items()):
+    path = level_path(source, level, fmt)
+    status = '✓' if path.exists() else '✗ (gagal ditulis)'
+    print(f"  {status} {path.name}: {len(body) / 1024:.0f} KB")
+
+print("\n" + "=" * 60)
@@ -0,0 +1,50 @@
+"""
+Build Tiles
+Pre-render tile GeoJSON /api/tiles/<z>/<x>/<y> ke Config.TILE_DIR
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from models.data_loader import DataLoader
+from models.geojson_blob import write_atomic
+from models.tiles import tiles_for_bounds
+
+parser = argparse.ArgumentParser(description='Pre-render tile GeoJSON untuk /api/tiles')
+parser.add_argument('--min-zoom', type=int, default=5)
+parser.add_argument('--max-zoom', type=int, default=8)
+parser.add_argument('--year', type=int, action='append', help='Tahun (default: Config.DEFAULT_YEAR)')
+parser.add_argument('--benefit-type', action='append', help='Faktor (default: semua)')
+args = parser.parse_args()
+
+data_loader = DataLoader()
+years = args.year or [Config.DEFAULT_YEAR]
+benefit_types = args.benefit_type or data_loader.get_benefit_types()
+bounds = data_loader.tile_index.bounds
+
+print("=" * 60)
+print(f"PRE-RENDER TILE (versi dataset {data_loader.version})")
+print("=" * 60)
+
+for z in range(args.min_zoom, args.max_zoom + 1):
+    coords = tiles_for_bounds(bounds, z)
+    written = 0
+    for benefit_type in benefit_types:
+        for year in years:
+            for x, y in coords:
+                tile = data_loader.get_tile(z, x, y, year, benefit_type)
+                if not tile['features']:
+                    continue
+                path = data_loader.tile_path(z, x, y, year, benefit_type)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                body = json.dumps(tile, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+                written += write_atomic(path, body)
+    print(f"  ✓ Zoom {z}: {written} tile")
+
+print(f"\nTile disimpan di: {Config.TILE_DIR / data_loader.version}")
+print("=" * 60)
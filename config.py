@@ -2,6 +2,7 @@
 Configuration Module
 Konfigurasi aplikasi dan path data
 """
+import os
 from pathlib import Path
 
 # Base directory
@@ -19,6 +20,100 @@ class Config:
     CSV_FILE = DATA_DIR / 'normalized_data.csv'
     GEOJSON_FILE = DATA_DIR / 'lad_boundaries.geojson'
     
+    # Muat semua data saat create_app (dipakai gunicorn.conf.py untuk --preload)
+    WARM_UP_ON_START = os.environ.get('WARM_UP_ON_START', '').lower() in ('1', 'true', 'yes')
+    
+    # Interval (detik) pemeriksaan perubahan CSV/GeoJSON untuk reload otomatis; 0 = nonaktif
+    DATA_RELOAD_INTERVAL = float(os.environ.get('DATA_RELOAD_INTERVAL', '30'))
+    
+    # Validasi setiap kali CSV di-parse (load pertama atau reload): 'off', 'warn' (temuan
+    # dicatat di log dan laporan JSON) atau 'strict' (error validasi menggagalkan load;
+    # reload tetap memakai versi lama). CLI: python validate_data.py
+    DATA_VALIDATION = os.environ.get('DATA_VALIDATION', 'warn')
+    VALIDATION_REPORT_FILE = DATA_DIR / 'validation_report.json'
+    # Batas value_total per benefit type, mis. {'noise': (0, None)}; None = tanpa batas
+    VALIDATION_VALUE_RANGES = {}
+    # Nilai lebih dari VALIDATION_OUTLIER_IQR x IQR di luar kuartil benefit type-nya = outlier
+    VALIDATION_OUTLIER_IQR = 20
+    
+    # Engine query untuk map, heatmap, top-areas, rankings dan aggregated-data:
+    # 'memory' (index dan cube NumPy per proses) atau 'sqlite' (file database
+    # read-only di DATA_CACHE_DIR yang dibagi semua worker). Chart, trend,
+    # korelasi, statistik, comparison dan export tetap memuat index dan cube
+    # di memori saat pertama dipakai, dengan engine mana pun
+    QUERY_BACKEND = os.environ.get('QUERY_BACKEND', 'memory')
+    
+    # Binary cache hasil parsing CSV (dibangun ulang otomatis jika CSV berubah)
+    DATA_CACHE_ENABLED = True
+    DATA_CACHE_DIR = DATA_DIR / '.cache'
+    
+    # GeoJSON pre-compressed: tulis lad_boundaries.geojson.gz/.br di samping file sumber
+    GEOJSON_PRECOMPRESS_TO_DISK = True
+    GEOJSON_MAX_AGE = 365 * 24 * 3600  # Untuk URL yang memakai ?v=<versi dataset>
+    
+    # Level simplifikasi batas wilayah untuk /api/geojson?level=... (toleransi dalam derajat).
+    # min_zoom dipakai map.js untuk memilih level sesuai zoom peta.
+    GEOMETRY_LEVELS = {
+        'low': {'tolerance': 0.01, 'min_zoom': 0},
+        'medium': {'tolerance': 0.002, 'min_zoom': 8},
+        'high': {'tolerance': 0.0005, 'min_zoom': 10}
+    }
+    GEOMETRY_QUANTIZATION = 100000
+    
+    # Tile GeoJSON /api/tiles/<z>/<x>/<y> (dibuat lazily, opsional pre-render ke TILE_DIR)
+    TILE_MAX_ZOOM = 14
+    TILE_DIR = DATA_DIR / 'tiles'
+    TILE_CLIP_CACHE_SIZE = 2048
+    TILE_CACHE_MAX_ENTRIES = 4096
+    TILE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+    
+    # R-tree batas wilayah untuk /api/locate, /api/areas-in-bbox dan map-data?bbox=
+    SPATIAL_INDEX_NODE_CAPACITY = 16
+    # Mulai zoom ini map.js hanya meminta nilai local authority yang terlihat (map-data?bbox=)
+    MAP_VIEWPORT_MIN_ZOOM = 9
+    
+    # Response cache untuk blueprint /api (LRU in-process)
+    RESPONSE_CACHE_MAX_ENTRIES = 512
+    RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    
+    # Streaming (format=ndjson|csv, /api/export): jumlah baris per potongan respons
+    STREAM_CHUNK_ROWS = 10000
+    
+    # Paginasi /api/aggregated-data (limit/cursor): ukuran halaman default dan maksimum
+    PAGE_DEFAULT_LIMIT = 1000
+    PAGE_MAX_LIMIT = 50000
+    
+    # Jumlah sub-query maksimum per request /api/batch
+    BATCH_MAX_QUERIES = 20
+    
+    # Process pool untuk query berat (0 = nonaktif, query dijalankan di thread request).
+    # Endpoint yang terdaftar di QUERY_POOL_TIMEOUTS dijalankan di pool dengan batas
+    # waktu (detik, 504 jika lewat); di atas QUERY_POOL_MAX_QUEUE task (berjalan +
+    # menunggu) per proses web, request ditolak 503 dengan Retry-After.
+    QUERY_POOL_WORKERS = int(os.environ.get('QUERY_POOL_WORKERS', '0'))
+    QUERY_POOL_TIMEOUTS = {
+        'correlation': 10,
+        'heatmap-data': 10,
+        'aggregated-data': 20
+    }
+    QUERY_POOL_MAX_QUEUE = 16
+    QUERY_POOL_RETRY_AFTER = 2
+    # None = fork jika tersedia (worker berbagi dataset proses induk), selain itu spawn
+    QUERY_POOL_START_METHOD = os.environ.get('QUERY_POOL_START_METHOD') or None
+    
+    # Jumlah kelas warna choropleth untuk /api/class-breaks (= warna per skema factorColorSchemes di map.js)
+    CLASS_BREAKS_COUNT = 10
+    
+    # Metrik Prometheus di /metrics (per proses/worker)
+    METRICS_ENABLED = True
+    
+    # Profiling cProfile untuk request lambat (opt-in): sebagian request diprofil,
+    # yang lebih lama dari PROFILE_MIN_DURATION (detik) ditulis ke PROFILE_DIR
+    PROFILE_SLOW_REQUESTS = os.environ.get('PROFILE_SLOW_REQUESTS', '').lower() in ('1', 'true', 'yes')
+    PROFILE_SAMPLE_RATE = 0.1
+    PROFILE_MIN_DURATION = 0.5
+    PROFILE_DIR = BASE_DIR / 'profiles'
+    
     # Data columns
     LA_COLUMN = 'local_authority'
     YEAR_COLUMN = 'year'
@@ -2,8 +2,30 @@
 API Controller
 Menangani API endpoints untuk data visualization
 """
-from flask import Blueprint, jsonify, request
-import pandas as pd
+import base64
+import time
+from concurrent.futures.process import BrokenProcessPool
+from functools import wraps
+from flask import Blueprint, Response, current_app, jsonify, make_response, request
+from werkzeug.http import is_resource_modified
+from config import Config
+from controllers.response_cache import ResponseCache
+from controllers.query_pool import QueryPool, QueryPoolBusy, QueryTimeout, StaleDataset
+from controllers import serialization
+
+# Format streaming (generator potongan baris langsung ke respons)
+STREAM_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+EXPORT_COLUMNS = ['local_authority', 'nation', 'year', 'co_benefit_type', 'value_total']
+
+# Endpoint yang boleh dipanggil sebagai sub-query /api/batch (respons JSON, bukan stream)
+BATCH_ENDPOINTS = (
+    'metadata', 'map-data', 'chart-data', 'correlation', 'trend-data', 'heatmap-data',
+    'summary-stats', 'class-breaks', 'top-areas', 'rankings', 'rank-trajectory', 'aggregated-data',
+    'locate', 'areas-in-bbox', 'comparison'
+)
 
 
 class APIController:
@@ -12,49 +34,315 @@ class APIController:
     def __init__(self, data_loader):
         """Initialize controller dengan data loader"""
         self.data_loader = data_loader
+        self.metrics = data_loader.metrics
+        self.response_cache = ResponseCache(
+            Config.RESPONSE_CACHE_MAX_ENTRIES,
+            Config.RESPONSE_CACHE_MAX_BYTES
+        )
+        self.tile_cache = ResponseCache(
+            Config.TILE_CACHE_MAX_ENTRIES,
+            Config.TILE_CACHE_MAX_BYTES
+        )
+        # Process pool untuk endpoint berat (Config.QUERY_POOL_TIMEOUTS), dibuat saat dipakai
+        self.query_pool = None
+        if Config.QUERY_POOL_WORKERS > 0:
+            self.query_pool = QueryPool(
+                data_loader,
+                Config.QUERY_POOL_WORKERS,
+                Config.QUERY_POOL_MAX_QUEUE,
+                Config.QUERY_POOL_RETRY_AFTER,
+                Config.QUERY_POOL_START_METHOD
+            )
         self.bp = Blueprint('api', __name__)
         self._register_routes()
+        
+        # Entry versi dataset lama tidak akan dipakai lagi setelah reload
+        data_loader.add_reload_listener(lambda version: self._clear_caches())
     
     def _register_routes(self):
         """Register all API routes"""
+        self.bp.add_url_rule('/metadata', 'metadata', self._cached(self.get_metadata), methods=['GET'])
         self.bp.add_url_rule('/geojson', 'geojson', self.get_geojson, methods=['GET'])
-        self.bp.add_url_rule('/map-data', 'map_data', self.get_map_data, methods=['GET'])
-        self.bp.add_url_rule('/chart-data', 'chart_data', self.get_chart_data, methods=['GET'])
-        self.bp.add_url_rule('/correlation', 'correlation', self.get_correlation, methods=['GET'])
-        self.bp.add_url_rule('/trend-data', 'trend_data', self.get_trend_data, methods=['GET'])
-        self.bp.add_url_rule('/heatmap-data', 'heatmap_data', self.get_heatmap_data, methods=['GET'])
-        self.bp.add_url_rule('/summary-stats', 'summary_stats', self.get_summary_stats, methods=['GET'])
-        self.bp.add_url_rule('/top-areas', 'top_areas', self.get_top_areas, methods=['GET'])
-        self.bp.add_url_rule('/aggregated-data', 'aggregated_data', self.get_aggregated_data, methods=['GET'])
+        self.bp.add_url_rule('/map-data', 'map_data', self._cached(self.get_map_data), methods=['GET'])
+        self.bp.add_url_rule('/chart-data', 'chart_data', self._cached(self.get_chart_data), methods=['GET'])
+        self.bp.add_url_rule('/correlation', 'correlation', self._cached(self.get_correlation), methods=['GET'])
+        self.bp.add_url_rule('/trend-data', 'trend_data', self._cached(self.get_trend_data), methods=['GET'])
+        self.bp.add_url_rule('/heatmap-data', 'heatmap_data', self._cached(self.get_heatmap_data), methods=['GET'])
+        self.bp.add_url_rule('/summary-stats', 'summary_stats', self._cached(self.get_summary_stats), methods=['GET'])
+        self.bp.add_url_rule('/class-breaks', 'class_breaks', self._cached(self.get_class_breaks), methods=['GET'])
+        self.bp.add_url_rule('/top-areas', 'top_areas', self._cached(self.get_top_areas), methods=['GET'])
+        self.bp.add_url_rule('/rankings', 'rankings', self._cached(self.get_rankings), methods=['GET'])
+        self.bp.add_url_rule('/rank-trajectory', 'rank_trajectory', self._cached(self.get_rank_trajectory), methods=['GET'])
+        self.bp.add_url_rule('/comparison', 'comparison', self._cached(self.get_comparison), methods=['GET'])
+        self.bp.add_url_rule('/locate', 'locate', self.get_locate, methods=['GET'])
+        self.bp.add_url_rule('/areas-in-bbox', 'areas_in_bbox', self.get_areas_in_bbox, methods=['GET'])
+        self.bp.add_url_rule('/aggregated-data', 'aggregated_data', self._cached(self.get_aggregated_data), methods=['GET'])
+        self.bp.add_url_rule('/export', 'export', self.get_export, methods=['GET'])
+        self.bp.add_url_rule('/batch', 'batch', self.post_batch, methods=['POST'])
+        self.bp.add_url_rule('/tiles/<int:z>/<int:x>/<int:y>', 'tiles',
+                             self._cached(self.get_tile, self.tile_cache), methods=['GET'])
+    
+    def _cached(self, view, cache=None):
+        """Bungkus handler dengan response cache, ETag dan dukungan 304"""
+        cache = cache or self.response_cache
+        
+        @wraps(view)
+        def cached_view(*args, **kwargs):
+            try:
+                version = self.data_loader.version
+                last_modified = self.data_loader.last_modified
+            except ValueError:
+                # Data gagal dimuat: biarkan handler mengembalikan error seperti biasa
+                return view(*args, **kwargs)
+            
+            # Representasi (JSON atau typed array) dipilih lewat Accept, jadi ikut menjadi key
+            key = ResponseCache.make_key(request.endpoint, request.args) + (
+                tuple(sorted(kwargs.items())), self._wants_typed_arrays()
+            )
+            etag = ResponseCache.make_etag(version, key)
+            
+            # 304 hanya untuk respons sukses: tanpa entry cache handler dijalankan
+            # dulu, sehingga parameter tidak valid tetap mendapat 400
+            entry = cache.get((version,) + key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                # Hanya respons sukses yang di-cache dan diberi ETag
+                if response.status_code != 200 or response.is_streamed:
+                    self.metrics.inc('api_response_cache_total', result='miss')
+                    return response
+                cache.set((version,) + key, response.get_data(), response.mimetype)
+            
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                self.metrics.inc('api_response_cache_total', result='not_modified')
+                response = Response(status=304)
+            elif entry is None:
+                self.metrics.inc('api_response_cache_total', result='miss')
+            else:
+                self.metrics.inc('api_response_cache_total', result='hit')
+                response = Response(entry[0], mimetype=entry[1])
+            
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            response.vary.add('Accept')
+            return response
+        return cached_view
+    
+    def _clear_caches(self):
+        """Kosongkan response cache dan tile cache"""
+        self.response_cache.clear()
+        self.tile_cache.clear()
+    
+    def _respond(self, payload, columnar=False):
+        """Serialisasi respons sukses dengan pencatatan durasinya per endpoint
+        
+        Payload columnar (berisi array NumPy) diserialisasi langsung ke bytes
+        JSON ringkas tanpa membuat objek Python per nilai, atau ke format biner
+        typed array jika diminta lewat header Accept.
+        """
+        start = time.perf_counter()
+        if columnar and self._wants_typed_arrays():
+            response = Response(serialization.dumps_typed_arrays(payload),
+                                mimetype=serialization.TYPED_ARRAYS_MIMETYPE)
+        elif columnar:
+            response = Response(serialization.dumps(payload), mimetype='application/json')
+        else:
+            response = jsonify(payload)
+        self.metrics.observe('api_serialize_duration_seconds', time.perf_counter() - start,
+                             endpoint=request.endpoint)
+        return response
+    
+    def _columnar(self):
+        """True jika request meminta format=columnar ({columns, data}) atau typed array"""
+        fmt = request.args.get('format', 'records')
+        if fmt not in ('records', 'columnar'):
+            raise ValueError(f"Unknown format: {fmt}")
+        return fmt == 'columnar' or self._wants_typed_arrays()
+    
+    def _bbox(self):
+        """Parameter bbox=lon_min,lat_min,lon_max,lat_max (format toBBoxString Leaflet), atau None"""
+        value = request.args.get('bbox')
+        if not value:
+            return None
+        try:
+            bbox = tuple(float(part) for part in value.split(','))
+        except ValueError:
+            bbox = ()
+        if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+            raise ValueError(f"Invalid bbox: {value}")
+        return bbox
+    
+    def _stream(self, chunks, fmt, columns, filename=None):
+        """Respons streaming NDJSON/CSV dari iterator potongan kolom (tidak di-cache)"""
+        if fmt == 'csv':
+            body = serialization.iter_csv(chunks, columns)
+        else:
+            body = serialization.iter_ndjson(chunks)
+        response = Response(body, mimetype=STREAM_MIMETYPES[fmt])
+        if filename:
+            response.headers.set('Content-Disposition', 'attachment', filename=f'{filename}.{fmt}')
+        return response
+    
+    def _page(self, scope):
+        """(offset, limit) dari parameter cursor dan limit
+        
+        Cursor berisi versi dataset dan scope (mis. group_by) sehingga cursor
+        dari versi data lama atau query lain ditolak, bukan menghasilkan
+        halaman yang bergeser.
+        """
+        limit = int(request.args.get('limit', Config.PAGE_DEFAULT_LIMIT))
+        if not 1 <= limit <= Config.PAGE_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {Config.PAGE_MAX_LIMIT}")
+        
+        cursor = request.args.get('cursor')
+        if not cursor:
+            return 0, limit
+        try:
+            decoded = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+            version, rest = decoded.split(':', 1)
+            cursor_scope, offset = rest.rsplit(':', 1)
+            offset = int(offset)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        if version != self.data_loader.version or cursor_scope != scope or offset < 0:
+            raise ValueError("Cursor is stale or belongs to another query; restart without cursor")
+        return offset, limit
+    
+    def _cursor(self, scope, offset):
+        """Cursor opaque untuk halaman yang dimulai di offset"""
+        raw = f'{self.data_loader.version}:{scope}:{offset}'.encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def _wants_typed_arrays():
+        """True jika header Accept lebih memilih format biner typed array daripada JSON"""
+        best = request.accept_mimetypes.best_match(['application/json', serialization.TYPED_ARRAYS_MIMETYPE])
+        return best == serialization.TYPED_ARRAYS_MIMETYPE
+    
+    def _query(self, endpoint, method, *args, **kwargs):
+        """Hasil data_loader.<method>(*args, **kwargs), di process pool jika endpoint terdaftar
+        
+        Worker menghitung dengan versi dataset yang di-pin request ini. Jika
+        worker tidak bisa memuat versi tersebut (reload di tengah request) atau
+        pool rusak, query dijalankan langsung di thread request.
+        """
+        timeout = Config.QUERY_POOL_TIMEOUTS.get(endpoint)
+        if self.query_pool is None or timeout is None:
+            return getattr(self.data_loader, method)(*args, **kwargs)
+        
+        start = time.perf_counter()
+        result = 'error'
+        try:
+            data = self.query_pool.run(method, args, kwargs, self.data_loader.version, timeout)
+            result = 'ok'
+            return data
+        except (StaleDataset, BrokenProcessPool):
+            result = 'fallback'
+            return getattr(self.data_loader, method)(*args, **kwargs)
+        except QueryPoolBusy:
+            result = 'busy'
+            raise
+        except QueryTimeout:
+            result = 'timeout'
+            raise
+        finally:
+            self.metrics.inc('query_pool_tasks_total', endpoint=endpoint, result=result)
+            self.metrics.observe('query_pool_duration_seconds', time.perf_counter() - start, endpoint=endpoint)
+    
+    def _error(self, error):
+        """Respons error untuk exception di handler; dicatat di log dan metrik
+        
+        400 untuk parameter/data tidak valid (ValueError), 503 dengan Retry-After
+        jika process pool penuh dan 504 jika query melewati batas waktu endpoint;
+        ketiganya kondisi yang diharapkan dan dicatat satu baris tanpa traceback.
+        Exception lain adalah bug atau kegagalan server: 500 dengan traceback.
+        """
+        self.metrics.inc('api_errors_total', endpoint=request.endpoint, exception=type(error).__name__)
+        response = jsonify({
+            'success': False,
+            'error': str(error)
+        })
+        if isinstance(error, ValueError):
+            response.status_code = 400
+        elif isinstance(error, QueryPoolBusy):
+            response.status_code = 503
+            response.headers['Retry-After'] = str(error.retry_after)
+        elif isinstance(error, QueryTimeout):
+            response.status_code = 504
+        else:
+            current_app.logger.error('%s gagal: %s', request.endpoint, error, exc_info=error)
+            response.status_code = 500
+            return response
+        current_app.logger.info('%s gagal (%d): %s', request.endpoint, response.status_code, error)
+        return response
+    
+    def get_metadata(self):
+        """Get metadata dashboard: tahun, local authority, benefit type, nation dan konfigurasinya"""
+        try:
+            metadata = self.data_loader.metadata
+            
+            return self._respond({
+                'success': True,
+                'data': {
+                    **metadata,
+                    'benefit_configs': Config.BENEFIT_TYPES,
+                    'default_year': Config.DEFAULT_YEAR,
+                    'selected_map_benefit_type': Config.SELECTED_MAP_BENEFIT_TYPE
+                },
+                'version': self.data_loader.version
+            })
+        except Exception as e:
+            return self._error(e)
     
     def get_geojson(self):
-        """Get GeoJSON data"""
+        """Get GeoJSON data (sudah diserialisasi, dikompresi sesuai Accept-Encoding)"""
         try:
-            return jsonify(self.data_loader.geojson)
+            level = request.args.get('level', 'full')
+            fmt = request.args.get('format', 'geojson')
+            blob = self.data_loader.get_geojson_blob(level, fmt)
+            encoding = request.accept_encodings.best_match(
+                blob.encodings + ['identity'], default='identity'
+            )
+            etag = blob.etag(encoding)
+            
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = Response(blob.body(encoding), mimetype='application/json')
+                if encoding != 'identity':
+                    response.content_encoding = encoding
+            
+            response.set_etag(etag)
+            response.vary.add('Accept-Encoding')
+            
+            # URL berversi (?v=<versi dataset>) boleh di-cache lama oleh browser
+            if request.args.get('v') == self.data_loader.version:
+                response.cache_control.public = True
+                response.cache_control.max_age = Config.GEOJSON_MAX_AGE
+                response.cache_control.immutable = True
+            else:
+                response.cache_control.no_cache = True
+            return response
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
     
     def get_map_data(self):
         """Get data for map visualization"""
         try:
             year = int(request.args.get('year', 2025))
             benefit_type = request.args.get('benefit_type', 'air_quality')
+            columnar = self._columnar()
+            bbox = self._bbox()
 
             # Get data for the selected benefit type
-            data = self.data_loader.get_data_for_map(year, benefit_type)
+            data = self.data_loader.get_data_for_map(year, benefit_type, columnar=columnar, bbox=bbox)
 
-            return jsonify({
+            return self._respond({
                 'success': True,
                 'data': data
-            })
+            }, columnar)
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
     
     def get_chart_data(self):
         """Get time series data for charts"""
@@ -70,36 +358,40 @@ class APIController:
             if not benefit_types:
                 benefit_types = None
             
-            data = self.data_loader.get_data_for_chart(local_authority, benefit_types)
+            columnar = self._columnar()
+            data = self.data_loader.get_data_for_chart(local_authority, benefit_types, columnar=columnar)
             
-            return jsonify({
+            return self._respond({
                 'success': True,
                 'data': data,
                 'local_authority': local_authority
-            })
+            }, columnar)
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
     
     def get_correlation(self):
-        """Get correlation matrix between benefit types"""
+        """Get correlation matrix between benefit types
+        
+        Parameter opsional: year atau year_start/year_end, method
+        (pearson/spearman) dan group_by=nation untuk matriks per nation.
+        """
         try:
             year = request.args.get('year', type=int)
+            year_start = request.args.get('year_start', type=int)
+            year_end = request.args.get('year_end', type=int)
+            method = request.args.get('method', 'pearson')
+            group_by = request.args.get('group_by')
             
-            corr_data = self.data_loader.get_correlation_data(year)
+            corr_data = self._query('correlation', 'get_correlation_data', year, method, year_start, year_end, group_by)
             
-            return jsonify({
+            return self._respond({
                 'success': True,
                 'data': corr_data,
-                'year': year
+                'year': year,
+                'method': method
             })
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
     
     def get_trend_data(self):
         """Get trend data for specific local authority"""
@@ -111,18 +403,16 @@ class APIController:
                     'error': 'local_authority parameter required'
                 }), 400
             
-            data = self.data_loader.get_trend_data(local_authority)
+            columnar = self._columnar()
+            data = self.data_loader.get_trend_data(local_authority, columnar=columnar)
             
-            return jsonify({
+            return self._respond({
                 'success': True,
                 'data': data,
                 'local_authority': local_authority
-            })
+            }, columnar)
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
     
     def get_heatmap_data(self):
         """Get heatmap data"""
@@ -131,33 +421,48 @@ class APIController:
             year_start = request.args.get('year_start', type=int)
             year_end = request.args.get('year_end', type=int)
             
-            data = self.data_loader.get_heatmap_data(benefit_type, year_start, year_end)
+            columnar = self._columnar()
+            data = self._query('heatmap-data', 'get_heatmap_data', benefit_type, year_start, year_end, columnar=columnar)
             
-            return jsonify({
+            return self._respond({
                 'success': True,
                 'data': data,
                 'benefit_type': benefit_type
-            })
+            }, columnar)
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
     
     def get_summary_stats(self):
-        """Get summary statistics"""
+        """Get summary statistics (semua tahun, atau satu tahun dengan parameter year)"""
         try:
-            stats = self.data_loader.get_summary_statistics()
+            year = request.args.get('year', type=int)
+            stats = self.data_loader.get_summary_statistics(year)
             
-            return jsonify({
+            return self._respond({
                 'success': True,
                 'data': stats
             })
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
+    
+    def get_class_breaks(self):
+        """Get batas kelas warna peta (method quantile/jenks) untuk benefit type dan tahun"""
+        try:
+            benefit_type = request.args.get('benefit_type', 'air_quality')
+            year = request.args.get('year', type=int)
+            method = request.args.get('method', 'quantile')
+            
+            breaks = self.data_loader.get_class_breaks(benefit_type, year, method)
+            
+            return self._respond({
+                'success': True,
+                'data': breaks,
+                'benefit_type': benefit_type,
+                'year': year,
+                'method': method
+            })
+        except Exception as e:
+            return self._error(e)
     
     def get_top_areas(self):
         """Get top N areas for a benefit type"""
@@ -168,35 +473,251 @@ class APIController:
             order = request.args.get('order', 'desc')  # 'desc' or 'asc'
             
             ascending = order == 'asc'
+            columnar = self._columnar()
             
-            data = self.data_loader.get_top_areas(benefit_type, year, n, ascending)
+            data = self.data_loader.get_top_areas(benefit_type, year, n, ascending, columnar=columnar)
             
-            return jsonify({
+            return self._respond({
                 'success': True,
                 'data': data,
                 'benefit_type': benefit_type,
                 'year': year
-            })
+            }, columnar)
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
+    
+    def get_rankings(self):
+        """Get rank dan percentile semua local authority (atau n teratas) untuk benefit type dan tahun"""
+        try:
+            benefit_type = request.args.get('benefit_type', 'air_quality')
+            year = int(request.args.get('year', 2025))
+            n = request.args.get('n', type=int)
+            columnar = self._columnar()
+            
+            data, count = self.data_loader.get_rankings(benefit_type, year, n, columnar=columnar)
+            
+            return self._respond({
+                'success': True,
+                'data': data,
+                'count': count,
+                'benefit_type': benefit_type,
+                'year': year
+            }, columnar)
+        except Exception as e:
+            return self._error(e)
+    
+    def get_rank_trajectory(self):
+        """Get perubahan rank satu local authority dari tahun ke tahun"""
+        try:
+            local_authority = request.args.get('local_authority')
+            if not local_authority:
+                return jsonify({
+                    'success': False,
+                    'error': 'local_authority parameter required'
+                }), 400
+            
+            benefit_type = request.args.get('benefit_type', 'air_quality')
+            columnar = self._columnar()
+            data = self.data_loader.get_rank_trajectory(local_authority, benefit_type, columnar=columnar)
+            
+            return self._respond({
+                'success': True,
+                'data': data,
+                'local_authority': local_authority,
+                'benefit_type': benefit_type
+            }, columnar)
+        except Exception as e:
+            return self._error(e)
     
     def get_aggregated_data(self):
-        """Get aggregated data by grouping"""
+        """Get aggregated data by grouping
+        
+        format=ndjson|csv mengirim hasil sebagai stream; limit/cursor
+        mengembalikan satu halaman beserta total dan next_cursor.
+        """
         try:
             group_by = request.args.get('group_by', 'nation')
             
-            data = self.data_loader.get_aggregated_data(group_by)
+            fmt = request.args.get('format', 'records')
+            if fmt in STREAM_MIMETYPES:
+                key = 'nation' if group_by == 'nation' else 'local_authority'
+                chunks = self.data_loader.iter_aggregated_data(group_by)
+                return self._stream(chunks, fmt, [key, 'year', 'co_benefit_type', 'value_total'])
+            
+            columnar = self._columnar()
+            if 'limit' not in request.args and 'cursor' not in request.args:
+                data = self._query('aggregated-data', 'get_aggregated_data', group_by, columnar=columnar)
+                return self._respond({
+                    'success': True,
+                    'data': data,
+                    'group_by': group_by
+                }, columnar)
             
-            return jsonify({
+            offset, limit = self._page(group_by)
+            total = self.data_loader.count_aggregated_data(group_by)
+            data = self._query('aggregated-data', 'get_aggregated_data', group_by, columnar, offset, limit)
+            next_offset = offset + limit
+            return self._respond({
                 'success': True,
                 'data': data,
-                'group_by': group_by
+                'group_by': group_by,
+                'offset': offset,
+                'total': total,
+                'next_cursor': self._cursor(group_by, next_offset) if next_offset < total else None
+            }, columnar)
+        except Exception as e:
+            return self._error(e)
+    
+    def get_comparison(self):
+        """Get perubahan antar dua tahun per local authority dan nation, dengan top-N movers
+        
+        Parameter opsional: year_start/year_end (default tahun pertama dan
+        terakhir), benefit_type (boleh berulang, default semua), sort (delta,
+        pct_change, cumulative, cagr) dan n (jumlah movers per benefit type).
+        """
+        try:
+            year_start = request.args.get('year_start', type=int)
+            year_end = request.args.get('year_end', type=int)
+            benefit_types = request.args.getlist('benefit_type') or None
+            sort = request.args.get('sort', 'delta')
+            n = int(request.args.get('n', 10))
+            columnar = self._columnar()
+            
+            data = self.data_loader.get_comparison(year_start, year_end, benefit_types, sort, n, columnar=columnar)
+            
+            # Selalu lewat serializer ringkas: perubahan yang tidak terdefinisi (NaN) ditulis null
+            return self._respond({
+                'success': True,
+                'data': data,
+                'sort': sort
+            }, True)
+        except Exception as e:
+            return self._error(e)
+    
+    def get_locate(self):
+        """Get local authority yang memuat titik lat/lon (mis. centroid kode pos)"""
+        try:
+            lat = request.args.get('lat', type=float)
+            lon = request.args.get('lon', type=float)
+            if lat is None or lon is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'lat and lon parameters required'
+                }), 400
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError(f"Invalid coordinate: {lat}, {lon}")
+            
+            local_authority = self.data_loader.locate(lat, lon)
+            
+            return self._respond({
+                'success': True,
+                'data': {'local_authority': local_authority},
+                'lat': lat,
+                'lon': lon
             })
         except Exception as e:
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 400
+            return self._error(e)
+    
+    def get_areas_in_bbox(self):
+        """Get local authority yang batasnya memotong bbox=lon_min,lat_min,lon_max,lat_max"""
+        try:
+            bbox = self._bbox()
+            if bbox is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'bbox parameter required'
+                }), 400
+            
+            areas = self.data_loader.get_areas_in_bbox(bbox)
+            
+            return self._respond({
+                'success': True,
+                'data': areas,
+                'bbox': list(bbox)
+            })
+        except Exception as e:
+            return self._error(e)
+    
+    def get_export(self):
+        """Ekspor baris mentah yang difilter sebagai stream CSV (default) atau NDJSON"""
+        try:
+            fmt = request.args.get('format', 'csv')
+            if fmt not in STREAM_MIMETYPES:
+                raise ValueError(f"Unknown format: {fmt}")
+            
+            chunks = self.data_loader.iter_rows(
+                benefit_types=request.args.getlist('benefit_type'),
+                nations=request.args.getlist('nation'),
+                local_authorities=request.args.getlist('local_authority'),
+                year_start=request.args.get('year_start', type=int),
+                year_end=request.args.get('year_end', type=int)
+            )
+            return self._stream(chunks, fmt, EXPORT_COLUMNS, 'cobenefits_export')
+        except Exception as e:
+            return self._error(e)
+    
+    def post_batch(self):
+        """Jalankan beberapa sub-query dalam satu request atas satu versi dataset
+        
+        Body: {"queries": [{"id": ..., "endpoint": "map-data", "params": {...}}, ...]}.
+        Setiap sub-query dijalankan oleh handler endpoint yang sama (termasuk
+        response cache), dan hasil antara seperti baris grup (benefit_type, year)
+        dipakai bersama. Respons: {"success", "version", "results": [{"id",
+        "status", "body"}, ...]} dengan body sama persis dengan respons endpoint.
+        """
+        try:
+            body = request.get_json(silent=True)
+            queries = body.get('queries') if isinstance(body, dict) else None
+            if not isinstance(queries, list) or not queries:
+                raise ValueError("queries must be a non-empty list")
+            if len(queries) > Config.BATCH_MAX_QUERIES:
+                raise ValueError(f"At most {Config.BATCH_MAX_QUERIES} queries per batch")
+            for query in queries:
+                if not isinstance(query, dict) or query.get('endpoint') not in BATCH_ENDPOINTS:
+                    raise ValueError(f"Unknown batch endpoint: {query.get('endpoint') if isinstance(query, dict) else query}")
+                if not isinstance(query.get('params', {}), dict):
+                    raise ValueError("params must be an object")
+            
+            parts = []
+            with self.data_loader.batch():
+                for i, query in enumerate(queries):
+                    status, result = self._run_subquery(query['endpoint'], query.get('params', {}))
+                    parts.append(b'{"id":%s,"status":%d,"body":%s}' % (
+                        serialization.dumps(query.get('id', i)), status, result.strip()
+                    ))
+                version = self.data_loader.version
+            
+            body = b'{"success":true,"version":%s,"results":[%s]}' % (
+                serialization.dumps(version), b','.join(parts)
+            )
+            return Response(body, mimetype='application/json')
+        except Exception as e:
+            return self._error(e)
+    
+    def _run_subquery(self, endpoint, params):
+        """(status, body JSON) dari handler endpoint untuk params, tanpa request HTTP baru"""
+        rule = next(current_app.url_map.iter_rules(f'{self.bp.name}.{endpoint.replace("-", "_")}'))
+        with current_app.test_request_context(rule.rule, base_url=request.url_root, query_string=params,
+                                              headers={'Accept': 'application/json'}):
+            # teardown sub-request memanggil unpin(), yang mengembalikan pin batch ini
+            self.data_loader.pin()
+            response = make_response(current_app.view_functions[request.endpoint](**request.view_args))
+            if response.is_streamed or response.mimetype != 'application/json':
+                return 400, serialization.dumps({'success': False, 'error': 'Streaming formats are not supported in batch'})
+            return response.status_code, response.get_data()
+    
+    def get_tile(self, z, x, y):
+        """Get GeoJSON tile dengan nilai choropleth"""
+        try:
+            year = int(request.args.get('year', Config.DEFAULT_YEAR))
+            benefit_type = request.args.get('benefit_type', Config.SELECTED_MAP_BENEFIT_TYPE)
+            
+            # Tile pre-render (build_tiles.py) dipakai jika ada
+            path = self.data_loader.tile_path(z, x, y, year, benefit_type)
+            if path.is_file():
+                return Response(path.read_bytes(), mimetype='application/json')
+            
+            # Serializer ringkas (bukan jsonify, yang mem-pretty-print saat DEBUG)
+            return self._respond(self.data_loader.get_tile(z, x, y, year, benefit_type), True)
+        except Exception as e:
+            return self._error(e)
@@ -2,7 +2,8 @@
 Main Controller
 Menangani routing untuk halaman utama
 """
-from flask import Blueprint, render_template
+from flask import Blueprint, Response, jsonify, render_template, request
+from werkzeug.http import is_resource_modified
 from config import Config
 
 
@@ -13,33 +14,57 @@ class MainController:
         """Initialize controller dengan data loader"""
         self.data_loader = data_loader
         self.bp = Blueprint('main', __name__)
+        # (versi dataset, HTML) halaman utama yang terakhir dirender
+        self._page = None
         self._register_routes()
     
     def _register_routes(self):
         """Register all main routes"""
         self.bp.add_url_rule('/', 'index', self.index, methods=['GET'])
+        self.bp.add_url_rule('/health', 'health', self.health, methods=['GET'])
     
     def index(self):
-        """Main dashboard page"""
-        # Get metadata for template
-        years = self.data_loader.get_years()
-        local_authorities = self.data_loader.get_local_authorities()
-        benefit_types = self.data_loader.get_benefit_types()
-        nations = self.data_loader.get_nations()
+        """Main dashboard page (dirender sekali per versi dataset, dengan ETag)"""
+        version = self.data_loader.version
+        etag = f'page-{version}'
         
-        # Get benefit type configurations
-        benefit_configs = Config.BENEFIT_TYPES
+        if not is_resource_modified(request.environ, etag=etag):
+            response = Response(status=304)
+        else:
+            page = self._page
+            if page is None or page[0] != version:
+                page = self._page = (version, self._render())
+            response = Response(page[1], mimetype='text/html')
+        
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
+    
+    def _render(self):
+        """Render index.html dari metadata dataset"""
+        metadata = self.data_loader.metadata
+        years = metadata['years']
         
         return render_template(
             'index.html',
             min_year=min(years),
             max_year=max(years),
             years=years,
-            local_authorities=local_authorities,
-            benefit_types=benefit_types,
-            benefit_configs=benefit_configs,
-            nations=nations,
+            local_authorities=metadata['local_authorities'],
+            benefit_types=metadata['benefit_types'],
+            benefit_configs=Config.BENEFIT_TYPES,
+            nations=metadata['nations'],
             default_year=Config.DEFAULT_YEAR,
             selected_map_benefit_type=Config.SELECTED_MAP_BENEFIT_TYPE,
-            matching_property=Config.MATCHING_PROPERTY
+            matching_property=Config.MATCHING_PROPERTY,
+            data_version=self.data_loader.version,
+            geometry_levels={name: level['min_zoom'] for name, level in Config.GEOMETRY_LEVELS.items()},
+            viewport_min_zoom=Config.MAP_VIEWPORT_MIN_ZOOM
         )
+    
+    def health(self):
+        """Health check: tidak memuat data (ready = dataset sudah dimuat)"""
+        return jsonify({
+            'status': 'ok',
+            'ready': self.data_loader.ready
+        })
@@ -0,0 +1,80 @@
+"""
+Metrics Controller
+Endpoint /metrics (format Prometheus) dan instrumentasi setiap request
+"""
+import cProfile
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from flask import Blueprint, Response, current_app, g, request
+from config import Config
+from models.metrics import SIZE_BUCKETS
+
+
+class MetricsController:
+    """Controller untuk /metrics; mencatat latency, ukuran dan status setiap request"""
+
+    def __init__(self, data_loader):
+        """Initialize controller dengan registry metrik milik data loader"""
+        self.data_loader = data_loader
+        self.metrics = data_loader.metrics
+        self.bp = Blueprint('metrics', __name__)
+        self._register_routes()
+
+    def _register_routes(self):
+        """Register /metrics dan hook request untuk seluruh aplikasi"""
+        self.bp.add_url_rule('/metrics', 'metrics', self.get_metrics, methods=['GET'])
+        self.bp.before_app_request(self._start_request)
+        self.bp.after_app_request(self._finish_request)
+
+    def get_metrics(self):
+        """Semua metrik proses ini dalam format teks Prometheus"""
+        return Response(self.metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    def _start_request(self):
+        """Catat waktu mulai; sebagian request diprofil jika PROFILE_SLOW_REQUESTS aktif"""
+        g.metrics_start = time.perf_counter()
+        if Config.PROFILE_SLOW_REQUESTS and random.random() < Config.PROFILE_SAMPLE_RATE:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Profiler lain sudah aktif di thread ini
+                return
+            g.metrics_profiler = profiler
+
+    def _finish_request(self, response):
+        """Catat latency, ukuran respons dan status; simpan profil request lambat"""
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        duration = time.perf_counter() - start
+        endpoint = request.endpoint or 'unmatched'
+
+        self.metrics.inc('http_requests_total', endpoint=endpoint, method=request.method,
+                         status=str(response.status_code))
+        self.metrics.observe('http_request_duration_seconds', duration, endpoint=endpoint)
+        size = response.calculate_content_length()
+        if size is not None:
+            self.metrics.observe('http_response_size_bytes', size, SIZE_BUCKETS, endpoint=endpoint)
+
+        profiler = g.pop('metrics_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            if duration >= Config.PROFILE_MIN_DURATION:
+                self._write_profile(profiler, endpoint, duration)
+        return response
+
+    def _write_profile(self, profiler, endpoint, duration):
+        """Tulis profil pstats ke PROFILE_DIR (buka dengan `python -m pstats` atau snakeviz)"""
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        path = Path(Config.PROFILE_DIR) / f'{timestamp}-{endpoint}-{duration * 1000:.0f}ms.prof'
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError as e:
+            current_app.logger.warning('Gagal menulis profil %s: %s', path, e)
+            return
+        self.metrics.inc('profiles_written_total', endpoint=endpoint)
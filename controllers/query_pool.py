@@ -0,0 +1,160 @@
+"""
+Query Pool
+Process pool untuk query DataLoader yang berat (CPU-bound) di luar GIL proses web
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from models.single_flight import SingleFlight
+
+# DataLoader milik proses worker (diisi oleh _init_worker)
+_data_loader = None
+
+
+class QueryPoolBusy(Exception):
+    """Antrian process pool penuh; request sebaiknya diulang setelah retry_after detik"""
+
+    def __init__(self, retry_after):
+        super().__init__('Query pool is busy, retry later')
+        self.retry_after = retry_after
+
+
+class QueryTimeout(Exception):
+    """Query di process pool melebihi batas waktu endpoint-nya"""
+
+
+class StaleDataset(Exception):
+    """Worker tidak bisa memuat versi dataset yang diminta"""
+
+
+class QueryPool:
+    """Process pool terbatas untuk method DataLoader yang berat
+
+    Worker dibuat dengan fork (default di POSIX) sehingga langsung memakai
+    dataset yang sudah dimuat proses induk secara copy-on-write; dengan
+    start method lain (mis. spawn di Windows) setiap worker memuat dan
+    me-warm-up dataset sendiri saat start. Setiap task membawa versi dataset
+    request: worker dengan versi berbeda me-reload dulu, dan jika versinya
+    tetap berbeda task gagal dengan StaleDataset.
+
+    Jumlah task di pool (berjalan + menunggu) dibatasi `max_queue`; di atas
+    itu run() langsung gagal dengan QueryPoolBusy. Task yang melewati batas
+    waktu dibatalkan jika belum berjalan; yang sudah berjalan tetap selesai
+    di worker dan baru melepas slotnya saat itu. Pemanggilan bersamaan yang
+    identik hanya dikirim sekali.
+    """
+
+    def __init__(self, data_loader, workers, max_queue, retry_after, start_method=None):
+        """Pool belum dibuat sampai start() atau query pertama"""
+        self.data_loader = data_loader
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.start_method = start_method or (
+            'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        )
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = 0
+        self._single_flight = SingleFlight()
+
+    def start(self):
+        """Buat worker sekarang, mis. di post_worker_init gunicorn sebelum thread request berjalan"""
+        with self._lock:
+            executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(os.getpid)
+
+    def run(self, method, args=(), kwargs=None, version=None, timeout=None):
+        """Hasil data_loader.<method>(*args, **kwargs) yang dihitung di worker
+
+        Raise QueryPoolBusy, QueryTimeout, StaleDataset atau BrokenProcessPool
+        (worker mati; pool dibuat ulang pada pemanggilan berikutnya). Exception
+        dari method itu sendiri (mis. ValueError) diteruskan apa adanya.
+        """
+        kwargs = kwargs or {}
+        key = (method, tuple(args), tuple(sorted(kwargs.items())), version)
+        return self._single_flight.do(key, self._submit, method, args, kwargs, version, timeout)
+
+    def pending(self):
+        """Jumlah task di pool (berjalan + menunggu)"""
+        with self._lock:
+            return self._pending
+
+    def shutdown(self):
+        """Hentikan worker (task yang belum berjalan dibatalkan)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, method, args, kwargs, version, timeout):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise QueryPoolBusy(self.retry_after)
+            executor = self._get_executor()
+            self._pending += 1
+        try:
+            future = executor.submit(_run, method, args, kwargs, version)
+        except BaseException:
+            self._release()
+            self._discard(executor)
+            raise
+        future.add_done_callback(lambda future: self._release())
+
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise QueryTimeout(f'{method} exceeded {timeout}s') from None
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def _get_executor(self):
+        # Dipanggil dengan _lock. Executor dari proses induk (sebelum fork) tidak dipakai.
+        if self._executor is None or self._pid != os.getpid():
+            context = multiprocessing.get_context(self.start_method)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                # Objek DataLoader hanya bisa diwariskan lewat fork, tidak di-pickle
+                initargs=(self.data_loader if self.start_method == 'fork' else None,)
+            )
+            self._pid = os.getpid()
+            self._pending = 0
+        return self._executor
+
+    def _release(self):
+        with self._lock:
+            self._pending = max(self._pending - 1, 0)
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+
+def _init_worker(data_loader):
+    """Initializer proses worker: DataLoader hasil fork, atau DataLoader baru yang di-warm-up"""
+    global _data_loader
+    if data_loader is None:
+        from models.data_loader import DataLoader
+        data_loader = DataLoader()
+        data_loader.warm_up()
+    else:
+        data_loader.reset_after_fork()
+    _data_loader = data_loader
+
+
+def _run(method, args, kwargs, version):
+    if version is not None and _data_loader.version != version:
+        _data_loader.reload()
+        if _data_loader.version != version:
+            raise StaleDataset(f'Worker has dataset {_data_loader.version}, not {version}')
+    return getattr(_data_loader, method)(*args, **kwargs)
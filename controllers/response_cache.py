@@ -0,0 +1,61 @@
+"""
+Response Cache
+LRU in-process untuk respons API, dibatasi jumlah entry dan total ukuran
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """LRU cache thread-safe untuk body respons yang sudah diserialisasi"""
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        """Initialize cache dengan batas jumlah entry dan ukuran total"""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Ambil entry dan tandai sebagai terbaru, atau None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, body, mimetype):
+        """Simpan body respons, buang entry terlama jika melewati batas"""
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[0])
+            self._entries[key] = (body, mimetype)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        """Kosongkan cache"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(endpoint, args):
+        """Key cache dari endpoint dan query args yang dinormalisasi (urut per nama)"""
+        return (endpoint, tuple(sorted((name, tuple(values)) for name, values in args.lists())))
+
+    @staticmethod
+    def make_etag(version, key):
+        """ETag kuat dari versi dataset dan key cache"""
+        return hashlib.sha256(f'{version}:{key!r}'.encode('utf-8')).hexdigest()[:32]
@@ -0,0 +1,140 @@
+"""
+Serialization
+Serialisasi JSON ringkas, format biner typed array dan streaming NDJSON/CSV langsung dari array NumPy
+"""
+import csv
+import io
+import json
+import struct
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson opsional
+    orjson = None
+
+
+def dumps(payload):
+    """Serialisasi payload yang boleh berisi array NumPy menjadi bytes JSON
+
+    Array numerik ditulis tanpa membuat objek Python per elemen jika orjson
+    tersedia. NaN ditulis sebagai null sehingga hasilnya JSON yang valid.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+# Format biner: lihat dumps_typed_arrays (dibaca oleh fetchTypedArrays di main.js)
+TYPED_ARRAYS_MIMETYPE = 'application/vnd.cobenefits.typed-arrays'
+
+# dtype.kind -> (nama dtype di header, dtype little-endian)
+_TYPED_ARRAY_DTYPES = {
+    'f': ('float32', '<f4'),
+    'i': ('int32', '<i4'),
+    'u': ('int32', '<i4'),
+    'b': ('uint8', '|u1'),
+}
+_ALIGNMENT = 8
+
+
+def dumps_typed_arrays(payload):
+    """Serialisasi payload ke format biner: header JSON diikuti buffer array
+
+    Layout: panjang header (uint32 little-endian), header JSON UTF-8, lalu
+    buffer setiap array. Setiap buffer dimulai pada offset kelipatan 8 dari
+    awal bagian data (setelah header, juga dibulatkan ke kelipatan 8) sehingga
+    browser bisa membacanya langsung sebagai typed array tanpa parsing.
+
+    Di dalam header, array NumPy numerik diganti {"$array": i} dengan deskripsi
+    `arrays[i]` = {dtype, shape, offset}. Float ditulis sebagai float32 dan
+    integer sebagai int32. pd.Categorical ditulis sebagai kode int32 dengan
+    daftar `categories` di deskripsinya.
+    """
+    import pandas as pd
+    specs, buffers = [], []
+    offset = 0
+
+    def encode(value):
+        nonlocal offset
+        if isinstance(value, dict):
+            return {key: encode(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [encode(item) for item in value]
+        if isinstance(value, pd.Categorical):
+            if len(value.categories) > len(value):
+                # Hasil kecil (mis. top-N): kirim hanya kategori yang dipakai
+                value = value.remove_unused_categories()
+            spec, array = {'categories': value.categories.tolist()}, value.codes
+        elif isinstance(value, np.ndarray) and value.dtype.kind in _TYPED_ARRAY_DTYPES:
+            spec, array = {}, value
+        else:
+            return value
+
+        name, dtype = _TYPED_ARRAY_DTYPES[array.dtype.kind]
+        # Hanya di-copy jika dtype/urutan memori berbeda dari format keluaran
+        array = np.ascontiguousarray(array, dtype=dtype)
+        spec.update(dtype=name, shape=list(array.shape), offset=offset)
+        specs.append(spec)
+        buffers.append(array)
+        offset += _aligned(array.nbytes)
+        return {'$array': len(specs) - 1}
+
+    encoded = encode(payload)
+    header = json.dumps(
+        {'arrays': specs, 'payload': encoded},
+        default=_default, separators=(',', ':'), ensure_ascii=False
+    ).encode('utf-8')
+
+    parts = [struct.pack('<I', len(header)), header, _padding(4 + len(header))]
+    for array in buffers:
+        parts.append(memoryview(array).cast('B'))
+        parts.append(_padding(array.nbytes))
+    return b''.join(parts)
+
+
+def iter_ndjson(chunks):
+    """Potongan kolom (dict nama -> array) sebagai bytes NDJSON, satu objek per baris"""
+    for chunk in chunks:
+        names = list(chunk)
+        rows = zip(*(_default(np.asarray(column)) for column in chunk.values()))
+        yield b''.join(dumps(dict(zip(names, row))) + b'\n' for row in rows)
+
+
+def iter_csv(chunks, columns):
+    """Potongan kolom sebagai bytes CSV dengan baris header `columns` (juga jika hasil kosong)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(zip(*(_default(np.asarray(chunk[name])) for name in columns)))
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _aligned(size):
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _padding(size):
+    return b'\0' * (_aligned(size) - size)
+
+
+def _default(value):
+    """Konversi tipe NumPy/pandas yang tidak ditangani serializer secara langsung"""
+    import pandas as pd
+    if isinstance(value, pd.Categorical):
+        return np.asarray(value).tolist()
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            missing = np.isnan(value)
+            if missing.any():
+                return np.where(missing, None, value).tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,39 @@
+"""
+Gunicorn Configuration
+Data dimuat sekali di proses master lalu dibagi ke semua worker (copy-on-write)
+
+Jalankan dengan: gunicorn -c gunicorn.conf.py app:app
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import app (dan warm-up data) di master sebelum fork
+preload_app = True
+os.environ.setdefault('WARM_UP_ON_START', '1')
+
+
+def when_ready(server):
+    """Pindahkan objek hasil warm-up ke generasi permanen GC sebelum worker di-fork
+
+    Tanpa ini, garbage collector di setiap worker menulis header objek-objek
+    tersebut sehingga halaman memori yang dibagi ikut ter-copy.
+    """
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    """Buat process pool query berat (QUERY_POOL_WORKERS) di setiap worker setelah fork
+
+    Pool tidak pernah dibuat di master. Di titik ini worker belum menjalankan
+    thread request, sehingga proses pool di-fork dari proses yang tenang dan
+    langsung berbagi dataset hasil warm-up. Dengan pool aktif, GUNICORN_WORKERS
+    bisa diturunkan: query berat tidak lagi menahan GIL worker web.
+    """
+    query_pool = worker.wsgi.extensions.get('query_pool')
+    if query_pool is not None:
+        query_pool.start()
@@ -0,0 +1,64 @@
+"""
+Comparison
+Perubahan nilai antara dua tahun (delta, persen, kumulatif, CAGR) langsung dari sel cube
+"""
+import numpy as np
+
+from models.rankings import sort_order
+
+# Kolom metrik hasil compare(), juga nilai parameter sort untuk movers
+METRICS = ('delta', 'pct_change', 'cumulative', 'cagr')
+
+
+def compare(values, present, y0, y1, years):
+    """Metrik perubahan dari kode tahun y0 ke y1 untuk setiap (baris, benefit_type)
+
+    values/present berbentuk (baris, tahun, benefit_type) seperti DataCube,
+    y0 < y1, dan `years` = selisih tahun kalender untuk CAGR. Semua sel
+    dihitung sekaligus; hasilnya dict nama -> array (baris, benefit_type):
+
+    - value_start, value_end: nilai di kedua tahun (NaN jika sel tidak ada)
+    - delta: value_end - value_start
+    - pct_change: delta / |value_start| x 100 (NaN jika value_start 0)
+    - cumulative: jumlah nilai tahun y0..y1 inklusif (NaN jika tidak ada sel)
+    - cagr: ((value_end / value_start) ^ (1 / years) - 1) x 100, hanya jika
+      kedua nilai positif (benefit negatif/biaya tidak punya laju majemuk)
+    """
+    start = np.where(present[:, y0], values[:, y0], np.nan)
+    end = np.where(present[:, y1], values[:, y1], np.nan)
+    span = present[:, y0:y1 + 1]
+    cumulative = np.where(span, values[:, y0:y1 + 1], 0.0).sum(axis=1)
+    cumulative[~span.any(axis=1)] = np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = end - start
+        pct_change = np.where(start != 0, delta / np.abs(start) * 100, np.nan)
+        growing = (start > 0) & (end > 0)
+        cagr = np.where(growing, (np.power(end / start, 1 / years) - 1) * 100, np.nan)
+
+    return {
+        'value_start': start,
+        'value_end': end,
+        'delta': delta,
+        'pct_change': pct_change,
+        'cumulative': cumulative,
+        'cagr': cagr
+    }
+
+
+def with_total(values, present):
+    """values/present dengan satu benefit_type tambahan di akhir: jumlah semua benefit_type"""
+    total = np.where(present, values, 0.0).sum(axis=2, keepdims=True)
+    return (np.concatenate([values, total], axis=2),
+            np.concatenate([present, present.any(axis=2, keepdims=True)], axis=2))
+
+
+def movers(metrics, column, sort, n):
+    """(gainers, losers): kode baris dengan metrik `sort` terbesar/terkecil untuk satu benefit_type
+
+    Baris dengan metrik NaN tidak ikut; urutan sama dengan sort_order
+    (seperti DataFrame.sort_values).
+    """
+    values = metrics[sort][:, column]
+    count = min(n, int(np.count_nonzero(~np.isnan(values))))
+    return sort_order(values, False)[:count], sort_order(values, True)[:count]
@@ -0,0 +1,126 @@
+"""
+Correlation Model
+Statistik cukup (sufficient statistics) korelasi antar benefit type per nation dan tahun
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+METHODS = ('pearson', 'spearman')
+
+
+class CorrelationStats:
+    """Statistik korelasi Pearson per (nation, year) yang bisa digabung
+
+    Observasi korelasi adalah baris (local_authority, year) dengan kolom
+    benefit type, sama dengan pivot di DataFrame.corr(). Untuk setiap grup
+    (nation, year) dan setiap pasangan benefit type (i, j) disimpan, atas
+    baris yang memiliki kedua nilai (pairwise complete seperti pandas):
+    jumlah baris `n`, rata-rata `mean_x`/`mean_y` dan jumlah kuadrat/produk
+    deviasi `m2_x`, `m2_y`, `c_xy`. Gabungan sembarang himpunan tahun dan
+    nation dihitung dengan rumus gabungan Chan et al. dalam O(grup x k^2)
+    tanpa menyentuh baris data, dan tetap stabil secara numerik.
+
+    Spearman butuh ranking ulang atas baris yang dipilih, sehingga dihitung
+    dari cube lalu disimpan di LRU kecil (data tidak berubah per dataset).
+    """
+
+    def __init__(self, cube, la_nations, cache_size=64):
+        """Hitung statistik dari DataCube; la_nations = kode nation per local_authority"""
+        self.cube = cube
+        self.la_nations = np.asarray(la_nations)
+        self.n_nations = len(cube.index.nations)
+        n_years, k = cube.values.shape[1:]
+        shape = (self.n_nations, n_years, k, k)
+        self.n = np.zeros(shape)
+        self.mean_x = np.zeros(shape)
+        self.mean_y = np.zeros(shape)
+        self.m2_x = np.zeros(shape)
+        self.m2_y = np.zeros(shape)
+        self.c_xy = np.zeros(shape)
+        # Jumlah sel yang ada per benefit type (kolom hasil, walaupun nilainya NaN)
+        self.cells = np.zeros(shape[:3])
+
+        for nation in range(self.n_nations):
+            las = self.la_nations == nation
+            for year in range(n_years):
+                values, present = cube.values[las, year], cube.present[las, year]
+                self.cells[nation, year] = present.sum(axis=0)
+                # Nilai NaN diperlakukan sebagai kosong, seperti DataFrame.corr()
+                self._accumulate(nation, year, values, present & ~np.isnan(values))
+
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _accumulate(self, nation, year, values, present):
+        """Statistik pairwise satu grup; values/present berbentuk (baris, k)"""
+        both = present[:, :, None] & present[:, None, :]
+        n = both.sum(axis=0)
+        x = np.where(both, values[:, :, None], 0.0)
+        y = np.where(both, values[:, None, :], 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x = np.where(n > 0, x.sum(axis=0) / n, 0.0)
+            mean_y = np.where(n > 0, y.sum(axis=0) / n, 0.0)
+        dx = np.where(both, x - mean_x, 0.0)
+        dy = np.where(both, y - mean_y, 0.0)
+
+        self.n[nation, year] = n
+        self.mean_x[nation, year] = mean_x
+        self.mean_y[nation, year] = mean_y
+        self.m2_x[nation, year] = (dx * dx).sum(axis=0)
+        self.m2_y[nation, year] = (dy * dy).sum(axis=0)
+        self.c_xy[nation, year] = (dx * dy).sum(axis=0)
+
+    def pearson(self, years, nations=slice(None)):
+        """Matriks korelasi Pearson (k x k) untuk slice tahun dan nation"""
+        n = self.n[nations, years].reshape((-1,) + self.n.shape[2:])
+        mean_x = self.mean_x[nations, years].reshape(n.shape)
+        mean_y = self.mean_y[nations, years].reshape(n.shape)
+
+        total = n.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            merged_x = (n * mean_x).sum(axis=0) / total
+            merged_y = (n * mean_y).sum(axis=0) / total
+            dx = mean_x - merged_x
+            dy = mean_y - merged_y
+            m2_x = self.m2_x[nations, years].reshape(n.shape).sum(axis=0) + (n * dx * dx).sum(axis=0)
+            m2_y = self.m2_y[nations, years].reshape(n.shape).sum(axis=0) + (n * dy * dy).sum(axis=0)
+            c_xy = self.c_xy[nations, years].reshape(n.shape).sum(axis=0) + (n * dx * dy).sum(axis=0)
+
+            divisor = np.sqrt(m2_x * m2_y)
+            result = np.where((total > 0) & (divisor != 0), c_xy / divisor, np.nan)
+        return np.clip(result, -1, 1)
+
+    def spearman(self, years, nations=slice(None)):
+        """Matriks korelasi Spearman (k x k) untuk slice tahun dan nation (di-cache)"""
+        key = (years.start, years.stop, _slice_key(nations))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        import pandas as pd
+        las = np.isin(self.la_nations, np.arange(self.n_nations)[nations])
+        k = self.cube.values.shape[2]
+        present = self.cube.present[las, years].reshape(-1, k)
+        values = np.where(present, self.cube.values[las, years].reshape(-1, k), np.nan)
+        result = pd.DataFrame(values).corr(method='spearman').to_numpy()
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def present_columns(self, years, nations=slice(None)):
+        """Kode benefit type yang memiliki minimal satu nilai di tahun/nation terpilih"""
+        counts = self.cells[nations, years]
+        return np.flatnonzero(counts.reshape(-1, counts.shape[-1]).sum(axis=0))
+
+
+def _slice_key(value):
+    if isinstance(value, slice):
+        return (value.start, value.stop, value.step)
+    return value
@@ -0,0 +1,165 @@
+"""
+Data Cache Model
+Cache biner hasil parsing CSV (array NumPy .npy) dengan deteksi file usang
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from models.data_index import DataIndex
+
+
+class DataCache:
+    """Cache index data dalam bentuk file .npy yang bisa di-memory-map
+
+    Setiap versi CSV disimpan di direktori `<stem>-<sha256[:16]>` di dalam
+    cache_dir. File pointer `<stem>.json` mencatat mtime, size dan sha256
+    CSV terakhir sehingga start berikutnya cukup memeriksa os.stat; hash
+    hanya dihitung ulang jika mtime atau size berubah.
+    """
+
+    def __init__(self, cache_dir):
+        """Initialize cache dengan direktori tujuan"""
+        self.cache_dir = Path(cache_dir)
+
+    def digest(self, csv_path):
+        """sha256 file CSV; dari file pointer jika mtime dan size tidak berubah"""
+        csv_path = Path(csv_path)
+        pointer = self._read_pointer(csv_path)
+        stat = csv_path.stat()
+        if pointer is not None and pointer['mtime_ns'] == stat.st_mtime_ns and pointer['size'] == stat.st_size:
+            return pointer['sha256']
+        return file_digest(csv_path)
+
+    def load(self, csv_path):
+        """Load index dari cache, atau None jika cache tidak ada atau usang"""
+        csv_path = Path(csv_path)
+        pointer = self._read_pointer(csv_path)
+        if pointer is None:
+            return None
+
+        stat = csv_path.stat()
+        if pointer['mtime_ns'] != stat.st_mtime_ns or pointer['size'] != stat.st_size:
+            # File disentuh atau berubah: bandingkan isi dengan hash
+            digest = file_digest(csv_path)
+            entry = self._entry_dir(csv_path, digest)
+            if not entry.is_dir():
+                return None
+            self._write_pointer(csv_path, stat, digest)
+        else:
+            digest = pointer['sha256']
+            entry = self._entry_dir(csv_path, digest)
+
+        try:
+            index = self._read_entry(entry)
+        except (OSError, ValueError, KeyError):
+            return None
+        index.source_digest = digest
+        return index
+
+    def save(self, csv_path, index):
+        """Simpan index ke cache untuk versi CSV saat ini"""
+        csv_path = Path(csv_path)
+        stat = csv_path.stat()
+        digest = index.source_digest or file_digest(csv_path)
+        entry = self._entry_dir(csv_path, digest)
+
+        if not entry.is_dir():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = Path(tempfile.mkdtemp(prefix=f'.{entry.name}-', dir=self.cache_dir))
+            try:
+                for name in DataIndex.ARRAYS:
+                    np.save(tmp / f'{name}.npy', np.ascontiguousarray(getattr(index, name)))
+                meta = {
+                    'local_authorities': index.local_authorities,
+                    'benefit_types': index.benefit_types,
+                    'nations': index.nations,
+                    'years': index.years
+                }
+                with open(tmp / 'meta.json', 'w', encoding='utf-8') as f:
+                    json.dump(meta, f)
+                os.rename(tmp, entry)
+            except OSError:
+                # Worker lain sudah menulis entry yang sama
+                shutil.rmtree(tmp, ignore_errors=True)
+                if not entry.is_dir():
+                    raise
+
+        self._write_pointer(csv_path, stat, digest)
+        self._remove_stale(csv_path, entry)
+
+    def _read_entry(self, entry):
+        """Baca satu entry cache dengan memory-map"""
+        with open(entry / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(entry / f'{name}.npy', mmap_mode='r')
+            for name in DataIndex.ARRAYS
+        }
+        return DataIndex(
+            meta['local_authorities'], meta['benefit_types'], meta['nations'], meta['years'],
+            **arrays
+        )
+
+    def _entry_dir(self, csv_path, digest):
+        return self.cache_dir / f'{csv_path.stem}-{digest[:16]}'
+
+    def _pointer_path(self, csv_path):
+        return self.cache_dir / f'{csv_path.stem}.json'
+
+    def _read_pointer(self, csv_path):
+        try:
+            with open(self._pointer_path(csv_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_pointer(self, csv_path, stat, digest):
+        """Tulis file pointer secara atomik"""
+        pointer = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+        fd, tmp = tempfile.mkstemp(prefix='.pointer-', dir=self.cache_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(pointer, f)
+        os.replace(tmp, self._pointer_path(csv_path))
+
+    def _remove_stale(self, csv_path, keep):
+        """Hapus entry cache versi lama untuk CSV yang sama"""
+        for path in self.cache_dir.glob(f'{csv_path.stem}-*'):
+            if path != keep and path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Hitung sha256 isi file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digests(path, prefix_size, chunk_size=1 << 20):
+    """sha256 dari prefix_size byte pertama dan dari seluruh file dalam satu kali baca
+
+    Digest prefix None jika file lebih kecil dari prefix_size.
+    """
+    digest = hashlib.sha256()
+    prefix = None
+    remaining = prefix_size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+        if remaining == 0:
+            prefix = digest.hexdigest()
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return prefix, digest.hexdigest()
@@ -0,0 +1,117 @@
+"""
+Data Cube Model
+Agregat padat local_authority x year x benefit_type yang dihitung sekali saat load
+"""
+import numpy as np
+
+
+class DataCube:
+    """Cube jumlah value_total per (local_authority, year, benefit_type)
+
+    `values` berukuran (n_la, n_year, n_benefit) dan `present` menandai sel
+    yang memiliki minimal satu baris data, sehingga hasilnya sama dengan
+    groupby/pivot_table yang hanya memuat kombinasi yang ada. Rollup per
+    nation disimpan dengan bentuk (n_nation, n_year, n_benefit).
+    """
+
+    def __init__(self, index):
+        """Bangun cube dari DataIndex"""
+        self.index = index
+        shape = (len(index.local_authorities), len(index.years), len(index.benefit_types))
+        self.values, self.present = self._accumulate(index.la_codes, shape)
+
+        nation_shape = (len(index.nations),) + shape[1:]
+        self.nation_values, self.nation_present = self._accumulate(index.nation_codes, nation_shape)
+
+    def _accumulate(self, first_codes, shape, rows=slice(None), first_year=0):
+        """Jumlahkan nilai baris ke dalam array padat berdasarkan kode
+
+        rows/first_year membatasi ke baris tertentu yang tahunnya mulai dari
+        kode first_year (dipakai untuk memperluas cube dengan tahun baru).
+        """
+        index = self.index
+        flat = np.ravel_multi_index(
+            (first_codes[rows], index.year_codes[rows] - first_year, index.bt_codes[rows]), shape
+        )
+        size = int(np.prod(shape))
+        values = np.bincount(flat, weights=index.values[rows], minlength=size).reshape(shape)
+        present = np.bincount(flat, minlength=size).reshape(shape) > 0
+        return values, present
+
+    def extended(self, index):
+        """Cube untuk index yang sama dengan index cube ini ditambah tahun baru di akhir
+
+        Hanya baris tahun baru yang diakumulasi; sel tahun lama disalin
+        (lihat DataIndex.appended).
+        """
+        cube = DataCube.__new__(DataCube)
+        cube.index = index
+        n_old = self.values.shape[1]
+        rows = np.flatnonzero(index.year_codes >= n_old)
+        for prefix, first_codes in (('', index.la_codes), ('nation_', index.nation_codes)):
+            old_values = getattr(self, prefix + 'values')
+            old_present = getattr(self, prefix + 'present')
+            shape = (old_values.shape[0], len(index.years) - n_old, old_values.shape[2])
+            values, present = cube._accumulate(first_codes, shape, rows, n_old)
+            setattr(cube, prefix + 'values', np.concatenate([old_values, values], axis=1))
+            setattr(cube, prefix + 'present', np.concatenate([old_present, present], axis=1))
+        return cube
+
+    def year_range(self, year_start=None, year_end=None):
+        """Slice sumbu tahun untuk rentang tahun inklusif"""
+        years = self.index.years
+        y0 = 0 if year_start is None else int(np.searchsorted(years, year_start, side='left'))
+        y1 = len(years) if year_end is None else int(np.searchsorted(years, year_end, side='right'))
+        return slice(y0, max(y0, y1))
+
+    def cell_count(self, present):
+        """Jumlah sel yang ada (jumlah baris hasil records/columns)"""
+        return int(np.count_nonzero(present))
+
+    def columns(self, values, present, key, start=0, stop=None):
+        """Sel yang ada sebagai kolom (key, year, co_benefit_type, value_total), urutan sama dengan records"""
+        return self._columns(key, *self._cells(values, present, start, stop))
+
+    def iter_columns(self, values, present, key, chunk_size):
+        """Kolom seperti `columns` dalam potongan sekitar chunk_size sel
+
+        Dipotong per blok indeks pertama (local_authority/nation) sehingga
+        memori yang dipakai sebanding dengan ukuran potongan, bukan hasil penuh.
+        """
+        cells_per_row = max(1, int(np.prod(present.shape[1:])))
+        rows_per_chunk = max(1, chunk_size // cells_per_row)
+        for row in range(0, len(present), rows_per_chunk):
+            block = slice(row, row + rows_per_chunk)
+            first, year_codes, bt_codes, cell_values = self._cells(values[block], present[block])
+            if len(cell_values):
+                yield self._columns(key, first + row, year_codes, bt_codes, cell_values)
+
+    def _columns(self, key, first, year_codes, bt_codes, cell_values):
+        return {
+            key: self.index.labels(key, first),
+            'year': np.asarray(self.index.years, dtype=np.int64)[year_codes],
+            'co_benefit_type': self.index.labels('co_benefit_type', bt_codes),
+            'value_total': cell_values
+        }
+
+    def _cells(self, values, present, start=0, stop=None):
+        """Kode (first, year, benefit_type) dan nilai sel yang ada, opsional sel ke-start..stop"""
+        if start == 0 and stop is None:
+            first, year_codes, bt_codes = np.nonzero(present)
+            return first, year_codes, bt_codes, values[present]
+
+        # Hanya blok baris indeks pertama yang memuat sel start..stop yang dipindai
+        ends = np.cumsum(np.count_nonzero(present.reshape(len(present), -1), axis=1))
+        total = int(ends[-1]) if len(ends) else 0
+        stop = total if stop is None else min(stop, total)
+        if start >= stop:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty, empty, np.empty(0)
+        r0 = int(np.searchsorted(ends, start, side='right'))
+        r1 = int(np.searchsorted(ends, stop, side='left')) + 1
+        skip = start - (int(ends[r0 - 1]) if r0 else 0)
+
+        block = present[r0:r1]
+        first, year_codes, bt_codes = np.nonzero(block)
+        cells = slice(skip, skip + stop - start)
+        return first[cells] + r0, year_codes[cells], bt_codes[cells], values[r0:r1][block][cells]
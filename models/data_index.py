@@ -0,0 +1,205 @@
+"""
+Data Index Model
+Index kolumnar untuk data co-benefit: kode kategori dan offset grup
+"""
+import numpy as np
+
+
+class DataIndex:
+    """Index kolumnar di atas DataFrame yang sudah diurutkan
+
+    Baris diurutkan berdasarkan (co_benefit_type, year, local_authority)
+    sehingga setiap grup (benefit_type, year) dan setiap benefit_type
+    menempati rentang baris yang berurutan. Untuk local_authority disimpan
+    permutasi terpisah yang diurutkan berdasarkan (local_authority, year,
+    co_benefit_type).
+    """
+
+    # Array per baris yang cukup untuk membangun ulang index (lihat DataCache)
+    ARRAYS = ('la_codes', 'bt_codes', 'year_codes', 'nation_codes', 'values')
+
+    def __init__(self, local_authorities, benefit_types, nations, years,
+                 la_codes, bt_codes, year_codes, nation_codes, values):
+        """Inisialisasi dari kategori dan array yang sudah terurut"""
+        # Kategori (terurut, sama dengan sorted() Python)
+        self.local_authorities = list(local_authorities)
+        self.benefit_types = list(benefit_types)
+        self.nations = list(nations)
+        self.years = [int(year) for year in years]
+
+        # Kolom kode dan nilai dalam urutan (benefit_type, year, local_authority)
+        self.la_codes = la_codes
+        self.bt_codes = bt_codes
+        self.year_codes = year_codes
+        self.nation_codes = nation_codes
+        self.values = values
+        self._frame = None
+        self._dtypes = {}
+
+        # sha256 file sumber, diisi oleh DataLoader / DataCache
+        self.source_digest = None
+
+        self._build_offsets()
+
+    @classmethod
+    def from_frame(cls, df):
+        """Bangun index dari DataFrame hasil load CSV"""
+        import pandas as pd
+        la = pd.Categorical(df['local_authority'])
+        bt = pd.Categorical(df['co_benefit_type'])
+        nation = pd.Categorical(df['nation'])
+        years = np.sort(df['year'].unique())
+
+        la_codes = la.codes.astype(np.int32)
+        bt_codes = bt.codes.astype(np.int32)
+        nation_codes = nation.codes.astype(np.int32)
+        year_codes = np.searchsorted(years, df['year'].to_numpy()).astype(np.int32)
+
+        order = np.lexsort((la_codes, year_codes, bt_codes))
+
+        index = cls(
+            la.categories.tolist(), bt.categories.tolist(), nation.categories.tolist(), years.tolist(),
+            la_codes[order], bt_codes[order], year_codes[order], nation_codes[order],
+            df['value_total'].to_numpy(dtype=np.float64)[order]
+        )
+        index._frame = df.take(order).reset_index(drop=True)
+        return index
+
+    def appended(self, df):
+        """Index baru dengan baris df ditambahkan, atau None jika harus dibangun ulang
+
+        Hanya berlaku jika df berisi tahun setelah tahun terakhir index dan
+        local_authority, nation serta co_benefit_type yang sudah ada, sehingga
+        kode kategori tetap sama dan hasilnya identik dengan from_frame atas
+        data gabungan. Baris lama tidak diurutkan ulang: baris baru disisipkan
+        di akhir blok setiap benefit_type.
+        """
+        import pandas as pd
+        if len(df) == 0 or df['year'].min() <= self.years[-1]:
+            return None
+        codes = []
+        for column, categories in (('local_authority', self.local_authorities),
+                                   ('co_benefit_type', self.benefit_types),
+                                   ('nation', self.nations)):
+            column_codes = pd.Categorical(df[column], categories=categories).codes
+            if (column_codes < 0).any():
+                return None
+            codes.append(column_codes.astype(np.int32))
+        la_codes, bt_codes, nation_codes = codes
+
+        new_years = np.sort(df['year'].unique())
+        years = np.concatenate([np.asarray(self.years, dtype=np.int64), new_years])
+        year_codes = np.searchsorted(years, df['year'].to_numpy()).astype(np.int32)
+        order = np.lexsort((la_codes, year_codes, bt_codes))
+
+        # Urutan stabil per benefit_type: tahun baru selalu setelah tahun lama
+        merge = np.argsort(np.concatenate([self.bt_codes, bt_codes[order]]), kind='stable')
+        values = df['value_total'].to_numpy(dtype=np.float64)
+        arrays = [
+            np.concatenate([old, new[order]])[merge]
+            for old, new in ((self.la_codes, la_codes), (self.bt_codes, bt_codes),
+                             (self.year_codes, year_codes), (self.nation_codes, nation_codes),
+                             (self.values, values))
+        ]
+        return DataIndex(self.local_authorities, self.benefit_types, self.nations, years.tolist(), *arrays)
+
+    @property
+    def frame(self):
+        """DataFrame terurut, dibangun dari array kode jika belum ada"""
+        if self._frame is None:
+            import pandas as pd
+            self._frame = pd.DataFrame({
+                'local_authority': np.asarray(self.local_authorities, dtype=object)[self.la_codes],
+                'nation': np.asarray(self.nations, dtype=object)[self.nation_codes],
+                'year': np.asarray(self.years, dtype=np.int64)[self.year_codes],
+                'co_benefit_type': np.asarray(self.benefit_types, dtype=object)[self.bt_codes],
+                'value_total': np.array(self.values, dtype=np.float64)
+            })
+        return self._frame
+
+    def _build_offsets(self):
+        """Hitung offset grup (benefit_type, year) dan permutasi local_authority"""
+        n_years = len(self.years)
+        group_keys = self.bt_codes.astype(np.int64) * n_years + self.year_codes
+        self._group_offsets = np.searchsorted(
+            group_keys, np.arange(len(self.benefit_types) * n_years + 1)
+        )
+
+        self._la_order = np.lexsort((self.bt_codes, self.year_codes, self.la_codes))
+        self._la_offsets = np.searchsorted(
+            self.la_codes[self._la_order], np.arange(len(self.local_authorities) + 1)
+        )
+
+        self._la_lookup = {name: i for i, name in enumerate(self.local_authorities)}
+        self._bt_lookup = {name: i for i, name in enumerate(self.benefit_types)}
+        self._year_lookup = {year: i for i, year in enumerate(self.years)}
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def group_offsets(self):
+        """Offset baris awal setiap grup (benefit_type, year), ditambah total baris di akhir"""
+        return self._group_offsets
+
+    def la_code(self, local_authority):
+        """Kode integer untuk local_authority, atau None jika tidak ada"""
+        return self._la_lookup.get(local_authority)
+
+    def bt_code(self, benefit_type):
+        """Kode integer untuk benefit_type, atau None jika tidak ada"""
+        return self._bt_lookup.get(benefit_type)
+
+    def year_code(self, year):
+        """Kode integer untuk tahun, atau None jika tidak ada"""
+        return self._year_lookup.get(year)
+
+    def labels(self, column, codes):
+        """Kolom kategori (pd.Categorical) dari kode untuk local_authority, nation atau co_benefit_type"""
+        import pandas as pd
+        dtype = self._dtypes.get(column)
+        if dtype is None:
+            categories = {
+                'local_authority': self.local_authorities,
+                'nation': self.nations,
+                'co_benefit_type': self.benefit_types
+            }[column]
+            dtype = self._dtypes[column] = pd.CategoricalDtype(categories)
+        return pd.Categorical.from_codes(codes, dtype=dtype)
+
+    def group_slice(self, benefit_type, year):
+        """Rentang baris untuk (benefit_type, year), terurut per local_authority"""
+        b = self.bt_code(benefit_type)
+        y = self.year_code(year)
+        if b is None or y is None:
+            return slice(0, 0)
+        g = b * len(self.years) + y
+        return slice(int(self._group_offsets[g]), int(self._group_offsets[g + 1]))
+
+    def benefit_slice(self, benefit_type, year_start=None, year_end=None):
+        """Rentang baris untuk satu benefit_type, opsional dibatasi rentang tahun"""
+        b = self.bt_code(benefit_type)
+        if b is None:
+            return slice(0, 0)
+        n_years = len(self.years)
+        y0 = 0 if year_start is None else int(np.searchsorted(self.years, year_start, side='left'))
+        y1 = n_years if year_end is None else int(np.searchsorted(self.years, year_end, side='right'))
+        if y1 <= y0:
+            return slice(0, 0)
+        return slice(
+            int(self._group_offsets[b * n_years + y0]),
+            int(self._group_offsets[b * n_years + y1])
+        )
+
+    def year_positions(self, year):
+        """Posisi baris untuk satu tahun di semua benefit_type"""
+        slices = [self.group_slice(bt, year) for bt in self.benefit_types]
+        return np.concatenate([np.arange(s.start, s.stop) for s in slices])
+
+    def la_positions(self, local_authority):
+        """Posisi baris untuk satu local_authority, terurut per (year, benefit_type)"""
+        code = self.la_code(local_authority)
+        if code is None:
+            return self._la_order[0:0]
+        return self._la_order[self._la_offsets[code]:self._la_offsets[code + 1]]
+
@@ -2,11 +2,64 @@
 Data Loader Model
 Menangani loading dan caching data dari CSV dan GeoJSON
 """
-import pandas as pd
+import numpy as np
+import io
 import json
+import hashlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
 from functools import lru_cache
 from config import Config
+from models.data_index import DataIndex
+from models.data_cube import DataCube
+from models.data_cache import DataCache, file_digest, file_digests
+from models.geojson_blob import GeoJSONBlob, write_atomic
+from models import geometry
+from models.tiles import TileIndex
+from models.spatial_index import SpatialIndex
+from models.single_flight import SingleFlight, coalesced
+from models.metrics import Metrics
+from models.query_backend import BACKENDS, MemoryBackend, SQLiteBackend
+from models.correlation import CorrelationStats, METHODS as CORRELATION_METHODS
+from models.summary_stats import SummaryStats
+from models import comparison
+from models import validation
+
+logger = logging.getLogger(__name__)
+
+
+class Dataset:
+    """Semua data yang dimuat dari satu versi file CSV dan GeoJSON
+    
+    Atributnya diisi secara lazy oleh DataLoader. Saat reload, dataset baru
+    dibangun lengkap lalu menggantikan yang lama dalam satu assignment;
+    request yang sedang berjalan tetap memakai dataset lamanya sampai selesai.
+    """
+    
+    def __init__(self, sources):
+        """Initialize dataset kosong; sources = (mtime_ns, size) file data saat dibuat"""
+        self.sources = sources
+        self.index = None
+        self.cube = None
+        self.correlation = None
+        self.summary_stats = None
+        self.metadata = None
+        self.backend = None
+        self.geojson = None
+        self.geojson_blobs = {}
+        self.topology = None
+        self.tile_index = None
+        self.spatial_index = None
+        self.version_info = None
+        
+        # Pemanggilan bersamaan yang identik (load data, query berat) dihitung
+        # sekali per dataset, sehingga hasil dari versi lain tidak tertukar
+        self.single_flight = SingleFlight()
 
 
 class DataLoader:
@@ -15,27 +68,597 @@ class DataLoader:
     def __init__(self):
         """Initialize data loader dengan path dari config"""
         self.config = Config
-        self._data = None
-        self._geojson = None
+        self._dataset = Dataset(self._source_stats())
+        self._pinned = threading.local()
+        
+        # Reload (watcher atau manual) berjalan satu per satu
+        self._reload_lock = threading.Lock()
+        self._reload_listeners = []
+        self._failed_sources = None
+        self._watcher = None
+        self._watch_enabled = True
+        self._fork_hook = False
+        
+        # Durasi per fase (load, filter, aggregate, to_dict) untuk /metrics
+        self.metrics = Metrics()
+    
+    @property
+    def dataset(self):
+        """Dataset yang dipakai thread ini (yang di-pin, atau versi terbaru)"""
+        return getattr(self._pinned, 'dataset', None) or self._dataset
+    
+    @property
+    def _single_flight(self):
+        return self.dataset.single_flight
+    
+    def pin(self):
+        """Pakai dataset saat ini untuk semua akses dari thread ini sampai unpin()
+        
+        Pin bertingkat (mis. sub-request /api/batch) memakai dataset yang sudah
+        di-pin, dan unpin() mengembalikan pin sebelumnya.
+        """
+        pins = self._pinned.__dict__.setdefault('pins', [])
+        pins.append(getattr(self._pinned, 'dataset', None))
+        self._pinned.dataset = self.dataset
+    
+    def unpin(self):
+        """Lepas dataset yang di-pin oleh pin() terakhir"""
+        pins = getattr(self._pinned, 'pins', None)
+        self._pinned.dataset = pins.pop() if pins else None
+    
+    @contextmanager
+    def snapshot(self):
+        """Semua akses data di dalam blok memakai versi dataset yang sama"""
+        with self._use(self.dataset) as dataset:
+            yield dataset
+    
+    @contextmanager
+    def batch(self):
+        """Snapshot dengan memo hasil antara: query dalam blok berbagi potongan data yang sama"""
+        previous = getattr(self._pinned, 'memo', None)
+        self._pinned.memo = {}
+        try:
+            with self.snapshot() as dataset:
+                yield dataset
+        finally:
+            self._pinned.memo = previous
+    
+    def _memo(self, key, fn):
+        """fn() yang di-memo selama blok batch(), atau langsung dihitung di luar batch"""
+        memo = getattr(self._pinned, 'memo', None)
+        if memo is None:
+            return fn()
+        if key not in memo:
+            memo[key] = fn()
+        return memo[key]
+    
+    @contextmanager
+    def _use(self, dataset):
+        previous = getattr(self._pinned, 'dataset', None)
+        self._pinned.dataset = dataset
+        try:
+            yield dataset
+        finally:
+            self._pinned.dataset = previous
+    
+    def _lazy(self, attr, loader):
+        """Nilai atribut lazy dataset; thread yang datang bersamaan hanya memuat sekali"""
+        dataset = self.dataset
+        value = getattr(dataset, attr)
+        if value is None:
+            def load():
+                current = getattr(dataset, attr)
+                if current is None:
+                    timer = self.metrics.timer('load')
+                    current = loader()
+                    timer.mark(attr)
+                    setattr(dataset, attr, current)
+                return current
+            value = dataset.single_flight.do(attr, load)
+        return value
+    
+    @property
+    def index(self):
+        """Index kolumnar dari data CSV dengan caching"""
+        return self._lazy('index', self._load_index)
+    
+    @property
+    def version(self):
+        """Versi dataset (digest CSV dan GeoJSON) untuk cache respons dan ETag"""
+        return self._lazy('version_info', self._compute_version)[0]
+    
+    @property
+    def last_modified(self):
+        """Waktu modifikasi terakhir file data (untuk header Last-Modified)"""
+        return self._lazy('version_info', self._compute_version)[1]
+    
+    @property
+    def cube(self):
+        """Cube agregat local_authority x year x benefit_type dengan caching"""
+        return self._lazy('cube', lambda: DataCube(self.index))
+    
+    @property
+    def correlation(self):
+        """Statistik korelasi per (nation, year) dari cube dengan caching"""
+        return self._lazy('correlation', self._load_correlation)
+    
+    @property
+    def summary_stats(self):
+        """Statistik ringkasan dan class breaks per (benefit_type, year) dengan caching"""
+        return self._lazy('summary_stats', self._load_summary_stats)
+    
+    @property
+    def metadata(self):
+        """Daftar tahun, local_authority, benefit_type dan nation (dari engine query) dengan caching"""
+        return self._lazy('metadata', lambda: self.backend.metadata())
+    
+    @property
+    def ready(self):
+        """True jika versi dataset sudah dihitung (tanpa memicu load data)"""
+        return self.dataset.version_info is not None
+    
+    @property
+    def backend(self):
+        """Engine query untuk map, heatmap, top-areas dan aggregated-data (Config.QUERY_BACKEND)"""
+        return self._lazy('backend', self._load_backend)
     
     @property
     def data(self):
-        """Load data CSV dengan caching"""
-        if self._data is None:
-            self._data = self._load_csv_data()
-        return self._data
+        """Load data CSV dengan caching (terurut per benefit_type, year, local_authority)"""
+        return self.index.frame
     
     @property
     def geojson(self):
         """Load GeoJSON dengan caching"""
-        if self._geojson is None:
-            self._geojson = self._load_geojson()
-        return self._geojson
+        return self._lazy('geojson', self._load_geojson)
+    
+    @property
+    def geojson_blob(self):
+        """GeoJSON resolusi penuh yang sudah diserialisasi dan dikompresi"""
+        return self.get_geojson_blob()
+    
+    def get_geojson_blob(self, level='full', fmt='geojson'):
+        """GeoJSON/TopoJSON untuk level simplifikasi tertentu, dengan caching"""
+        key = (level, fmt)
+        blob = self.dataset.geojson_blobs.get(key)
+        if blob is None:
+            if fmt not in geometry.FORMATS or (level != 'full' and level not in self.config.GEOMETRY_LEVELS):
+                raise ValueError(f"Unknown geometry level/format: {level}/{fmt}")
+            blob = self._single_flight.do(('geojson_blob',) + key, self._load_geojson_blob, level, fmt)
+        return blob
+    
+    def _load_geojson_blob(self, level, fmt):
+        """Load dan simpan blob untuk (level, fmt) di cache"""
+        key = (level, fmt)
+        blobs = self.dataset.geojson_blobs
+        if key not in blobs:
+            try:
+                blobs[key] = self._read_geojson_blob(level, fmt)
+            except ValueError:
+                raise
+            except Exception as e:
+                raise ValueError(f"Error loading GeoJSON: {str(e)}")
+        return blobs[key]
+    
+    def _read_geojson_blob(self, level, fmt):
+        """Baca blob dari file (sumber atau turunan), bangun file turunan jika usang"""
+        source = Path(self.config.GEOJSON_FILE)
+        write = self.config.GEOJSON_PRECOMPRESS_TO_DISK
+        if level == 'full' and fmt == 'geojson':
+            return GeoJSONBlob.load(source, write_sidecars=write)
+        
+        path = geometry.level_path(source, level, fmt)
+        if path.exists() and path.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+            return GeoJSONBlob.load(path, write_sidecars=write)
+        
+        outputs = self.build_geometry_levels()
+        if path.exists() and path.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+            return GeoJSONBlob.load(path, write_sidecars=write)
+        # Direktori data read-only: simpan hasil build di memori saja
+        return GeoJSONBlob.from_bytes(outputs[(level, fmt)])
+    
+    @property
+    def topology(self):
+        """Topologi arc bersama dari GeoJSON dengan caching"""
+        return self._lazy('topology', lambda: geometry.Topology.from_geojson(
+            self.geojson, self.config.GEOMETRY_QUANTIZATION
+        ))
+    
+    @property
+    def tile_index(self):
+        """Pemotong tile untuk /api/tiles dengan caching"""
+        return self._lazy('tile_index', lambda: TileIndex(
+            self.topology,
+            self.config.MATCHING_PROPERTY,
+            self.config.TILE_CLIP_CACHE_SIZE
+        ))
+    
+    @property
+    def spatial_index(self):
+        """R-tree batas wilayah untuk locate dan query bounding box dengan caching"""
+        return self._lazy('spatial_index', lambda: SpatialIndex(
+            self.topology,
+            self.config.MATCHING_PROPERTY,
+            self.config.SPATIAL_INDEX_NODE_CAPACITY
+        ))
+    
+    def tile_path(self, z, x, y, year, benefit_type):
+        """Path tile pre-render untuk versi dataset saat ini
+        
+        benefit_type berasal dari query string: hanya benefit type dataset yang
+        diterima, dan path hasilnya harus tetap berada di dalam TILE_DIR.
+        """
+        if benefit_type not in self.metadata['benefit_types']:
+            raise ValueError(f"Unknown benefit_type: {benefit_type}")
+        root = Path(self.config.TILE_DIR).resolve()
+        path = (root / self.version / benefit_type / str(int(year)) /
+                str(int(z)) / str(int(x)) / f'{int(y)}.json').resolve()
+        if not path.is_relative_to(root):
+            raise ValueError(f"Invalid tile path: {benefit_type}")
+        return path
+    
+    @coalesced
+    def build_geometry_levels(self):
+        """Bangun dan tulis semua file geometri tersimpel di samping file GeoJSON"""
+        levels = {name: level['tolerance'] for name, level in self.config.GEOMETRY_LEVELS.items()}
+        outputs = geometry.build_levels(self.topology, levels)
+        for (level, fmt), body in outputs.items():
+            write_atomic(geometry.level_path(self.config.GEOJSON_FILE, level, fmt), body)
+        return outputs
+    
+    def warm_up(self):
+        """Muat dan siapkan semua data sebelum melayani request
+        
+        Dipanggil sekali di proses master (gunicorn --preload) sehingga worker
+        hasil fork memakai hasilnya tanpa memuat ulang. Data query disimpan
+        dalam buffer NumPy (atau mmap dari DataCache) yang tidak ditulisi oleh
+        reference counting, sehingga halamannya tetap dibagi copy-on-write.
+        Mengembalikan dict nama langkah -> durasi (detik).
+        """
+        timings = {}
+        
+        def step(name, fn):
+            start = time.perf_counter()
+            fn()
+            timings[name] = time.perf_counter() - start
+        
+        if self.config.QUERY_BACKEND == 'memory':
+            step('index', lambda: self.index)
+            step('cube', lambda: self.cube)
+            step('correlation', lambda: self.correlation)
+        step('backend', lambda: self.backend)
+        step('summary_stats', lambda: self.summary_stats)
+        step('metadata', lambda: self.metadata)
+        step('version', lambda: self.version)
+        if Path(self.config.GEOJSON_FILE).exists():
+            step('geojson', lambda: [self.get_geojson_blob(level) for level in ['full', *self.config.GEOMETRY_LEVELS]])
+            step('tiles', lambda: self.tile_index)
+            step('spatial_index', lambda: self.spatial_index)
+            # Dict hasil parse GeoJSON (jutaan objek Python) hanya dibutuhkan untuk
+            # membangun blob dan topologi; dilepas agar tidak ikut ter-copy di worker
+            self.dataset.geojson = None
+        return timings
+    
+    def add_reload_listener(self, listener):
+        """Panggil listener(version) setiap kali dataset baru dipasang oleh reload"""
+        self._reload_listeners.append(listener)
+    
+    def reload(self):
+        """Muat ulang file data yang berubah lalu tukar dataset secara atomik
+        
+        Dataset baru dibangun lengkap (termasuk warm-up) di thread pemanggil,
+        bukan di jalur request. Bagian yang filenya tidak berubah dipakai
+        ulang; jika CSV hanya bertambah baris tahun baru di akhir file, index
+        dan cube diperluas tanpa parse ulang seluruh CSV. Mengembalikan mode
+        reload (mis. 'csv', 'append', 'append+geojson'), atau None jika tidak ada
+        perubahan.
+        """
+        with self._reload_lock:
+            old = self._dataset
+            sources = self._source_stats()
+            if sources == old.sources or sources == self._failed_sources:
+                return None
+            
+            timer = self.metrics.timer('reload')
+            new = Dataset(sources)
+            changes = []
+            try:
+                if sources['csv'] == old.sources['csv']:
+                    new.index, new.cube, new.backend = old.index, old.cube, old.backend
+                    new.correlation, new.summary_stats = old.correlation, old.summary_stats
+                    new.metadata = old.metadata
+                elif old.index is not None and old.sources['csv'] is not None:
+                    new.index = self._load_appended_index(old.index, old.sources['csv'][1])
+                    if new.index is old.index:
+                        new.cube, new.backend, new.correlation = old.cube, old.backend, old.correlation
+                        new.summary_stats, new.metadata = old.summary_stats, old.metadata
+                    elif new.index is not None and old.cube is not None:
+                        new.cube = old.cube.extended(new.index)
+                if sources['csv'] != old.sources['csv']:
+                    changes.append('csv' if new.index is None else 'touch' if new.index is old.index else 'append')
+                
+                if sources['geojson'] == old.sources['geojson']:
+                    new.geojson_blobs = dict(old.geojson_blobs)
+                    new.topology, new.tile_index = old.topology, old.tile_index
+                    new.spatial_index = old.spatial_index
+                else:
+                    changes.append('geojson')
+                mode = '+'.join(changes)
+                
+                with self._use(new):
+                    self.warm_up()
+            except Exception:
+                # Dataset lama tetap dipakai; file yang sama tidak dicoba ulang
+                self._failed_sources = sources
+                self.metrics.inc('dataset_reloads_total', mode='+'.join(changes), result='error')
+                logger.exception('Reload data gagal, tetap memakai versi %s', old.version_info and old.version_info[0])
+                return None
+            timer.mark(mode)
+            
+            self._dataset = new
+            self._failed_sources = None
+            self.metrics.inc('dataset_reloads_total', mode=mode, result='ok')
+            logger.info('Dataset diganti ke versi %s (%s)', new.version_info[0], mode)
+        
+        if old.version_info is None or old.version_info[0] != new.version_info[0]:
+            for listener in self._reload_listeners:
+                listener(new.version_info[0])
+        return mode
+    
+    def start_watcher(self, interval=None):
+        """Jalankan thread daemon yang memanggil reload() saat file data berubah
+        
+        File diperiksa (os.stat) setiap `interval` detik. Perubahan baru
+        dimuat setelah ukuran dan mtime-nya sama pada dua pemeriksaan
+        berturut-turut, agar file yang sedang disalin tidak terbaca setengah.
+        Di proses hasil fork (worker gunicorn --preload) watcher dijalankan ulang,
+        kecuali di worker process pool (lihat reset_after_fork).
+        """
+        interval = interval or self.config.DATA_RELOAD_INTERVAL
+        if not interval or not self._watch_enabled or (
+                self._watcher is not None and self._watcher.is_alive()):
+            return
+        
+        def watch():
+            pending = None
+            while True:
+                time.sleep(interval)
+                if self._watcher is not threading.current_thread():
+                    return
+                try:
+                    sources = self._source_stats()
+                    if sources == self._dataset.sources:
+                        pending = None
+                    elif sources == pending:
+                        self.reload()
+                    else:
+                        pending = sources
+                except Exception:
+                    logger.exception('Watcher data gagal')
+        
+        self._watcher = threading.Thread(target=watch, name='data-watcher', daemon=True)
+        self._watcher.start()
+        if not self._fork_hook:
+            self._fork_hook = True
+            os.register_at_fork(after_in_child=lambda: self._restart_watcher(interval))
+    
+    def _restart_watcher(self, interval):
+        # Thread tidak ikut ter-fork; di proses anak watcher dibuat ulang
+        if self._watcher is not None:
+            self._watcher = None
+            self.start_watcher(interval)
+    
+    def reset_after_fork(self):
+        """Lepas pin, lock dan komputasi milik thread proses induk (worker process pool)
+        
+        Fork hanya menyalin thread pemanggil: pin dataset-nya ikut tersalin dan
+        lock atau single-flight yang sedang dipegang thread lain tidak akan
+        pernah dilepas di proses anak. Watcher yang dibuat ulang oleh hook fork
+        dihentikan: worker hanya me-reload saat task membawa versi dataset baru.
+        """
+        self._watch_enabled = False
+        self._watcher = None
+        self._pinned = threading.local()
+        self._reload_lock = threading.Lock()
+        self._dataset.single_flight = SingleFlight()
+        self.metrics = Metrics()
+    
+    def _source_stats(self):
+        """(mtime_ns, size) file CSV dan GeoJSON, None jika file tidak ada"""
+        stats = {}
+        for name, path in (('csv', self.config.CSV_FILE), ('geojson', self.config.GEOJSON_FILE)):
+            try:
+                stat = os.stat(path)
+                stats[name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stats[name] = None
+        return stats
+    
+    def _load_appended_index(self, old_index, old_size):
+        """Index baru jika CSV hanya bertambah baris di akhir file, selain itu None
+        
+        Awal file harus identik dengan isi yang menghasilkan old_index (dicek
+        dengan sha256) dan baris baru hanya berisi tahun setelah tahun terakhir;
+        hanya baris baru yang di-parse. Hasilnya disimpan ke binary cache.
+        Jika isi file tidak berubah (hanya disentuh) old_index dikembalikan.
+        """
+        path = Path(self.config.CSV_FILE)
+        prefix_digest, digest = file_digests(path, old_size)
+        if digest == old_index.source_digest:
+            return old_index
+        if prefix_digest is None or prefix_digest != old_index.source_digest:
+            return None
+        
+        with open(path, 'rb') as f:
+            header = f.readline()
+            f.seek(old_size - 1)
+            if f.read(1) != b'\n':
+                return None
+            tail = f.read()
+        try:
+            import pandas as pd
+            df = pd.read_csv(io.BytesIO(header + tail))
+            df['year'] = df['year'].astype(int)
+            df['value_total'] = df['value_total'].astype(float)
+        except Exception:
+            return None
+        
+        index = old_index.appended(df)
+        if index is None:
+            return None
+        index.source_digest = digest
+        # Skema baris baru sudah lolos konversi tipe di atas; cek ulang index gabungan
+        self._finish_validation(self._validation_report(), index)
+        if self.config.DATA_CACHE_ENABLED:
+            try:
+                DataCache(self.config.DATA_CACHE_DIR).save(path, index)
+            except OSError:
+                pass
+        return index
+    
+    def _compute_version(self):
+        """Hitung versi dataset dan waktu modifikasi terakhir file data"""
+        key = [self.backend.source_digest or '-']
+        mtimes = [Path(self.config.CSV_FILE).stat().st_mtime]
+        geojson_file = Path(self.config.GEOJSON_FILE)
+        if geojson_file.exists():
+            stat = geojson_file.stat()
+            key.append(f'{stat.st_mtime_ns}-{stat.st_size}')
+            mtimes.append(stat.st_mtime)
+        version = hashlib.sha256(':'.join(key).encode('utf-8')).hexdigest()[:16]
+        return version, datetime.fromtimestamp(max(mtimes), tz=timezone.utc)
+    
+    def _load_correlation(self):
+        """Bangun statistik korelasi; nation setiap local_authority diambil dari index"""
+        return CorrelationStats(self.cube, self._la_nations())
+    
+    def _la_nations(self):
+        """Kode nation untuk setiap kode local_authority"""
+        index = self.index
+        la_nations = np.zeros(len(index.local_authorities), dtype=np.int64)
+        la_nations[index.la_codes] = index.nation_codes
+        return la_nations
+    
+    def _load_summary_stats(self):
+        """Hitung statistik ringkasan; dengan engine SQLite index dan cube tidak disimpan di dataset"""
+        index = self.dataset.index or self._load_index()
+        return SummaryStats(index, self.dataset.cube or DataCube(index), self.config.CLASS_BREAKS_COUNT)
+    
+    def _load_backend(self):
+        """Buat engine query; untuk SQLite, bangun file database per versi CSV jika belum ada"""
+        name = self.config.QUERY_BACKEND
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown query backend: {name}")
+        if name == 'memory':
+            return MemoryBackend(self.index, self.cube)
+        
+        csv_file = Path(self.config.CSV_FILE)
+        cache_dir = Path(self.config.DATA_CACHE_DIR)
+        try:
+            digest = DataCache(cache_dir).digest(csv_file)
+        except OSError as e:
+            raise ValueError(f"Error loading CSV data: {str(e)}")
+        filename = f'{csv_file.stem}-{{}}-v{SQLiteBackend.SCHEMA_VERSION}.sqlite'
+        path = cache_dir / filename.format(digest[:16])
+        if not path.exists():
+            # Index dan cube hanya dibutuhkan untuk build, tidak disimpan di dataset
+            index = self.dataset.index or self._load_index()
+            path = cache_dir / filename.format(index.source_digest[:16])
+            SQLiteBackend.build(path, index, self.dataset.cube or DataCube(index))
+            for stale in cache_dir.glob(f'{csv_file.stem}-*.sqlite'):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+        return SQLiteBackend(path)
+    
+    def _load_index(self):
+        """Load index dari binary cache, atau parse CSV lalu simpan ke cache"""
+        if not self.config.DATA_CACHE_ENABLED:
+            return self._parse_index()
+        
+        cache = DataCache(self.config.DATA_CACHE_DIR)
+        try:
+            index = cache.load(self.config.CSV_FILE)
+        except OSError:
+            index = None
+        if index is not None:
+            return index
+        
+        index = self._parse_index()
+        try:
+            cache.save(self.config.CSV_FILE, index)
+        except OSError:
+            # Cache hanya optimasi; direktori read-only tidak boleh menggagalkan load
+            pass
+        return index
+    
+    def _parse_index(self):
+        """Parse CSV dan bangun index beserta digest file sumbernya"""
+        try:
+            digest = file_digest(self.config.CSV_FILE)
+        except OSError as e:
+            raise ValueError(f"Error loading CSV data: {str(e)}")
+        report = self._validation_report()
+        try:
+            index = DataIndex.from_frame(self._load_csv_data(report))
+        except ValueError:
+            self._finish_validation(report)
+            raise
+        index.source_digest = digest
+        self._finish_validation(report, index)
+        return index
+    
+    def _validation_report(self):
+        """Laporan validasi baru untuk file data saat ini, atau None jika Config.DATA_VALIDATION 'off'"""
+        if self.config.DATA_VALIDATION not in validation.MODES:
+            raise ValueError(f"Unknown data validation mode: {self.config.DATA_VALIDATION}")
+        if self.config.DATA_VALIDATION == 'off':
+            return None
+        return validation.ValidationReport({'csv': self.config.CSV_FILE, 'geojson': self.config.GEOJSON_FILE})
+    
+    def _finish_validation(self, report, index=None):
+        """Jalankan cek index dan GeoJSON, tulis laporan, dan gagalkan load di mode strict
+        
+        Dipanggil setiap kali CSV di-parse penuh atau ditambah baris (bukan
+        saat index dimuat dari binary cache, yang isinya sudah divalidasi),
+        sebelum index disimpan ke cache.
+        """
+        if report is None:
+            return
+        if index is not None:
+            validation.check_index(index, report, self.config.VALIDATION_VALUE_RANGES,
+                                   self.config.VALIDATION_OUTLIER_IQR)
+            geojson = self._geojson_for_validation()
+            if geojson is not None:
+                validation.check_geojson(geojson, index, self.config.MATCHING_PROPERTY, report)
+        
+        if not write_atomic(Path(self.config.VALIDATION_REPORT_FILE), report.to_json()):
+            logger.warning('Laporan validasi tidak bisa ditulis ke %s', self.config.VALIDATION_REPORT_FILE)
+        for issue in report.issues:
+            log = logger.error if issue['severity'] == 'error' else logger.warning
+            log('Validasi data: %s (%s): %s', issue['check'], issue['count'], issue['message'])
+        
+        if not report.valid and self.config.DATA_VALIDATION == 'strict':
+            raise ValueError(f"Data validation failed with {len(report.errors)} errors, "
+                             f"see {self.config.VALIDATION_REPORT_FILE}")
     
-    def _load_csv_data(self):
-        """Load data dari CSV file"""
+    def _geojson_for_validation(self):
+        """GeoJSON dataset aktif jika sudah di-parse, selain itu dibaca dari file (None jika tidak ada)"""
+        geojson = self.dataset.geojson
+        if geojson is None and Path(self.config.GEOJSON_FILE).exists():
+            geojson = self._load_geojson()
+        return geojson
+    
+    def _load_csv_data(self, report=None):
+        """Load data dari CSV file; skema dan tipe data mentah dicek ke report jika ada"""
+        # pandas dimuat saat pertama kali dibutuhkan, bukan saat aplikasi start
+        import pandas as pd
         try:
             df = pd.read_csv(self.config.CSV_FILE)
+            if report is not None:
+                # Key kosong atau tipe salah merusak index: selalu menggagalkan load
+                validation.check_schema(df, report)
+                if not report.valid:
+                    raise ValueError('; '.join(issue['message'] for issue in report.errors))
             # Ensure data types
             df['year'] = df['year'].astype(int)
             df['value_total'] = df['value_total'].astype(float)
@@ -53,137 +676,392 @@ class DataLoader:
     
     def get_local_authorities(self):
         """Get list of unique local authorities"""
-        return sorted(self.data['local_authority'].unique().tolist())
+        return list(self.metadata['local_authorities'])
     
     def get_nations(self):
         """Get list of unique nations"""
-        return sorted(self.data['nation'].unique().tolist())
+        return list(self.metadata['nations'])
     
     def get_years(self):
         """Get list of available years"""
-        return sorted(self.data['year'].unique().tolist())
+        return list(self.metadata['years'])
     
     def get_benefit_types(self):
         """Get list of benefit types"""
-        return sorted(self.data['co_benefit_type'].unique().tolist())
+        return list(self.metadata['benefit_types'])
     
-    def get_data_for_map(self, year, benefit_type):
-        """Get data formatted for map visualization"""
-        filtered = self.data[
-            (self.data['year'] == year) &
-            (self.data['co_benefit_type'] == benefit_type)
-        ]
+    def get_data_for_map(self, year, benefit_type, columnar=False, bbox=None):
+        """Get data formatted for map visualization
         
-        # Group by local_authority and sum values
-        aggregated = filtered.groupby('local_authority')['value_total'].sum().reset_index()
-        aggregated.columns = ['local_authority', 'value']
+        bbox (lon_min, lat_min, lon_max, lat_max) membatasi hasil ke local
+        authority yang batasnya terlihat di viewport tersebut.
+        """
+        backend = self.backend
+        timer = self.metrics.timer('get_data_for_map')
+        # Nilai per local_authority sudah dijumlahkan di cube
+        columns = self._memo(('map_data', year, benefit_type), lambda: backend.map_data(year, benefit_type))
+        if bbox is not None:
+            visible = np.isin(np.asarray(columns['local_authority'], dtype=object), self.get_areas_in_bbox(bbox))
+            columns = {name: column[visible] for name, column in columns.items()}
+        timer.mark('filter')
         
-        return aggregated.to_dict('records')
+        data = _table(columns, columnar)
+        timer.mark('to_dict')
+        return data
     
-    def get_data_for_chart(self, local_authority, benefit_types=None):
+    def get_data_for_chart(self, local_authority, benefit_types=None, columnar=False):
         """Get time series data for charts"""
-        # Filter by local authority
-        filtered = self.data[self.data['local_authority'] == local_authority]
+        index = self.index
+        timer = self.metrics.timer('get_data_for_chart')
+        la = index.la_code(local_authority)
+        if la is None:
+            return _table({'year': []}, columnar)
         
         # Filter by benefit types if provided
+        bt_codes = np.arange(len(index.benefit_types))
         if benefit_types:
-            filtered = filtered[filtered['co_benefit_type'].isin(benefit_types)]
+            bt_codes = bt_codes[np.isin(index.benefit_types, benefit_types)]
         
-        # Pivot data untuk format chart
-        pivoted = filtered.pivot_table(
-            index='year',
-            columns='co_benefit_type',
-            values='value_total',
-            aggfunc='sum'
-        ).reset_index()
+        # Matriks year x benefit_type untuk local authority ini
+        present = self.cube.present[la][:, bt_codes]
+        rows = np.flatnonzero(present.any(axis=1))
+        cols = np.flatnonzero(present.any(axis=0))
+        if len(rows) == 0:
+            return _table({'year': []}, columnar)
         
-        return pivoted.to_dict('records')
-    
-    def get_correlation_data(self, year=None):
-        """Get correlation matrix between benefit types"""
-        df = self.data.copy()
+        # Satu baris per benefit_type agar setiap kolom hasil bersebelahan di memori
+        matrix = np.where(present, self.cube.values[la][:, bt_codes], np.nan)[np.ix_(rows, cols)].T.copy()
+        columns = [index.benefit_types[b] for b in bt_codes[cols].tolist()]
+        timer.mark('filter')
         
-        if year:
-            df = df[df['year'] == year]
+        data = _table({'year': [index.years[y] for y in rows.tolist()], **dict(zip(columns, matrix))}, columnar)
+        timer.mark('to_dict')
+        return data
+    
+    @coalesced
+    def get_correlation_data(self, year=None, method='pearson', year_start=None, year_end=None, group_by=None):
+        """Get correlation matrix between benefit types
         
-        # Pivot untuk mendapatkan benefit types sebagai kolom
-        pivot_df = df.pivot_table(
-            index=['local_authority', 'year'],
-            columns='co_benefit_type',
-            values='value_total',
-            aggfunc='sum'
-        ).reset_index()
+        Tahun dipilih dengan `year` atau rentang `year_start`/`year_end`
+        (default semua tahun). method 'pearson' (dari statistik cukup, tanpa
+        menyentuh baris) atau 'spearman'. group_by='nation' mengembalikan
+        matriks per nation: {nation: matriks}.
+        """
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Unknown correlation method: {method}")
+        stats = self.correlation
+        timer = self.metrics.timer('get_correlation_data')
         
-        # Calculate correlation
-        benefit_cols = [col for col in pivot_df.columns if col not in ['local_authority', 'year']]
-        corr_matrix = pivot_df[benefit_cols].corr()
+        if year:
+            y = self.index.year_code(year)
+            if y is None:
+                return {}
+            years = slice(y, y + 1)
+        else:
+            years = self.cube.year_range(year_start or None, year_end or None)
+        timer.mark('filter')
         
-        return corr_matrix.to_dict()
-    
-    def get_aggregated_data(self, group_by='nation'):
-        """Get aggregated data by nation or other grouping"""
         if group_by == 'nation':
-            aggregated = self.data.groupby(['nation', 'year', 'co_benefit_type'])['value_total'].sum().reset_index()
+            data = {
+                nation: self._correlation_matrix(stats, method, years, code)
+                for code, nation in enumerate(self.index.nations)
+            }
         else:
-            aggregated = self.data.groupby(['local_authority', 'year', 'co_benefit_type'])['value_total'].sum().reset_index()
+            data = self._correlation_matrix(stats, method, years)
+        timer.mark('aggregate')
+        return data
+    
+    def _correlation_matrix(self, stats, method, years, nations=slice(None)):
+        """Matriks korelasi sebagai {kolom: {baris: nilai}} untuk benefit type yang ada"""
+        cols = stats.present_columns(years, nations)
+        if len(cols) == 0:
+            return {}
+        matrix = getattr(stats, method)(years, nations)[np.ix_(cols, cols)]
+        names = [self.index.benefit_types[b] for b in cols.tolist()]
+        return {
+            column: dict(zip(names, matrix[:, j].tolist()))
+            for j, column in enumerate(names)
+        }
+    
+    @coalesced
+    def get_aggregated_data(self, group_by='nation', columnar=False, offset=0, limit=None):
+        """Get aggregated data by nation or other grouping
         
-        return aggregated.to_dict('records')
+        offset/limit membatasi hasil ke sebagian baris (paginasi); jumlah
+        seluruh baris tersedia lewat count_aggregated_data.
+        """
+        backend = self.backend
+        timer = self.metrics.timer('get_aggregated_data')
+        columns = backend.aggregated(group_by, offset, None if limit is None else offset + limit)
+        timer.mark('filter')
+        data = _table(columns, columnar)
+        timer.mark('to_dict')
+        return data
     
-    def get_summary_statistics(self):
-        """Get summary statistics for all benefit types"""
-        stats = {}
+    def count_aggregated_data(self, group_by='nation'):
+        """Jumlah baris hasil get_aggregated_data tanpa offset/limit"""
+        return self.backend.count_aggregated(group_by)
+    
+    def iter_aggregated_data(self, group_by='nation', chunk_size=None):
+        """Hasil get_aggregated_data sebagai generator potongan kolom (untuk streaming)"""
+        return self.backend.iter_aggregated(group_by, chunk_size or self.config.STREAM_CHUNK_ROWS)
+    
+    def iter_rows(self, benefit_types=None, nations=None, local_authorities=None,
+                  year_start=None, year_end=None, chunk_size=None):
+        """Baris mentah CSV yang lolos filter, sebagai iterator potongan kolom
         
-        for benefit_type in self.get_benefit_types():
-            benefit_data = self.data[self.data['co_benefit_type'] == benefit_type]['value_total']
-            stats[benefit_type] = {
-                'mean': float(benefit_data.mean()),
-                'median': float(benefit_data.median()),
-                'std': float(benefit_data.std()),
-                'min': float(benefit_data.min()),
-                'max': float(benefit_data.max())
-            }
+        Urutan baris (co_benefit_type, year, local_authority). Setiap potongan
+        berisi paling banyak chunk_size baris dan hanya potongan itu yang
+        dimaterialisasi, sehingga ekspor penuh tidak menyalin seluruh dataset.
+        """
+        index = self.index
+        chunk_size = chunk_size or self.config.STREAM_CHUNK_ROWS
         
-        return stats
-    
-    def get_trend_data(self, local_authority):
-        """Get trend data for a specific local authority"""
-        filtered = self.data[self.data['local_authority'] == local_authority]
+        # Filter kategori sebagai lookup table per kode; None berarti semua
+        def allowed(names, selected):
+            if not selected:
+                return None
+            return np.isin(np.asarray(names, dtype=object), list(selected))
+        bt_allowed = allowed(index.benefit_types, benefit_types)
+        nation_allowed = allowed(index.nations, nations)
+        la_allowed = allowed(index.local_authorities, local_authorities)
         
-        # Group by year and benefit_type
-        trend = filtered.groupby(['year', 'co_benefit_type'])['value_total'].sum().reset_index()
+        # Baris sudah terurut per (benefit_type, year): rentang tahun dan
+        # benefit type dipilih sebagai rentang baris tanpa memindai semuanya
+        ranges = []
+        for b, benefit_type in enumerate(index.benefit_types):
+            if bt_allowed is None or bt_allowed[b]:
+                rows = index.benefit_slice(benefit_type, year_start, year_end)
+                if rows.stop > rows.start:
+                    ranges.append(rows)
         
-        return trend.to_dict('records')
+        years = np.asarray(index.years, dtype=np.int64)
+        
+        def chunks():
+            for rows in ranges:
+                for start in range(rows.start, rows.stop, chunk_size):
+                    chunk = slice(start, min(start + chunk_size, rows.stop))
+                    mask = np.ones(chunk.stop - chunk.start, dtype=bool)
+                    if nation_allowed is not None:
+                        mask &= nation_allowed[index.nation_codes[chunk]]
+                    if la_allowed is not None:
+                        mask &= la_allowed[index.la_codes[chunk]]
+                    positions = np.flatnonzero(mask) + chunk.start
+                    if len(positions):
+                        yield {
+                            'local_authority': index.labels('local_authority', index.la_codes[positions]),
+                            'nation': index.labels('nation', index.nation_codes[positions]),
+                            'year': years[index.year_codes[positions]],
+                            'co_benefit_type': index.labels('co_benefit_type', index.bt_codes[positions]),
+                            'value_total': index.values[positions]
+                        }
+        # Load dan validasi terjadi di sini, sebelum respons streaming dimulai
+        return chunks()
+    
+    def get_summary_statistics(self, year=None):
+        """Get summary statistics for all benefit types (semua tahun, atau satu tahun)"""
+        return self.summary_stats.summary(year)
     
-    def get_heatmap_data(self, benefit_type, year_start=None, year_end=None):
-        """Get data for heatmap visualization"""
-        filtered = self.data[self.data['co_benefit_type'] == benefit_type].copy()
+    def get_class_breaks(self, benefit_type, year=None, method='quantile'):
+        """Batas kelas choropleth untuk nilai peta benefit_type (satu tahun atau semua tahun)"""
+        return self.summary_stats.breaks(benefit_type, year, method)
+    
+    def get_trend_data(self, local_authority, columnar=False):
+        """Get trend data for a specific local authority"""
+        index = self.index
+        timer = self.metrics.timer('get_trend_data')
+        la = index.la_code(local_authority)
+        if la is None:
+            return _table({'year': [], 'co_benefit_type': [], 'value_total': []}, columnar)
         
-        if year_start:
-            filtered = filtered[filtered['year'] >= year_start]
-        if year_end:
-            filtered = filtered[filtered['year'] <= year_end]
+        # Sel (year, benefit_type) yang ada untuk local authority ini
+        present = self.cube.present[la]
+        year_codes, bt_codes = np.nonzero(present)
+        values = self.cube.values[la][present]
+        timer.mark('filter')
         
-        # Pivot for heatmap (local_authorities x years)
-        heatmap = filtered.pivot_table(
-            index='local_authority',
-            columns='year',
-            values='value_total',
-            aggfunc='sum'
-        ).fillna(0)
+        data = _table({
+            'year': [index.years[y] for y in year_codes.tolist()],
+            'co_benefit_type': index.labels('co_benefit_type', bt_codes),
+            'value_total': values
+        }, columnar)
+        timer.mark('to_dict')
+        return data
+    
+    @coalesced
+    def get_heatmap_data(self, benefit_type, year_start=None, year_end=None, columnar=False):
+        """Get data for heatmap visualization (columnar: `data` tetap berupa array NumPy)"""
+        backend = self.backend
+        timer = self.metrics.timer('get_heatmap_data')
+        # Matriks local_authorities x years dari cube
+        heatmap = backend.heatmap(benefit_type, year_start, year_end)
+        if heatmap is None:
+            return {'index': [], 'columns': [], 'data': []}
+        names, years, matrix = heatmap
+        timer.mark('filter')
         
-        return {
-            'index': heatmap.index.tolist(),
-            'columns': heatmap.columns.tolist(),
-            'data': heatmap.values.tolist()
+        data = {
+            'index': names,
+            'columns': years,
+            'data': matrix if columnar else matrix.tolist()
         }
+        timer.mark('to_dict')
+        return data
     
-    def get_top_areas(self, benefit_type, year, n=10, ascending=False):
+    @coalesced
+    def get_tile(self, z, x, y, year, benefit_type):
+        """Get tile GeoJSON (z/x/y) dengan nilai peta untuk year dan benefit_type"""
+        n = 2 ** z
+        if not (0 <= z <= self.config.TILE_MAX_ZOOM and 0 <= x < n and 0 <= y < n):
+            raise ValueError(f"Invalid tile: {z}/{x}/{y}")
+        
+        names, values = self.get_data_for_map(year, benefit_type, columnar=True)['data']
+        values = dict(zip(np.asarray(names).tolist(), values.tolist()))
+        timer = self.metrics.timer('get_tile')
+        tile = self.tile_index.render(z, x, y, values)
+        timer.mark('clip')
+        return tile
+    
+    def locate(self, lat, lon):
+        """Nama local_authority yang batasnya memuat titik (lat, lon), atau None"""
+        timer = self.metrics.timer('locate')
+        name = self.spatial_index.locate(lon, lat)
+        timer.mark('query')
+        return name
+    
+    def get_areas_in_bbox(self, bbox):
+        """Nama local_authority yang batasnya memotong bbox (lon_min, lat_min, lon_max, lat_max)"""
+        timer = self.metrics.timer('get_areas_in_bbox')
+        names = self.spatial_index.in_bbox(bbox)
+        timer.mark('query')
+        return names
+    
+    def get_top_areas(self, benefit_type, year, n=10, ascending=False, columnar=False):
         """Get top N areas for a specific benefit type and year"""
-        filtered = self.data[
-            (self.data['co_benefit_type'] == benefit_type) &
-            (self.data['year'] == year)
-        ]
+        backend = self.backend
+        timer = self.metrics.timer('get_top_areas')
+        # Slice dari urutan yang disimpan engine saat load, tanpa sort per request
+        columns = backend.top_areas(benefit_type, year, n, ascending)
+        timer.mark('filter')
+        
+        data = _table(columns, columnar)
+        timer.mark('to_dict')
+        return data
+    
+    def get_rankings(self, benefit_type, year, n=None, columnar=False):
+        """Peringkat dan percentile local_authority untuk (benefit_type, year), terurut dari rank 1
+        
+        Mengembalikan (data, jumlah local_authority yang diperingkat); n membatasi
+        jumlah baris teratas.
+        """
+        if n is not None and n < 0:
+            raise ValueError("n must be >= 0")
+        backend = self.backend
+        timer = self.metrics.timer('get_rankings')
+        columns, count = backend.rankings(benefit_type, year, n)
+        timer.mark('filter')
+        
+        data = _table(columns, columnar)
+        timer.mark('to_dict')
+        return data, count
+    
+    def get_rank_trajectory(self, local_authority, benefit_type, columnar=False):
+        """Rank, percentile dan jumlah local_authority yang diperingkat per tahun untuk satu local_authority"""
+        backend = self.backend
+        timer = self.metrics.timer('get_rank_trajectory')
+        columns = backend.rank_trajectory(local_authority, benefit_type)
+        timer.mark('filter')
+        
+        data = _table(columns, columnar)
+        timer.mark('to_dict')
+        return data
+    
+    @coalesced
+    def get_comparison(self, year_start=None, year_end=None, benefit_types=None, sort='delta', n=10, columnar=False):
+        """Perubahan year_start -> year_end (default tahun pertama dan terakhir) per local_authority dan nation
+        
+        Delta, persen, kumulatif dan CAGR (comparison.compare) dihitung dari
+        cube untuk semua sel sekaligus. benefit_types membatasi benefit type;
+        jika lebih dari satu, co_benefit_type 'total' (jumlah benefit type
+        terpilih) ikut dihitung. Mengembalikan dict berisi year_start, year_end dan:
+        
+        - local_authorities: metrik per (local_authority, co_benefit_type) yang
+          memiliki nilai di salah satu dari kedua tahun
+        - nations: metrik per (nation, co_benefit_type)
+        - movers: {co_benefit_type: {gainers, losers}} berisi n local_authority
+          dengan metrik `sort` terbesar dan terkecil
+        """
+        if sort not in comparison.METRICS:
+            raise ValueError(f"Unknown sort metric: {sort}")
+        if n < 0:
+            raise ValueError("n must be >= 0")
+        index, cube = self.index, self.cube
+        timer = self.metrics.timer('get_comparison')
         
-        sorted_data = filtered.sort_values('value_total', ascending=ascending).head(n)
+        year_start = index.years[0] if year_start is None else year_start
+        year_end = index.years[-1] if year_end is None else year_end
+        y0, y1 = index.year_code(year_start), index.year_code(year_end)
+        if y0 is None or y1 is None:
+            raise ValueError(f"Unknown year: {year_start if y0 is None else year_end}")
+        if y0 >= y1:
+            raise ValueError("year_start must be before year_end")
+        
+        bt_codes = np.arange(len(index.benefit_types))
+        if benefit_types:
+            bt_codes = bt_codes[np.isin(index.benefit_types, benefit_types)]
+        names = [index.benefit_types[b] for b in bt_codes.tolist()]
+        la_values, la_present = cube.values[:, :, bt_codes], cube.present[:, :, bt_codes]
+        nation_values, nation_present = cube.nation_values[:, :, bt_codes], cube.nation_present[:, :, bt_codes]
+        if len(names) > 1:
+            names.append('total')
+            la_values, la_present = comparison.with_total(la_values, la_present)
+            nation_values, nation_present = comparison.with_total(nation_values, nation_present)
+        timer.mark('filter')
         
-        return sorted_data[['local_authority', 'value_total', 'nation']].to_dict('records')
+        years = year_end - year_start
+        la_metrics = comparison.compare(la_values, la_present, y0, y1, years)
+        nation_metrics = comparison.compare(nation_values, nation_present, y0, y1, years)
+        timer.mark('aggregate')
+        
+        la_nations = self._la_nations()
+        
+        def table(metrics, key, rows, cols):
+            columns = {key: index.labels(key, rows)}
+            if key == 'local_authority':
+                columns['nation'] = index.labels('nation', la_nations[rows])
+            columns['co_benefit_type'] = [names[c] for c in cols.tolist()]
+            for name, values in metrics.items():
+                columns[name] = values[rows, cols]
+            return _table(columns, columnar)
+        
+        movers = {}
+        for col, name in enumerate(names):
+            gainers, losers = comparison.movers(la_metrics, col, sort, n)
+            movers[name] = {
+                'gainers': table(la_metrics, 'local_authority', gainers, np.full(len(gainers), col)),
+                'losers': table(la_metrics, 'local_authority', losers, np.full(len(losers), col))
+            }
+        
+        data = {
+            'year_start': int(year_start),
+            'year_end': int(year_end),
+            'local_authorities': table(la_metrics, 'local_authority',
+                                       *np.nonzero(la_present[:, y0] | la_present[:, y1])),
+            'nations': table(nation_metrics, 'nation', *np.nonzero(nation_present[:, y0] | nation_present[:, y1])),
+            'movers': movers
+        }
+        timer.mark('to_dict')
+        return data
+
+
+def _table(columns, columnar):
+    """Kolom (nama -> list, array NumPy atau pd.Categorical) sebagai {columns, data} atau list record per baris"""
+    if columnar:
+        return {'columns': list(columns), 'data': list(columns.values())}
+    names = list(columns)
+    values = [
+        column if isinstance(column, list) else np.asarray(column).tolist()
+        for column in columns.values()
+    ]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
@@ -0,0 +1,104 @@
+"""
+GeoJSON Blob Model
+GeoJSON yang diserialisasi sekali dan disimpan dalam bentuk terkompresi
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # brotli opsional
+    brotli = None
+
+
+class GeoJSONBlob:
+    """Byte GeoJSON siap kirim untuk setiap Content-Encoding
+
+    Serialisasi JSON dan kompresi dilakukan sekali saat load. Jika diizinkan,
+    hasil kompresi juga ditulis di samping file sumber (`.gz` dan `.br`)
+    sehingga start berikutnya cukup membaca file tersebut.
+    """
+
+    def __init__(self, identity, encoded):
+        """Initialize dari body tanpa kompresi dan dict encoding -> bytes"""
+        self.identity = identity
+        self.encoded = encoded
+        self.digest = hashlib.sha256(identity).hexdigest()[:32]
+
+    @property
+    def encodings(self):
+        """Encoding yang tersedia, urut dari yang paling kecil"""
+        return [name for name in ('br', 'gzip') if name in self.encoded]
+
+    def body(self, encoding):
+        """Body untuk encoding tertentu ('identity' untuk tanpa kompresi)"""
+        if encoding == 'identity':
+            return self.identity
+        return self.encoded[encoding]
+
+    def etag(self, encoding):
+        """ETag kuat per representasi (berbeda untuk setiap encoding)"""
+        return self.digest if encoding == 'identity' else f'{self.digest}-{encoding}'
+
+    @classmethod
+    def from_bytes(cls, identity):
+        """Buat blob dari body JSON tanpa menulis ke disk"""
+        encodings = ['gzip'] + (['br'] if brotli is not None else [])
+        return cls(identity, {encoding: _compress(identity, encoding) for encoding in encodings})
+
+    @classmethod
+    def load(cls, path, write_sidecars=True):
+        """Load GeoJSON dari file, memakai file .gz/.br yang masih baru jika ada"""
+        path = Path(path)
+        source_mtime = path.stat().st_mtime_ns
+        sidecars = {'gzip': _sidecar(path, '.gz')}
+        if brotli is not None:
+            sidecars['br'] = _sidecar(path, '.br')
+
+        encoded = {}
+        for encoding, sidecar in sidecars.items():
+            if sidecar.exists() and sidecar.stat().st_mtime_ns >= source_mtime:
+                encoded[encoding] = sidecar.read_bytes()
+
+        if 'gzip' in encoded:
+            identity = gzip.decompress(encoded['gzip'])
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                identity = json.dumps(
+                    json.load(f), separators=(',', ':'), ensure_ascii=False
+                ).encode('utf-8')
+
+        missing = [encoding for encoding in sidecars if encoding not in encoded]
+        for encoding in missing:
+            encoded[encoding] = _compress(identity, encoding)
+            if write_sidecars:
+                write_atomic(sidecars[encoding], encoded[encoding])
+
+        return cls(identity, encoded)
+
+
+def _sidecar(path, suffix):
+    return path.with_name(path.name + suffix)
+
+
+def _compress(data, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def write_atomic(path, data):
+    """Tulis file turunan secara atomik; kembalikan False jika gagal menulis"""
+    try:
+        fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}-', dir=path.parent)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,326 @@
+"""
+Geometry Model
+Topologi arc bersama, simplifikasi Douglas-Peucker dan encoding TopoJSON
+"""
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+# Format keluaran yang didukung untuk level geometri
+FORMATS = ('geojson', 'topojson')
+
+
+class Topology:
+    """Topologi polygon dengan arc bersama dan koordinat terkuantisasi
+
+    Batas yang dipakai bersama oleh dua local authority disimpan sekali
+    sebagai satu arc, sehingga simplifikasi tidak menimbulkan celah atau
+    tumpang tindih antar wilayah. Koordinat disimpan sebagai integer pada
+    grid `quantization` x `quantization` di atas bounding box data.
+    """
+
+    def __init__(self, arcs, features, scale, translate):
+        """Initialize dari arc (array integer absolut) dan daftar feature
+
+        Setiap feature berbentuk (properties, geometry_type, polygons) dengan
+        polygons = list of rings, dan ring = list referensi arc (~i untuk
+        arc i yang dibalik, seperti pada TopoJSON).
+        """
+        self.arcs = arcs
+        self.features = features
+        self.scale = scale
+        self.translate = translate
+        self._importance = None
+
+    @classmethod
+    def from_geojson(cls, geojson, quantization=100000):
+        """Bangun topologi dari FeatureCollection GeoJSON (Polygon/MultiPolygon)"""
+        parsed = [_feature_polygons(feature) for feature in geojson.get('features', [])]
+        all_coords = [ring for _, _, polygons in parsed for polygon in polygons for ring in polygon]
+        if all_coords:
+            stacked = np.concatenate(all_coords)
+            x0, y0 = stacked.min(axis=0)
+            x1, y1 = stacked.max(axis=0)
+        else:
+            x0 = y0 = x1 = y1 = 0.0
+        kx = (x1 - x0) / (quantization - 1) or 1.0
+        ky = (y1 - y0) / (quantization - 1) or 1.0
+        scale = np.array([kx, ky])
+        translate = np.array([x0, y0])
+
+        # Kuantisasi dan buang titik berurutan yang sama
+        quantized = []
+        for properties, geometry_type, polygons in parsed:
+            q_polygons = []
+            for polygon in polygons:
+                q_rings = [_quantize_ring(ring, scale, translate) for ring in polygon]
+                if q_rings and q_rings[0] is not None:
+                    q_polygons.append([ring for ring in q_rings if ring is not None])
+            quantized.append((properties, geometry_type, q_polygons))
+
+        rings = [ring for _, _, polygons in quantized for polygon in polygons for ring in polygon]
+        junctions = _find_junctions(rings)
+
+        arcs = []
+        lookup = {}
+        features = []
+        for properties, geometry_type, polygons in quantized:
+            features.append((properties, geometry_type, [
+                [_cut_ring(ring, junctions, arcs, lookup) for ring in polygon]
+                for polygon in polygons
+            ]))
+        return cls(arcs, features, scale, translate)
+
+    def simplified(self, tolerance):
+        """Topologi baru dengan arc disederhanakan (tolerance dalam satuan koordinat)"""
+        if self._importance is None:
+            self._importance = douglas_peucker_importance([arc * self.scale for arc in self.arcs])
+        arcs = [arc[importance > tolerance] for arc, importance in zip(self.arcs, self._importance)]
+
+        features = []
+        for properties, geometry_type, polygons in self.features:
+            kept = []
+            for polygon in polygons:
+                # Ring yang runtuh (< 4 titik) dibuang; polygon dibuang jika ring luarnya runtuh
+                rings = [ring for ring in polygon if _ring_length(ring, arcs) >= 4]
+                if rings and rings[0] is polygon[0]:
+                    kept.append(rings)
+            if not kept and polygons:
+                # Jangan hilangkan feature: pakai ring luar terbesar tanpa simplifikasi
+                largest = max(polygons, key=lambda polygon: _ring_length(polygon[0], self.arcs))
+                outer = []
+                for ref in largest[0]:
+                    arc = self.arcs[ref if ref >= 0 else ~ref]
+                    arcs.append(arc if ref >= 0 else arc[::-1])
+                    outer.append(len(arcs) - 1)
+                kept = [[outer]]
+            features.append((properties, geometry_type, kept))
+        return Topology(arcs, features, self.scale, self.translate)
+
+    def to_topojson(self, object_name='boundaries'):
+        """Encode sebagai TopoJSON (arc delta-encoded, koordinat terkuantisasi)"""
+        geometries = []
+        for properties, geometry_type, polygons in self.features:
+            if geometry_type is None:
+                geometries.append({'type': None, 'properties': properties})
+            elif geometry_type == 'Polygon' and len(polygons) == 1:
+                geometries.append({'type': 'Polygon', 'arcs': polygons[0], 'properties': properties})
+            else:
+                geometries.append({'type': 'MultiPolygon', 'arcs': polygons, 'properties': properties})
+
+        return {
+            'type': 'Topology',
+            'transform': {'scale': self.scale.tolist(), 'translate': self.translate.tolist()},
+            'objects': {object_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+            'arcs': [
+                np.concatenate([arc[:1], np.diff(arc, axis=0)]).tolist()
+                for arc in self.arcs
+            ]
+        }
+
+    def decoded(self):
+        """Feature sebagai (properties, geometry_type, polygons) dengan ring array float"""
+        coords = [arc * self.scale + self.translate for arc in self.arcs]
+        return [
+            (properties, geometry_type, [[_decode_ring(ring, coords) for ring in polygon] for polygon in polygons])
+            for properties, geometry_type, polygons in self.features
+        ]
+
+    def to_geojson(self):
+        """Decode kembali menjadi FeatureCollection GeoJSON"""
+        decimals = max(0, int(math.ceil(-math.log10(float(self.scale.min())))) + 1)
+
+        features = []
+        for properties, geometry_type, polygons in self.decoded():
+            features.append({
+                'type': 'Feature',
+                'properties': properties,
+                'geometry': geometry_dict(geometry_type, polygons, decimals)
+            })
+        return {'type': 'FeatureCollection', 'features': features}
+
+
+def geometry_dict(geometry_type, polygons, decimals):
+    """Geometri GeoJSON dari polygon berisi ring array, dibulatkan ke `decimals`"""
+    if geometry_type is None:
+        return None
+    coordinates = [[np.round(ring, decimals).tolist() for ring in polygon] for polygon in polygons]
+    if geometry_type == 'Polygon' and len(coordinates) == 1:
+        return {'type': 'Polygon', 'coordinates': coordinates[0]}
+    return {'type': 'MultiPolygon', 'coordinates': coordinates}
+
+
+def level_path(source, level, fmt):
+    """Path file turunan, mis. lad_boundaries.low.topojson"""
+    source = Path(source)
+    return source.with_name(f'{source.stem}.{level}.{fmt}')
+
+
+def build_levels(topology, levels):
+    """Serialisasi semua level sebagai dict (level, format) -> bytes JSON
+
+    `levels` memetakan nama level ke toleransi simplifikasi. Level 'full'
+    (tanpa simplifikasi) selalu ditambahkan dalam format TopoJSON.
+    """
+    outputs = {('full', 'topojson'): _dumps(topology.to_topojson())}
+    for level, tolerance in levels.items():
+        simplified = topology.simplified(tolerance)
+        outputs[(level, 'geojson')] = _dumps(simplified.to_geojson())
+        outputs[(level, 'topojson')] = _dumps(simplified.to_topojson())
+    return outputs
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def douglas_peucker_importance(arcs):
+    """Importance Douglas-Peucker setiap titik untuk semua arc sekaligus
+
+    Titik dipertahankan pada toleransi T jika importance-nya > T; hasilnya
+    sama dengan menjalankan Douglas-Peucker dengan toleransi T, tetapi cukup
+    dihitung sekali untuk semua level. Titik awal dan akhir arc bernilai inf.
+    Semua segmen yang masih aktif diproses bersamaan per iterasi. Untuk arc
+    tertutup (awal == akhir) jarak diukur dari titik awal.
+    """
+    lengths = np.array([len(arc) for arc in arcs], dtype=np.int64)
+    if len(arcs) == 0:
+        return []
+    points = np.concatenate(arcs).astype(np.float64)
+    offsets = np.r_[0, np.cumsum(lengths)]
+    importance = np.zeros(len(points))
+    importance[offsets[:-1]] = np.inf
+    importance[offsets[1:] - 1] = np.inf
+
+    starts = offsets[:-1]
+    ends = offsets[1:] - 1
+    caps = np.full(len(starts), np.inf)
+    while True:
+        active = ends - starts > 1
+        starts, ends, caps = starts[active], ends[active], caps[active]
+        if len(starts) == 0:
+            break
+
+        # Titik interior semua segmen aktif
+        counts = ends - starts - 1
+        first = np.r_[0, np.cumsum(counts)[:-1]]
+        seg = np.repeat(np.arange(len(starts)), counts)
+        idx = starts[seg] + 1 + np.arange(int(counts.sum())) - first[seg]
+
+        a = points[starts][seg]
+        d = points[ends][seg] - a
+        p = points[idx] - a
+        norm = np.hypot(d[:, 0], d[:, 1])
+        cross = np.abs(d[:, 0] * p[:, 1] - d[:, 1] * p[:, 0])
+        dist = np.where(norm > 0, cross / np.where(norm > 0, norm, 1.0), np.hypot(p[:, 0], p[:, 1]))
+
+        # Titik terjauh per segmen (kemunculan pertama)
+        max_dist = np.maximum.reduceat(dist, first)
+        candidates = np.flatnonzero(dist == max_dist[seg])
+        _, first_candidate = np.unique(seg[candidates], return_index=True)
+        split = idx[candidates[first_candidate]]
+
+        split_importance = np.minimum(max_dist, caps)
+        importance[split] = split_importance
+
+        starts, ends = np.concatenate([starts, split]), np.concatenate([split, ends])
+        caps = np.concatenate([split_importance, split_importance])
+
+    return np.split(importance, offsets[1:-1])
+
+
+def _feature_polygons(feature):
+    """(properties, geometry_type, polygons) dengan ring sebagai array float"""
+    geometry = feature.get('geometry') or {}
+    properties = feature.get('properties') or {}
+    geometry_type = geometry.get('type')
+    if geometry_type == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry_type == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return properties, None, []
+    return properties, geometry_type, [
+        [np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon if len(ring)]
+        for polygon in polygons if polygon
+    ]
+
+
+def _quantize_ring(ring, scale, translate):
+    """Ring terbuka (tanpa titik penutup) terkuantisasi, atau None jika runtuh"""
+    q = np.round((ring - translate) / scale).astype(np.int64)
+    changed = np.r_[True, np.any(q[1:] != q[:-1], axis=1)]
+    q = q[changed]
+    if len(q) > 1 and np.array_equal(q[0], q[-1]):
+        q = q[:-1]
+    return q if len(q) >= 3 else None
+
+
+def _point_keys(points):
+    return (points[:, 0] << 32) | points[:, 1]
+
+
+def _find_junctions(rings):
+    """Kunci titik yang memiliki lebih dari dua tetangga berbeda di semua ring"""
+    if not rings:
+        return np.empty(0, dtype=np.int64)
+    keys = [_point_keys(ring) for ring in rings]
+    points = np.concatenate(keys + keys)
+    neighbours = np.concatenate(
+        [np.roll(k, 1) for k in keys] + [np.roll(k, -1) for k in keys]
+    )
+    pairs = np.unique(np.stack([points, neighbours], axis=1), axis=0)
+    unique_points, counts = np.unique(pairs[:, 0], return_counts=True)
+    return unique_points[counts > 2]
+
+
+def _cut_ring(ring, junctions, arcs, lookup):
+    """Potong ring pada titik junction menjadi arc; kembalikan referensi arc"""
+    keys = _point_keys(ring)
+    cuts = np.flatnonzero(np.isin(keys, junctions))
+
+    if len(cuts) == 0:
+        # Ring tanpa junction: satu arc tertutup, dirotasi ke titik terkecil
+        start = int(np.argmin(keys))
+        rotated = np.roll(ring, -start, axis=0)
+        pieces = [np.concatenate([rotated, rotated[:1]])]
+        reversed_ring = rotated[::-1]
+        reversed_ring = np.roll(reversed_ring, -int(np.argmin(_point_keys(reversed_ring))), axis=0)
+        alternates = [np.concatenate([reversed_ring, reversed_ring[:1]])]
+    else:
+        rotated = np.roll(ring, -int(cuts[0]), axis=0)
+        rotated = np.concatenate([rotated, rotated[:1]])
+        bounds = list(cuts - cuts[0]) + [len(ring)]
+        pieces = [rotated[a:b + 1] for a, b in zip(bounds[:-1], bounds[1:])]
+        alternates = [piece[::-1] for piece in pieces]
+
+    refs = []
+    for piece, alternate in zip(pieces, alternates):
+        forward = piece.tobytes()
+        if forward in lookup:
+            refs.append(lookup[forward])
+            continue
+        backward = alternate.tobytes()
+        if backward in lookup:
+            refs.append(~lookup[backward])
+            continue
+        arcs.append(piece)
+        lookup[forward] = len(arcs) - 1
+        refs.append(len(arcs) - 1)
+    return refs
+
+
+def _ring_length(ring, arcs):
+    """Jumlah titik ring (termasuk titik penutup) setelah arc digabung"""
+    return 1 + sum(len(arcs[ref if ref >= 0 else ~ref]) - 1 for ref in ring)
+
+
+def _decode_ring(ring, coords):
+    """Gabungkan arc menjadi array koordinat ring tertutup"""
+    parts = []
+    for i, ref in enumerate(ring):
+        arc = coords[ref] if ref >= 0 else coords[~ref][::-1]
+        parts.append(arc if i == 0 else arc[1:])
+    return np.concatenate(parts)
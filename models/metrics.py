@@ -0,0 +1,135 @@
+"""
+Metrics
+Registry histogram dan counter in-process dengan format teks Prometheus
+"""
+import threading
+import time
+from bisect import bisect_left
+
+# Batas atas bucket (detik dan byte)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Nama metrik -> (tipe, keterangan) untuk baris # HELP / # TYPE
+METRICS = {
+    'http_requests_total': ('counter', 'Jumlah request per endpoint, method dan status'),
+    'http_request_duration_seconds': ('histogram', 'Latency request per endpoint'),
+    'http_response_size_bytes': ('histogram', 'Ukuran body respons per endpoint'),
+    'api_errors_total': ('counter', 'Error yang ditangani handler API per endpoint dan tipe exception'),
+    'api_serialize_duration_seconds': ('histogram', 'Durasi serialisasi JSON respons API'),
+    'api_response_cache_total': ('counter', 'Hasil lookup cache respons API (hit, miss, not_modified)'),
+    'dataloader_phase_duration_seconds': ('histogram', 'Durasi setiap fase method DataLoader'),
+    'dataset_reloads_total': ('counter', 'Reload dataset per mode (csv, append, geojson) dan hasil'),
+    'query_pool_tasks_total': ('counter', 'Query berat per endpoint dan hasil di process pool (ok, error, busy, timeout, fallback)'),
+    'query_pool_duration_seconds': ('histogram', 'Durasi query di process pool termasuk antrian per endpoint'),
+    'profiles_written_total': ('counter', 'Profil cProfile request lambat yang ditulis ke disk'),
+}
+
+
+class Histogram:
+    """Histogram kumulatif dengan bucket tetap"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class PhaseTimer:
+    """Catat durasi fase berurutan dari satu pemanggilan method
+
+    Setiap `mark(phase)` mencatat waktu sejak mark sebelumnya (atau sejak
+    timer dibuat) ke histogram dataloader_phase_duration_seconds.
+    """
+
+    def __init__(self, metrics, method):
+        self.metrics = metrics
+        self.method = method
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.metrics.observe(
+            'dataloader_phase_duration_seconds', now - self._last,
+            method=self.method, phase=phase
+        )
+        self._last = now
+
+
+class Metrics:
+    """Registry metrik thread-safe untuk satu proses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        """Tambah counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """Catat satu nilai ke histogram"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def timer(self, method):
+        """PhaseTimer untuk satu pemanggilan method"""
+        return PhaseTimer(self, method)
+
+    def render(self):
+        """Semua metrik dalam format teks Prometheus (text/plain; version=0.0.4)"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (h.buckets, list(h.counts), h.sum, h.count))
+                for key, h in self._histograms.items()
+            )
+
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described and name in METRICS:
+                kind, text = METRICS[name]
+                lines.append(f'# HELP {name} {text}')
+                lines.append(f'# TYPE {name} {kind}')
+            described.add(name)
+
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f'{name}{_labels(labels)} {value}')
+
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            describe(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {total!r}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,401 @@
+"""
+Query Backend
+Engine query untuk map, heatmap, top-areas dan aggregated-data (memori atau SQLite)
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from models.rankings import cell_ranks, group_orders
+
+# Nama engine di Config.QUERY_BACKEND
+BACKENDS = ('memory', 'sqlite')
+
+
+class MemoryBackend:
+    """Query di atas DataIndex dan DataCube di memori (default)
+
+    Semua method mengembalikan kolom (array NumPy / pd.Categorical) yang
+    diformat DataLoader; SQLiteBackend mengembalikan kolom yang identik.
+    """
+
+    def __init__(self, index, cube):
+        self.index = index
+        self.cube = cube
+        # Urutan top-areas per grup dan peringkat local_authority (lihat models/rankings.py)
+        self.descending, self.ascending = group_orders(index)
+        self.rank, self.percentile, self.rank_count, self.rank_order = cell_ranks(cube.values, cube.present)
+
+    @property
+    def source_digest(self):
+        return self.index.source_digest
+
+    def metadata(self):
+        """Daftar kategori dataset: years, local_authorities, benefit_types, nations"""
+        index = self.index
+        return {
+            'years': list(index.years),
+            'local_authorities': list(index.local_authorities),
+            'benefit_types': list(index.benefit_types),
+            'nations': list(index.nations)
+        }
+
+    def map_data(self, year, benefit_type):
+        """Kolom local_authority, value untuk satu (year, benefit_type)"""
+        index, cube = self.index, self.cube
+        y = index.year_code(year)
+        b = index.bt_code(benefit_type)
+        if y is None or b is None:
+            return {'local_authority': index.labels('local_authority', []), 'value': np.empty(0)}
+        present = cube.present[:, y, b]
+        return {
+            'local_authority': index.labels('local_authority', np.flatnonzero(present)),
+            'value': cube.values[present, y, b]
+        }
+
+    def heatmap(self, benefit_type, year_start=None, year_end=None):
+        """(nama local_authority, tahun, matriks nilai) atau None jika benefit_type tidak ada"""
+        cube = self.cube
+        b = self.index.bt_code(benefit_type)
+        if b is None:
+            return None
+        years = cube.year_range(year_start or None, year_end or None)
+        present = cube.present[:, years, b]
+        rows = np.flatnonzero(present.any(axis=1))
+        cols = np.flatnonzero(present.any(axis=0))
+        matrix = np.where(present, cube.values[:, years, b], 0.0)[np.ix_(rows, cols)]
+        return (
+            [self.index.local_authorities[i] for i in rows.tolist()],
+            [self.index.years[years.start + c] for c in cols.tolist()],
+            matrix
+        )
+
+    def top_areas(self, benefit_type, year, n, ascending):
+        """Kolom local_authority, value_total, nation untuk n baris teratas (slice urutan tersimpan)"""
+        index = self.index
+        rows = index.group_slice(benefit_type, year)
+        order = (self.ascending if ascending else self.descending)[rows][:n]
+        return {
+            'local_authority': index.labels('local_authority', index.la_codes[order]),
+            'value_total': index.values[order],
+            'nation': index.labels('nation', index.nation_codes[order])
+        }
+
+    def rankings(self, benefit_type, year, n=None):
+        """(kolom local_authority, value, rank, percentile terurut berdasarkan rank, jumlah yang diperingkat)"""
+        y = self.index.year_code(year)
+        b = self.index.bt_code(benefit_type)
+        if y is None or b is None:
+            return self._rank_columns(np.empty(0, dtype=np.int32), 0, 0), 0
+        count = int(self.rank_count[y, b])
+        return self._rank_columns(self.rank_order[y, b, :count][:n], y, b), count
+
+    def rank_trajectory(self, local_authority, benefit_type):
+        """Kolom year, value, rank, percentile, count untuk satu local_authority di setiap tahun"""
+        la = self.index.la_code(local_authority)
+        b = self.index.bt_code(benefit_type)
+        if la is None or b is None:
+            years = np.empty(0, dtype=np.int64)
+            la = b = 0
+        else:
+            years = np.flatnonzero(self.rank[la, :, b])
+        return {
+            'year': np.asarray(self.index.years, dtype=np.int64)[years],
+            'value': self.cube.values[la, years, b],
+            'rank': self.rank[la, years, b],
+            'percentile': self.percentile[la, years, b],
+            'count': self.rank_count[years, b]
+        }
+
+    def _rank_columns(self, las, y, b):
+        return {
+            'local_authority': self.index.labels('local_authority', las),
+            'value': self.cube.values[las, y, b],
+            'rank': self.rank[las, y, b],
+            'percentile': self.percentile[las, y, b]
+        }
+
+    def aggregated(self, group_by, start=0, stop=None):
+        """Kolom (key, year, co_benefit_type, value_total) sel ke-start..stop"""
+        values, present, key = self._aggregation(group_by)
+        return self.cube.columns(values, present, key, start, stop)
+
+    def count_aggregated(self, group_by):
+        _, present, _ = self._aggregation(group_by)
+        return self.cube.cell_count(present)
+
+    def iter_aggregated(self, group_by, chunk_size):
+        values, present, key = self._aggregation(group_by)
+        return self.cube.iter_columns(values, present, key, chunk_size)
+
+    def _aggregation(self, group_by):
+        cube = self.cube
+        if group_by == 'nation':
+            return cube.nation_values, cube.nation_present, 'nation'
+        return cube.values, cube.present, 'local_authority'
+
+
+class SQLiteBackend:
+    """Query SQL atas file SQLite read-only yang dibangun dari CSV
+
+    Tabel `cells` dan `nation_cells` berisi sel cube yang dijumlahkan dengan
+    DataCube saat build (bukan SUM SQLite, yang urutan/algoritma
+    penjumlahannya berbeda), sehingga nilainya identik bit per bit dengan
+    MemoryBackend. Tabel `rows` berisi baris mentah dalam urutan DataIndex.
+    Filter, urutan dan paginasi dijalankan SQLite sehingga worker hanya
+    memuat hasil query; file dibagi semua worker lewat page cache OS.
+    """
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path):
+        """Buka file database (read-only) dan baca kategorinya"""
+        self.path = Path(path)
+        self._local = threading.local()
+        meta = dict(self._query('SELECT key, value FROM meta'))
+        if int(meta['schema_version']) != self.SCHEMA_VERSION:
+            raise ValueError(f"Unsupported SQLite schema in {self.path}")
+        self.source_digest = meta['source_digest']
+        self.years = json.loads(meta['years'])
+        self._categories = {
+            'local_authority': json.loads(meta['local_authorities']),
+            'nation': json.loads(meta['nations']),
+            'co_benefit_type': json.loads(meta['benefit_types'])
+        }
+        self._codes = {
+            column: {name: i for i, name in enumerate(names)}
+            for column, names in [*self._categories.items(), ('year', self.years)]
+        }
+        self._rank_count = np.asarray(json.loads(meta['rank_counts']), dtype=np.int64)
+        self._dtypes = {}
+
+    @classmethod
+    def build(cls, path, index, cube):
+        """Tulis database untuk index dan cube secara atomik (file sementara lalu rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}-', dir=path.parent)
+        os.close(fd)
+        try:
+            connection = sqlite3.connect(tmp)
+            with connection:
+                connection.executescript('''
+                    PRAGMA journal_mode = OFF;
+                    CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                    CREATE TABLE cells (la INTEGER, year INTEGER, bt INTEGER, value REAL,
+                                        rank INTEGER, percentile REAL,
+                                        PRIMARY KEY (la, year, bt)) WITHOUT ROWID;
+                    CREATE TABLE nation_cells (nation INTEGER, year INTEGER, bt INTEGER, value REAL,
+                                               PRIMARY KEY (nation, year, bt)) WITHOUT ROWID;
+                    CREATE TABLE rows (position INTEGER PRIMARY KEY, bt INTEGER, year INTEGER,
+                                       la INTEGER, nation INTEGER, value REAL,
+                                       rank_desc INTEGER, rank_asc INTEGER);
+                ''')
+                rank, percentile, rank_count, _ = cell_ranks(cube.values, cube.present)
+                connection.executemany('INSERT INTO meta VALUES (?, ?)', [
+                    ('schema_version', str(cls.SCHEMA_VERSION)),
+                    ('source_digest', index.source_digest),
+                    ('years', json.dumps(index.years)),
+                    ('local_authorities', json.dumps(index.local_authorities)),
+                    ('nations', json.dumps(index.nations)),
+                    ('benefit_types', json.dumps(index.benefit_types)),
+                    ('rank_counts', json.dumps(rank_count.tolist()))
+                ])
+                first, year_codes, bt_codes = np.nonzero(cube.present)
+                connection.executemany('INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?)', zip(
+                    first.tolist(), year_codes.tolist(), bt_codes.tolist(), cube.values[cube.present].tolist(),
+                    rank[cube.present].tolist(), percentile[cube.present].tolist()
+                ))
+                first, year_codes, bt_codes = np.nonzero(cube.nation_present)
+                connection.executemany('INSERT INTO nation_cells VALUES (?, ?, ?, ?)', zip(
+                    first.tolist(), year_codes.tolist(), bt_codes.tolist(),
+                    cube.nation_values[cube.nation_present].tolist()
+                ))
+
+                # Posisi setiap baris di dalam urutan top-areas grupnya
+                offsets = index.group_offsets
+                within = np.arange(len(index)) - np.repeat(offsets[:-1], np.diff(offsets))
+                rank_desc, rank_asc = (np.empty(len(index), dtype=np.int64) for _ in range(2))
+                descending, ascending = group_orders(index)
+                rank_desc[descending], rank_asc[ascending] = within, within
+                connection.executemany('INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)', zip(
+                    range(len(index)), index.bt_codes.tolist(), index.year_codes.tolist(),
+                    index.la_codes.tolist(), index.nation_codes.tolist(), np.asarray(index.values).tolist(),
+                    rank_desc.tolist(), rank_asc.tolist()
+                ))
+                connection.executescript('''
+                    CREATE INDEX cells_by_group ON cells (bt, year, la, value);
+                    CREATE INDEX cells_by_rank ON cells (bt, year, rank, la);
+                    CREATE INDEX rows_by_rank_desc ON rows (bt, year, rank_desc);
+                    CREATE INDEX rows_by_rank_asc ON rows (bt, year, rank_asc);
+                ''')
+            connection.close()
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _connection(self):
+        """Koneksi per thread (dan per proses: koneksi tidak boleh dipakai setelah fork)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            # File tidak pernah diubah setelah dibangun: immutable melewati locking
+            connection = sqlite3.connect(f'{self.path.resolve().as_uri()}?mode=ro&immutable=1', uri=True)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _query(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    def _columns(self, sql, params, dtypes):
+        """Hasil query sebagai array NumPy per kolom"""
+        rows = self._query(sql, params)
+        if not rows:
+            return [np.empty(0, dtype=dtype) for dtype in dtypes]
+        return [np.array(column, dtype=dtype) for column, dtype in zip(zip(*rows), dtypes)]
+
+    def metadata(self):
+        return {
+            'years': list(self.years),
+            'local_authorities': list(self._categories['local_authority']),
+            'benefit_types': list(self._categories['co_benefit_type']),
+            'nations': list(self._categories['nation'])
+        }
+
+    def labels(self, column, codes):
+        """Kolom kategori (pd.Categorical) dari kode, sama dengan DataIndex.labels"""
+        import pandas as pd
+        dtype = self._dtypes.get(column)
+        if dtype is None:
+            dtype = self._dtypes[column] = pd.CategoricalDtype(self._categories[column])
+        return pd.Categorical.from_codes(codes, dtype=dtype)
+
+    def _year_code(self, year):
+        return self._codes['year'].get(year)
+
+    def map_data(self, year, benefit_type):
+        y = self._year_code(year)
+        b = self._codes['co_benefit_type'].get(benefit_type)
+        if y is None or b is None:
+            return {'local_authority': self.labels('local_authority', []), 'value': np.empty(0)}
+        la, values = self._columns(
+            'SELECT la, value FROM cells WHERE bt = ? AND year = ? ORDER BY la',
+            (b, y), (np.int64, np.float64)
+        )
+        return {'local_authority': self.labels('local_authority', la), 'value': values}
+
+    def heatmap(self, benefit_type, year_start=None, year_end=None):
+        b = self._codes['co_benefit_type'].get(benefit_type)
+        if b is None:
+            return None
+        y0 = 0 if not year_start else int(np.searchsorted(self.years, year_start, side='left'))
+        y1 = len(self.years) if not year_end else int(np.searchsorted(self.years, year_end, side='right'))
+        la, year_codes, values = self._columns(
+            'SELECT la, year, value FROM cells WHERE bt = ? AND year >= ? AND year < ?',
+            (b, y0, y1), (np.int64, np.int64, np.float64)
+        )
+        rows, row_positions = np.unique(la, return_inverse=True)
+        cols, col_positions = np.unique(year_codes, return_inverse=True)
+        matrix = np.zeros((len(rows), len(cols)))
+        matrix[row_positions, col_positions] = values
+        names = self._categories['local_authority']
+        return [names[i] for i in rows.tolist()], [self.years[c] for c in cols.tolist()], matrix
+
+    def top_areas(self, benefit_type, year, n, ascending):
+        y = self._year_code(year)
+        b = self._codes['co_benefit_type'].get(benefit_type)
+        # Urutan (termasuk nilai yang sama) disimpan saat build dengan group_orders seperti MemoryBackend
+        column = 'rank_asc' if ascending else 'rank_desc'
+        la, nation, values = self._columns(
+            f'SELECT la, nation, value FROM rows WHERE bt = ? AND year = ? ORDER BY {column} LIMIT ?',
+            (-1 if b is None else b, -1 if y is None else y, n if n >= 0 else -1),
+            (np.int64, np.int64, np.float64)
+        )
+        if n < 0:
+            la, nation, values = la[:n], nation[:n], values[:n]
+        return {
+            'local_authority': self.labels('local_authority', la),
+            'value_total': values,
+            'nation': self.labels('nation', nation)
+        }
+
+    def rankings(self, benefit_type, year, n=None):
+        y = self._year_code(year)
+        b = self._codes['co_benefit_type'].get(benefit_type)
+        la, values, rank, percentile = self._columns(
+            'SELECT la, value, rank, percentile FROM cells WHERE bt = ? AND year = ? AND rank > 0 '
+            'ORDER BY rank, la LIMIT ?',
+            (-1 if b is None else b, -1 if y is None else y, -1 if n is None else n),
+            (np.int32, np.float64, np.int32, np.float64)
+        )
+        count = 0 if y is None or b is None else int(self._rank_count[y, b])
+        return {
+            'local_authority': self.labels('local_authority', la),
+            'value': values,
+            'rank': rank,
+            'percentile': percentile
+        }, count
+
+    def rank_trajectory(self, local_authority, benefit_type):
+        la = self._codes['local_authority'].get(local_authority)
+        b = self._codes['co_benefit_type'].get(benefit_type)
+        year_codes, values, rank, percentile = self._columns(
+            'SELECT year, value, rank, percentile FROM cells WHERE la = ? AND bt = ? AND rank > 0 ORDER BY year',
+            (-1 if la is None else la, -1 if b is None else b),
+            (np.int64, np.float64, np.int32, np.float64)
+        )
+        return {
+            'year': np.asarray(self.years, dtype=np.int64)[year_codes],
+            'value': values,
+            'rank': rank,
+            'percentile': percentile,
+            'count': self._rank_count[year_codes, 0 if b is None else b]
+        }
+
+    def aggregated(self, group_by, start=0, stop=None):
+        table, key, column = self._aggregation(group_by)
+        limit = -1 if stop is None else max(0, stop - start)
+        first, year_codes, bt_codes, values = self._columns(
+            f'SELECT {column}, year, bt, value FROM {table} ORDER BY 1, 2, 3 LIMIT ? OFFSET ?',
+            (limit, start), (np.int64, np.int64, np.int64, np.float64)
+        )
+        return self._aggregated_columns(key, first, year_codes, bt_codes, values)
+
+    def count_aggregated(self, group_by):
+        table, _, _ = self._aggregation(group_by)
+        return self._query(f'SELECT COUNT(*) FROM {table}')[0][0]
+
+    def iter_aggregated(self, group_by, chunk_size):
+        table, key, column = self._aggregation(group_by)
+        cursor = self._connection().execute(f'SELECT {column}, year, bt, value FROM {table} ORDER BY 1, 2, 3')
+
+        def chunks():
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                first, year_codes, bt_codes, values = (np.array(column) for column in zip(*rows))
+                yield self._aggregated_columns(key, first, year_codes, bt_codes, values.astype(np.float64))
+        return chunks()
+
+    def _aggregated_columns(self, key, first, year_codes, bt_codes, values):
+        return {
+            key: self.labels(key, first),
+            'year': np.asarray(self.years, dtype=np.int64)[year_codes],
+            'co_benefit_type': self.labels('co_benefit_type', bt_codes),
+            'value_total': values
+        }
+
+    @staticmethod
+    def _aggregation(group_by):
+        if group_by == 'nation':
+            return 'nation_cells', 'nation', 'nation'
+        return 'cells', 'local_authority', 'la'
+
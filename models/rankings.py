@@ -0,0 +1,68 @@
+"""
+Rankings
+Urutan top/bottom dan peringkat local_authority per (benefit_type, year) yang dihitung sekali saat load
+"""
+import numpy as np
+
+
+def sort_order(values, ascending):
+    """Urutan baris seperti DataFrame.sort_values (quicksort, NaN di akhir)"""
+    positions = np.arange(len(values))
+    valid = ~np.isnan(values)
+    keys, order = values[valid], positions[valid]
+    if not ascending:
+        keys, order = keys[::-1], order[::-1]
+    order = order[keys.argsort(kind='quicksort')]
+    if not ascending:
+        order = order[::-1]
+    return np.concatenate([order, positions[~valid]])
+
+
+def group_orders(index):
+    """(descending, ascending): posisi baris setiap grup (benefit_type, year) dalam urutan top-areas
+
+    Untuk grup dengan rentang baris [start, stop), descending[start:stop]
+    berisi posisi baris grup itu dari nilai terbesar (sort_order), sehingga
+    top-N atau bottom-N cukup berupa slice.
+    """
+    descending = np.empty(len(index), dtype=np.int32)
+    ascending = np.empty(len(index), dtype=np.int32)
+    offsets = index.group_offsets
+    for start, stop in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        if stop > start:
+            values = index.values[start:stop]
+            descending[start:stop] = sort_order(values, False) + start
+            ascending[start:stop] = sort_order(values, True) + start
+    return descending, ascending
+
+
+def cell_ranks(values, present):
+    """Peringkat local_authority per (year, benefit_type) dari sel cube
+
+    Mengembalikan (rank, percentile, count, order):
+
+    - rank (int32, bentuk cube): 1 = nilai terbesar, nilai sama mendapat rank
+      yang sama (rank minimum), 0 untuk sel yang tidak ada atau NaN.
+    - percentile (bentuk cube): persen local_authority dengan nilai <= nilai sel.
+    - count (year, benefit_type): jumlah local_authority yang diperingkat.
+    - order (year, benefit_type, local_authority): kode local_authority
+      terurut berdasarkan (rank, nama), -1 setelah `count` elemen pertama.
+    """
+    n_la, n_years, k = values.shape
+    valid = present & ~np.isnan(values)
+    count = valid.sum(axis=0)
+    rank = np.zeros(values.shape, dtype=np.int32)
+    percentile = np.full(values.shape, np.nan)
+    order = np.full((n_years, k, n_la), -1, dtype=np.int32)
+
+    for y, b in np.ndindex(n_years, k):
+        las = np.flatnonzero(valid[:, y, b])
+        if len(las) == 0:
+            continue
+        cell_values = values[las, y, b]
+        # Jumlah nilai <= setiap nilai: rank = jumlah nilai yang lebih besar + 1
+        at_most = np.searchsorted(np.sort(cell_values), cell_values, side='right')
+        rank[las, y, b] = len(las) - at_most + 1
+        percentile[las, y, b] = 100.0 * at_most / len(las)
+        order[y, b, :len(las)] = las[np.lexsort((las, rank[las, y, b]))]
+    return rank, percentile, count, order
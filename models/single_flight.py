@@ -0,0 +1,81 @@
+"""
+Single Flight
+Penggabungan pemanggilan bersamaan yang identik menjadi satu komputasi
+"""
+import threading
+from functools import wraps
+
+
+class _Call:
+    """Komputasi yang sedang berjalan untuk satu key"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Pemanggilan `do` bersamaan dengan key sama berbagi satu komputasi
+
+    Thread pertama menjalankan fungsi; thread lain dengan key yang sama
+    menunggu lalu menerima hasil (atau exception) yang sama. Setelah selesai
+    key dilepas, sehingga pemanggilan berikutnya menghitung ulang.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Jalankan fn(*args, **kwargs) sekali untuk semua pemanggil bersamaan"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self):
+        """Jumlah komputasi yang sedang berjalan"""
+        with self._lock:
+            return len(self._calls)
+
+
+def coalesced(method):
+    """Decorator method: pemanggilan bersamaan dengan argumen sama digabung
+
+    Objek pemilik method harus memiliki atribut `_single_flight`. Argumen
+    yang tidak hashable (mis. list) diubah menjadi tuple untuk key.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, _freeze(args), _freeze(tuple(sorted(kwargs.items()))))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return self._single_flight.do(key, method, self, *args, **kwargs)
+    return wrapper
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
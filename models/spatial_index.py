@@ -0,0 +1,153 @@
+"""
+Spatial Index
+R-tree (Sort-Tile-Recursive) batas wilayah untuk point-in-polygon dan query bounding box
+"""
+import math
+
+import numpy as np
+
+from models.tiles import clip_ring
+
+# Jumlah anak maksimum per node R-tree
+NODE_CAPACITY = 16
+# Luas hasil potong (relatif terhadap luas box) di bawah ini dianggap sliver
+AREA_EPSILON = 1e-12
+
+
+class SpatialIndex:
+    """R-tree statis atas polygon batas wilayah, dikemas dengan Sort-Tile-Recursive
+
+    Setiap polygon (termasuk bagian MultiPolygon) menjadi satu entri daun
+    dengan bounding box-nya. Pada setiap level, entri diurutkan per pusat x,
+    dibagi menjadi irisan vertikal, lalu diurutkan per pusat y di dalam
+    irisan dan dikelompokkan per `capacity`, sehingga anak setiap node
+    bersebelahan di level bawahnya. Pohon disimpan sebagai array bbox per
+    level dan ditelusuri secara vektor; kandidat daun lalu diuji secara
+    eksak (point-in-polygon even-odd, atau pemotongan ring ke persegi).
+    """
+
+    def __init__(self, topology, name_property, capacity=NODE_CAPACITY):
+        """Bangun index dari Topology; name_property = property nama local authority"""
+        self.names = []
+        self._polygons = []
+        owners = []
+        for properties, _, polygons in topology.decoded():
+            for polygon in polygons:
+                self._polygons.append(polygon)
+                owners.append(len(self.names))
+            self.names.append(properties.get(name_property))
+        self._owners = np.asarray(owners, dtype=np.int64)
+
+        boxes = np.array([
+            np.r_[polygon[0].min(axis=0), polygon[0].max(axis=0)] for polygon in self._polygons
+        ]).reshape(-1, 4)
+        order = _str_order(boxes, capacity)
+        self._entries = order
+        # _levels[0] = bbox entri daun; level berikutnya (bbox, awal anak, akhir anak)
+        self._levels = [(boxes[order], None, None)]
+        while len(self._levels[-1][0]) > capacity:
+            children = self._levels[-1][0]
+            starts = np.arange(0, len(children), capacity)
+            stops = np.minimum(starts + capacity, len(children))
+            parents = np.hstack([
+                np.minimum.reduceat(children[:, :2], starts),
+                np.maximum.reduceat(children[:, 2:], starts)
+            ])
+            order = _str_order(parents, capacity)
+            self._levels.append((parents[order], starts[order], stops[order]))
+
+    def _candidates(self, box):
+        """Indeks polygon yang bounding box-nya memotong box (lon_min, lat_min, lon_max, lat_max)"""
+        nodes = np.arange(len(self._levels[-1][0]))
+        for level in range(len(self._levels) - 1, -1, -1):
+            boxes, starts, stops = self._levels[level]
+            nodes = nodes[_intersects(boxes[nodes], box)]
+            if level == 0:
+                return np.sort(self._entries[nodes])
+            nodes = _ranges(starts[nodes], stops[nodes])
+
+    def locate(self, lon, lat):
+        """Nama feature yang polygonnya memuat titik (lon, lat), atau None"""
+        for i in self._candidates((lon, lat, lon, lat)).tolist():
+            if contains(self._polygons[i], lon, lat):
+                return self.names[self._owners[i]]
+        return None
+
+    def in_bbox(self, box):
+        """Nama feature yang batasnya memotong box, dalam urutan feature
+
+        Polygon yang bounding box-nya berada di dalam box langsung diterima;
+        sisanya diterima jika ring luarnya masih punya luas setelah dipotong ke
+        box. Sutherland-Hodgman menyisakan sliver tanpa luas di sepanjang sisi
+        box untuk ring cekung yang hanya mengapit box, jadi hasil potong saja
+        tidak cukup. Box tanpa luas (titik/garis) memakai contains() di sudutnya.
+        """
+        box_area = (box[2] - box[0]) * (box[3] - box[1])
+        found = set()
+        for i in self._candidates(box).tolist():
+            owner = int(self._owners[i])
+            if owner in found:
+                continue
+            polygon = self._polygons[i]
+            if box_area <= 0:
+                matched = contains(polygon, box[0], box[1])
+            else:
+                clipped = clip_ring(polygon[0], box)
+                matched = _within(polygon[0], box) or (
+                    clipped is not None and _area(clipped - box[:2]) > box_area * AREA_EPSILON)
+            if matched:
+                found.add(owner)
+        return [self.names[owner] for owner in sorted(found)]
+
+
+def contains(polygon, x, y):
+    """True jika titik (x, y) berada di dalam polygon (ring luar dan lubang, aturan even-odd)"""
+    inside = False
+    for ring in polygon:
+        x0, y0 = ring[:, 0], ring[:, 1]
+        following = np.roll(ring, -1, axis=0)
+        x1, y1 = following[:, 0], following[:, 1]
+        # Sisi setengah terbuka (y0 > y) != (y1 > y): titik di batas bersama hanya masuk satu polygon
+        crossing = (y0 > y) != (y1 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        if np.count_nonzero(crossing & (x < x_cross)) % 2:
+            inside = not inside
+    return inside
+
+
+def _str_order(boxes, capacity):
+    """Urutan Sort-Tile-Recursive: per pusat x, lalu per pusat y di setiap irisan vertikal"""
+    centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+    order = np.argsort(centers[:, 0], kind='stable')
+    slab = max(math.ceil(math.sqrt(len(boxes) / capacity)), 1) * capacity
+    for start in range(0, len(boxes), slab):
+        part = order[start:start + slab]
+        order[start:start + slab] = part[np.argsort(centers[part, 1], kind='stable')]
+    return order
+
+
+def _intersects(boxes, box):
+    return ((boxes[:, 0] <= box[2]) & (boxes[:, 2] >= box[0]) &
+            (boxes[:, 1] <= box[3]) & (boxes[:, 3] >= box[1]))
+
+
+def _within(ring, box):
+    return bool((ring[:, 0] >= box[0]).all() & (ring[:, 0] <= box[2]).all() &
+                (ring[:, 1] >= box[1]).all() & (ring[:, 1] <= box[3]).all())
+
+
+def _area(ring):
+    """Luas absolut ring tertutup (rumus shoelace)
+
+    Digeser ke sudut box dulu oleh pemanggil, agar galat pembulatan sebanding
+    dengan luas box, bukan dengan besar koordinatnya.
+    """
+    x, y = ring[:-1, 0], ring[:-1, 1]
+    return abs(float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))) / 2
+
+
+def _ranges(starts, stops):
+    """Gabungan np.arange(start, stop) untuk setiap pasangan, tanpa loop Python"""
+    lengths = stops - starts
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
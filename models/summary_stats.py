@@ -0,0 +1,150 @@
+"""
+Summary Stats Model
+Statistik ringkasan dan batas kelas choropleth per (benefit_type, year) yang dihitung sekali saat load
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+METHODS = ('quantile', 'jenks')
+
+# Jenks O(k x n^2): grup yang lebih besar diwakili order statistic berjarak sama
+JENKS_MAX_VALUES = 1000
+
+
+class SummaryStats:
+    """Statistik ringkasan dan class breaks untuk semua benefit type dan tahun
+
+    Statistik (mean, median, std, min, max) dihitung dari baris data setiap
+    grup (benefit_type, year) dan setiap benefit_type untuk semua tahun,
+    sama dengan perhitungan per request sebelumnya. Class breaks dihitung
+    dari nilai peta (jumlah per local_authority di cube), yaitu nilai yang
+    diwarnai map.js, dengan metode quantile dan Jenks natural breaks.
+
+    Statistik dan breaks quantile dihitung saat load. Jenks jauh lebih mahal
+    (sebagian besar waktu load jika dihitung untuk semua grup), sehingga
+    nilai peta terurut setiap grup disimpan dan Jenks dihitung saat grup itu
+    pertama diminta, lalu disimpan di LRU.
+    """
+
+    def __init__(self, index, cube, classes=10, cache_size=256):
+        """Hitung statistik dan breaks quantile dari DataIndex dan DataCube"""
+        self.classes = classes
+        self.benefit_types = list(index.benefit_types)
+        self.years = list(index.years)
+        self._stats = {}
+        self._breaks = {}
+        self._map_values = {}
+
+        self._jenks = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+        for b, benefit_type in enumerate(self.benefit_types):
+            self._stats[benefit_type, None] = _describe(index.values[index.benefit_slice(benefit_type)])
+            map_values = cube.values[:, :, b]
+            present = cube.present[:, :, b]
+            self._add_breaks(benefit_type, None, map_values[present])
+
+            for y, year in enumerate(self.years):
+                rows = index.values[index.group_slice(benefit_type, year)]
+                if len(rows):
+                    self._stats[benefit_type, year] = _describe(rows)
+                self._add_breaks(benefit_type, year, map_values[:, y][present[:, y]])
+
+    def _add_breaks(self, benefit_type, year, values):
+        values = np.sort(values[~np.isnan(values)])
+        if len(values) == 0:
+            return
+        self._breaks['quantile', benefit_type, year] = quantile_breaks(values, self.classes)
+        self._map_values[benefit_type, year] = values
+
+    def summary(self, year=None):
+        """{benefit_type: statistik} untuk satu tahun, atau semua tahun jika year None"""
+        return {
+            benefit_type: self._stats[benefit_type, year]
+            for benefit_type in self.benefit_types
+            if (benefit_type, year) in self._stats
+        }
+
+    def breaks(self, benefit_type, year=None, method='quantile'):
+        """Batas kelas (classes + 1 nilai, atau lebih sedikit jika nilai unik kurang), atau []"""
+        if method not in METHODS:
+            raise ValueError(f"Unknown class breaks method: {method}")
+        if method == 'jenks':
+            return self._jenks_breaks(benefit_type, year)
+        return self._breaks.get((method, benefit_type, year), [])
+
+    def _jenks_breaks(self, benefit_type, year):
+        """Breaks Jenks satu grup, dihitung saat pertama diminta (di-cache)"""
+        key = (benefit_type, year)
+        with self._lock:
+            if key in self._jenks:
+                self._jenks.move_to_end(key)
+                return self._jenks[key]
+
+        values = self._map_values.get(key)
+        result = [] if values is None else jenks_breaks(values, self.classes)
+
+        with self._lock:
+            self._jenks[key] = result
+            while len(self._jenks) > self._cache_size:
+                self._jenks.popitem(last=False)
+        return result
+
+
+def _describe(values):
+    return {
+        'mean': float(values.mean()),
+        'median': float(np.median(values)),
+        'std': float(values.std(ddof=1)),
+        'min': float(values.min()),
+        'max': float(values.max())
+    }
+
+
+def quantile_breaks(values, classes):
+    """Batas kelas quantile (interpolasi linear seperti np.quantile) dari nilai terurut"""
+    return np.quantile(values, np.linspace(0, 1, classes + 1)).tolist()
+
+
+def jenks_breaks(values, classes, max_values=JENKS_MAX_VALUES):
+    """Batas kelas Jenks natural breaks (Fisher) dari nilai terurut
+
+    Mengembalikan [min, batas atas kelas 1, ..., max] yang meminimalkan total
+    jumlah kuadrat deviasi dalam kelas. Optimasi dilakukan atas nilai unik
+    berbobot (batas optimal selalu jatuh di antara nilai berbeda), dengan
+    programming dinamis yang divektorisasi per jumlah kelas.
+    """
+    if len(values) > max_values:
+        values = values[np.linspace(0, len(values) - 1, max_values).round().astype(np.int64)]
+    unique, weights = np.unique(values, return_counts=True)
+    n = len(unique)
+    if n <= classes:
+        return [float(unique[0])] + unique.tolist()
+
+    # Jumlah kumulatif: ssd[i, m] = SSD segmen [m, i) dalam O(1), tak hingga jika m >= i
+    w = np.concatenate([[0.0], np.cumsum(weights)])
+    s1 = np.concatenate([[0.0], np.cumsum(weights * unique)])
+    s2 = np.concatenate([[0.0], np.cumsum(weights * unique * unique)])
+    columns = np.arange(n + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ssd = (s2[:, None] - s2[None, :]) - (s1[:, None] - s1[None, :]) ** 2 / (w[:, None] - w[None, :])
+    ssd = np.where(columns[None, :] < columns[:, None], np.maximum(ssd, 0.0), np.inf)
+
+    # cost[i] = SSD minimum untuk i nilai pertama dengan j + 1 kelas
+    cost = ssd[:, 0].copy()
+    total = np.empty_like(ssd)
+    previous = []
+    for _ in range(1, classes):
+        np.add(ssd, cost, out=total)
+        best = total.argmin(axis=1)
+        cost = total[columns, best]
+        previous.append(best)
+
+    ends = [n]
+    for best in reversed(previous):
+        ends.append(int(best[ends[-1]]))
+    ends.reverse()
+    return [float(unique[0])] + [float(unique[end - 1]) for end in ends]
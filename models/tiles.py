@@ -0,0 +1,157 @@
+"""
+Tiles Model
+Tile GeoJSON ringkas (z/x/y) yang dipotong dari batas wilayah
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from models.geometry import geometry_dict
+
+# Ukuran tile dalam piksel dan buffer di sekitar tile (piksel) agar tepi tile tidak terlihat
+TILE_SIZE = 256
+TILE_BUFFER = 4
+
+
+def tile_bounds(z, x, y):
+    """Bounding box tile (lon_min, lat_min, lon_max, lat_max) pada skema XYZ Web Mercator"""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y))
+
+
+def tiles_for_bounds(bounds, z):
+    """Semua koordinat (x, y) tile pada zoom z yang memotong bounding box"""
+    lon_min, lat_min, lon_max, lat_max = bounds
+    n = 2 ** z
+
+    def row(lat):
+        lat = max(min(lat, 85.0511), -85.0511)
+        return int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+
+    def col(lon):
+        return int((lon + 180.0) / 360.0 * n)
+
+    x0, x1 = max(col(lon_min), 0), min(col(lon_max), n - 1)
+    y0, y1 = max(row(lat_max), 0), min(row(lat_min), n - 1)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+class TileIndex:
+    """Pemotong tile dari Topology dengan simplifikasi per zoom
+
+    Geometri disederhanakan sekitar setengah piksel pada setiap zoom lalu
+    dipotong ke bounding box tile (Sutherland-Hodgman). Hasil potongan per
+    (z, x, y) disimpan di LRU sehingga nilai choropleth bisa diganti tanpa
+    memotong ulang geometri.
+    """
+
+    def __init__(self, topology, name_property, cache_size=2048):
+        """Initialize dengan topologi dan nama property untuk key local authority"""
+        self.topology = topology
+        self.name_property = name_property
+        self._zoom_levels = {}
+        self.clip = lru_cache(maxsize=cache_size)(self._clip)
+
+    @property
+    def bounds(self):
+        """Bounding box seluruh data (lon_min, lat_min, lon_max, lat_max)"""
+        topology = self.topology
+        if not topology.arcs:
+            return (0.0, 0.0, 0.0, 0.0)
+        points = np.concatenate(topology.arcs) * topology.scale + topology.translate
+        return tuple(points.min(axis=0).tolist() + points.max(axis=0).tolist())
+
+    def render(self, z, x, y, values):
+        """FeatureCollection untuk tile dengan property `value` dari dict nama -> nilai"""
+        return {
+            'type': 'FeatureCollection',
+            'features': [
+                {
+                    'type': 'Feature',
+                    'properties': {self.name_property: name, 'value': values.get(name)},
+                    'geometry': geometry
+                }
+                for name, geometry in self.clip(z, x, y)
+            ]
+        }
+
+    def _level(self, z):
+        """(nama, bbox, feature) hasil simplifikasi untuk zoom z"""
+        if z not in self._zoom_levels:
+            tolerance = 0.5 * 360.0 / (TILE_SIZE * 2 ** z)
+            names, boxes, features = [], [], []
+            for properties, geometry_type, polygons in self.topology.simplified(tolerance).decoded():
+                if geometry_type is None or not polygons:
+                    continue
+                stacked = np.concatenate([polygon[0] for polygon in polygons])
+                names.append(properties.get(self.name_property))
+                boxes.append(np.r_[stacked.min(axis=0), stacked.max(axis=0)])
+                features.append((geometry_type, polygons))
+            self._zoom_levels[z] = (names, np.array(boxes).reshape(-1, 4), features)
+        return self._zoom_levels[z]
+
+    def _clip(self, z, x, y):
+        """Tuple (nama, geometri GeoJSON) feature yang terpotong ke tile"""
+        names, boxes, features = self._level(z)
+        lon_min, lat_min, lon_max, lat_max = tile_bounds(z, x, y)
+        pad_x = (lon_max - lon_min) * TILE_BUFFER / TILE_SIZE
+        pad_y = (lat_max - lat_min) * TILE_BUFFER / TILE_SIZE
+        clip_box = (lon_min - pad_x, lat_min - pad_y, lon_max + pad_x, lat_max + pad_y)
+        decimals = max(0, int(math.ceil(math.log10(TILE_SIZE * 2 ** z / 360.0))) + 1)
+
+        hits = np.flatnonzero(
+            (boxes[:, 0] <= clip_box[2]) & (boxes[:, 2] >= clip_box[0]) &
+            (boxes[:, 1] <= clip_box[3]) & (boxes[:, 3] >= clip_box[1])
+        )
+        result = []
+        for i in hits.tolist():
+            geometry_type, polygons = features[i]
+            clipped = []
+            for polygon in polygons:
+                rings = [clip_ring(ring, clip_box) for ring in polygon]
+                if rings[0] is not None:
+                    clipped.append([ring for ring in rings if ring is not None])
+            if clipped:
+                result.append((names[i], geometry_dict(geometry_type, clipped, decimals)))
+        return tuple(result)
+
+
+def clip_ring(ring, box):
+    """Potong ring tertutup ke persegi (Sutherland-Hodgman), None jika kosong"""
+    points = ring[:-1]
+    for axis, value, keep_greater in ((0, box[0], True), (0, box[2], False),
+                                      (1, box[1], True), (1, box[3], False)):
+        if len(points) == 0:
+            return None
+        points = _clip_edge(points, axis, value, keep_greater)
+    if len(points) < 3:
+        return None
+    return np.concatenate([points, points[:1]])
+
+
+def _clip_edge(points, axis, value, keep_greater):
+    """Satu langkah Sutherland-Hodgman terhadap garis axis == value"""
+    following = np.roll(points, -1, axis=0)
+    if keep_greater:
+        inside, inside_next = points[:, axis] >= value, following[:, axis] >= value
+    else:
+        inside, inside_next = points[:, axis] <= value, following[:, axis] <= value
+    if inside.all():
+        return points
+
+    crossing = inside != inside_next
+    delta = following - points
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(crossing, (value - points[:, axis]) / delta[:, axis], 0.0)
+    intersection = points + t[:, None] * delta
+    intersection[:, axis] = value
+
+    # Untuk setiap sisi (p -> q): titik potong jika menyeberang, lalu q jika di dalam
+    out = np.stack([intersection, following], axis=1)
+    mask = np.stack([crossing, inside_next], axis=1)
+    return out[mask]
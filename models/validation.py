@@ -0,0 +1,329 @@
+"""
+Validation Model
+Validasi integritas CSV dan GeoJSON secara vektor dengan laporan JSON yang bisa dibaca mesin
+"""
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from models.data_index import DataIndex
+
+# Kolom wajib CSV dan jenis nilainya
+SCHEMA = {
+    'local_authority': 'string',
+    'nation': 'string',
+    'year': 'integer',
+    'co_benefit_type': 'string',
+    'value_total': 'number'
+}
+
+# Config.DATA_VALIDATION: 'warn' mencatat temuan, 'strict' menggagalkan load jika ada error
+MODES = ('off', 'warn', 'strict')
+
+# Jumlah contoh maksimum per temuan di laporan
+MAX_EXAMPLES = 20
+
+
+class ValidationReport:
+    """Ringkasan dataset dan daftar temuan validasi
+
+    Setiap temuan berisi nama cek, severity ('error' atau 'warning'), jumlah
+    kasus, pesan dan beberapa contoh (nomor baris CSV, nama area, dll.),
+    sehingga pipeline cukup memeriksa `valid` dan manusia langsung tahu
+    baris mana yang harus diperbaiki.
+    """
+
+    def __init__(self, sources=None):
+        """Laporan kosong; sources = {nama: path} file yang divalidasi"""
+        self.sources = {name: str(path) for name, path in (sources or {}).items()}
+        self.summary = {}
+        self.issues = []
+        self.generated_at = datetime.now(timezone.utc)
+
+    def add(self, check, severity, message, count, examples=()):
+        """Tambah satu temuan (count = jumlah kasus, examples dibatasi MAX_EXAMPLES)"""
+        self.issues.append({
+            'check': check,
+            'severity': severity,
+            'count': int(count),
+            'message': message,
+            'examples': list(examples)[:MAX_EXAMPLES]
+        })
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue['severity'] == 'error']
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue['severity'] == 'warning']
+
+    @property
+    def valid(self):
+        """True jika tidak ada temuan dengan severity error"""
+        return not self.errors
+
+    def to_dict(self):
+        return {
+            'valid': self.valid,
+            'generated_at': self.generated_at.isoformat(),
+            'sources': self.sources,
+            'summary': self.summary,
+            'errors': len(self.errors),
+            'warnings': len(self.warnings),
+            'issues': self.issues
+        }
+
+    def to_json(self):
+        """Laporan sebagai bytes JSON (UTF-8, terindentasi)"""
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def check_schema(frame, report):
+    """Cek kolom wajib, nilai kosong dan tipe data DataFrame CSV mentah (sebelum konversi tipe)"""
+    import pandas as pd
+    report.summary['columns'] = {column: str(dtype) for column, dtype in frame.dtypes.items()}
+    missing = [column for column in SCHEMA if column not in frame.columns]
+    if missing:
+        report.add('schema', 'error', f"Missing columns: {', '.join(missing)}", len(missing), missing)
+        return
+
+    def lines(mask):
+        # Nomor baris file CSV (baris 1 = header)
+        return (np.flatnonzero(mask)[:MAX_EXAMPLES] + 2).tolist()
+
+    for column, kind in SCHEMA.items():
+        values = frame[column]
+        empty = values.isna().to_numpy()
+        if kind == 'string':
+            if empty.any():
+                report.add('null_values', 'error', f"Empty {column}", empty.sum(),
+                           [{'line': line} for line in lines(empty)])
+            continue
+
+        if kind == 'integer' and pd.api.types.is_integer_dtype(values.dtype):
+            continue
+        if kind == 'number' and pd.api.types.is_float_dtype(values.dtype):
+            continue
+        numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+        invalid = np.isnan(numeric) & ~empty
+        if kind == 'integer':
+            # Tahun kosong atau pecahan juga tidak bisa dikonversi ke int
+            with np.errstate(invalid='ignore'):
+                invalid |= empty | (numeric != np.round(numeric))
+        if invalid.any():
+            positions = np.flatnonzero(invalid)[:MAX_EXAMPLES]
+            report.add('dtype', 'error', f"{column} is not {'an integer' if kind == 'integer' else 'numeric'}",
+                       invalid.sum(), [
+                           {'line': int(position) + 2, 'value': str(values.iat[position])}
+                           for position in positions.tolist()
+                       ])
+
+
+def check_index(index, report, value_ranges=None, outlier_iqr=None):
+    """Cek key duplikat, konsistensi nation, cakupan tahun dan rentang nilai DataIndex
+
+    Semua cek dihitung dari array kode index (tanpa loop per baris):
+    value_ranges = {benefit_type: (min, max)} (None = tanpa batas) dan
+    outlier_iqr = kelipatan IQR dari kuartil per benefit_type untuk outlier.
+    """
+    n_la, n_years, n_bt = len(index.local_authorities), len(index.years), len(index.benefit_types)
+    la_codes = index.la_codes.astype(np.int64)
+    year_codes = index.year_codes.astype(np.int64)
+    bt_codes = index.bt_codes.astype(np.int64)
+    values = index.values
+    years = np.asarray(index.years, dtype=np.int64)
+
+    def cell(la, year, bt):
+        return {
+            'local_authority': index.local_authorities[la],
+            'year': index.years[year],
+            'co_benefit_type': index.benefit_types[bt]
+        }
+
+    report.summary.update({
+        'rows': len(index),
+        'local_authorities': n_la,
+        'nations': list(index.nations),
+        'years': {'first': index.years[0], 'last': index.years[-1], 'count': n_years} if n_years else None,
+        'benefit_types': {}
+    })
+    if len(index) == 0:
+        report.add('empty', 'error', 'CSV has no data rows', 0)
+        return
+    for benefit_type in index.benefit_types:
+        rows = values[index.benefit_slice(benefit_type)]
+        finite = rows[np.isfinite(rows)]
+        report.summary['benefit_types'][benefit_type] = {
+            'rows': len(rows),
+            'min': float(finite.min()) if len(finite) else None,
+            'max': float(finite.max()) if len(finite) else None
+        }
+
+    # Key (local_authority, year, co_benefit_type) duplikat: bersebelahan setelah diurutkan
+    keys = (bt_codes * n_years + year_codes) * n_la + la_codes
+    if len(keys) > 1 and not (np.diff(keys) >= 0).all():
+        keys = np.sort(keys)
+    duplicate = np.flatnonzero(np.diff(keys) == 0) + 1
+    if len(duplicate):
+        unique_duplicates = np.unique(keys[duplicate])
+        report.add('duplicate_keys', 'error', 'Duplicate (local_authority, year, co_benefit_type) rows',
+                   len(duplicate), [
+                       cell(key % n_la, key // n_la % n_years, key // n_la // n_years)
+                       for key in unique_duplicates[:MAX_EXAMPLES].tolist()
+                   ])
+
+    # Satu local_authority harus berada di satu nation
+    pairs = np.unique(la_codes * len(index.nations) + index.nation_codes)
+    nations_per_la = np.bincount(pairs // len(index.nations), minlength=n_la)
+    inconsistent = np.flatnonzero(nations_per_la > 1)
+    if len(inconsistent):
+        report.add('inconsistent_nation', 'error', 'local_authority appears under more than one nation',
+                   len(inconsistent), [index.local_authorities[la] for la in inconsistent.tolist()])
+
+    # Cakupan tahun: tahun yang hilang di rentang data, dan deret (la, benefit_type) yang bolong
+    missing_years = np.setdiff1d(np.arange(years[0], years[-1] + 1), years)
+    if len(missing_years):
+        report.add('missing_years', 'warning', 'Years missing between the first and last year',
+                   len(missing_years), missing_years.tolist())
+    present = np.zeros((n_la, n_bt, n_years), dtype=bool)
+    present[la_codes, bt_codes, year_codes] = True
+    coverage = present.sum(axis=2)
+    gaps = np.argwhere((coverage > 0) & (coverage < n_years))
+    if len(gaps):
+        report.add('incomplete_series', 'warning', 'local_authority/co_benefit_type series missing some years',
+                   len(gaps), [
+                       {
+                           'local_authority': index.local_authorities[la],
+                           'co_benefit_type': index.benefit_types[bt],
+                           'missing_years': years[~present[la, bt]].tolist()
+                       }
+                       for la, bt in gaps[:MAX_EXAMPLES].tolist()
+                   ])
+    absent = np.argwhere(coverage == 0)
+    if len(absent):
+        report.add('missing_benefit_type', 'warning', 'local_authority has no rows for a co_benefit_type',
+                   len(absent), [
+                       {'local_authority': index.local_authorities[la], 'co_benefit_type': index.benefit_types[bt]}
+                       for la, bt in absent[:MAX_EXAMPLES].tolist()
+                   ])
+
+    # Rentang nilai
+    def examples(mask):
+        return [
+            dict(cell(la_codes[i], year_codes[i], bt_codes[i]), value_total=float(values[i]))
+            for i in np.flatnonzero(mask)[:MAX_EXAMPLES].tolist()
+        ]
+
+    missing = np.isnan(values)
+    if missing.any():
+        report.add('missing_values', 'warning', 'Empty value_total', missing.sum(), examples(missing))
+    infinite = np.isinf(values)
+    if infinite.any():
+        report.add('non_finite_values', 'error', 'Infinite value_total', infinite.sum(), examples(infinite))
+
+    for benefit_type, (low, high) in (value_ranges or {}).items():
+        b = index.bt_code(benefit_type)
+        if b is None:
+            continue
+        with np.errstate(invalid='ignore'):
+            outside = (bt_codes == b) & (
+                (values < low if low is not None else False) | (values > high if high is not None else False)
+            )
+        if outside.any():
+            report.add('value_range', 'error', f"{benefit_type} value_total outside [{low}, {high}]",
+                       outside.sum(), examples(outside))
+
+    if outlier_iqr:
+        outliers = np.zeros(len(values), dtype=bool)
+        for b in range(n_bt):
+            rows = index.benefit_slice(index.benefit_types[b])
+            finite = values[rows][np.isfinite(values[rows])]
+            if len(finite) == 0:
+                continue
+            q1, q3 = np.percentile(finite, [25, 75])
+            if q3 > q1:
+                spread = outlier_iqr * (q3 - q1)
+                with np.errstate(invalid='ignore'):
+                    outliers[rows] = (values[rows] < q1 - spread) | (values[rows] > q3 + spread)
+        if outliers.any():
+            report.add('outliers', 'warning', f"value_total more than {outlier_iqr} x IQR outside the quartiles",
+                       outliers.sum(), examples(outliers))
+
+
+def check_geojson(geojson, index, matching_property, report):
+    """Cek property nama dan geometri feature GeoJSON, serta join nama ke local_authority CSV"""
+    features = geojson.get('features') or []
+    names = np.array([(feature.get('properties') or {}).get(matching_property) for feature in features], dtype=object)
+    geometry_types = np.array([(feature.get('geometry') or {}).get('type') for feature in features], dtype=object)
+
+    unnamed = np.array([name is None or name == '' for name in names], dtype=bool)
+    if unnamed.any():
+        report.add('geojson_property', 'error', f"Features without property {matching_property}",
+                   unnamed.sum(), [{'feature': i} for i in np.flatnonzero(unnamed)[:MAX_EXAMPLES].tolist()])
+    no_geometry = ~np.isin(geometry_types, ['Polygon', 'MultiPolygon'])
+    if no_geometry.any():
+        report.add('geojson_geometry', 'warning', 'Features without Polygon/MultiPolygon geometry',
+                   no_geometry.sum(), [
+                       {'feature': i, matching_property: names[i]}
+                       for i in np.flatnonzero(no_geometry)[:MAX_EXAMPLES].tolist()
+                   ])
+
+    named = names[~unnamed].astype(str)
+    unique, counts = np.unique(named, return_counts=True)
+    if (counts > 1).any():
+        report.add('geojson_duplicate_names', 'warning', f"{matching_property} shared by several features",
+                   (counts > 1).sum(), unique[counts > 1].tolist())
+
+    csv_names = np.asarray(index.local_authorities, dtype=str)
+    only_csv = np.setdiff1d(csv_names, unique)
+    only_geojson = np.setdiff1d(unique, csv_names)
+    if len(only_csv):
+        report.add('join_missing_geometry', 'warning', 'local_authority without a GeoJSON feature (not shown on the map)',
+                   len(only_csv), only_csv.tolist())
+    if len(only_geojson):
+        report.add('join_missing_data', 'warning', 'GeoJSON features without rows in the CSV',
+                   len(only_geojson), only_geojson.tolist())
+
+    matched = len(csv_names) - len(only_csv)
+    report.summary['geojson'] = {
+        'features': len(features),
+        'matching_property': matching_property,
+        'matched': matched,
+        'match_rate': round(100.0 * matched / len(csv_names), 2) if len(csv_names) else None
+    }
+
+
+def validate_files(csv_file, geojson_file=None, matching_property='local_authority',
+                   value_ranges=None, outlier_iqr=None):
+    """Validasi file CSV (dan GeoJSON jika ada) dalam satu pass; mengembalikan ValidationReport"""
+    import pandas as pd
+    report = ValidationReport({'csv': csv_file, 'geojson': geojson_file})
+    try:
+        frame = pd.read_csv(csv_file)
+    except Exception as e:
+        report.add('read', 'error', f"Error reading CSV: {e}", 1)
+        return report
+    check_schema(frame, report)
+    if not report.valid:
+        return report
+
+    frame['year'] = frame['year'].astype(int)
+    frame['value_total'] = frame['value_total'].astype(float)
+    index = DataIndex.from_frame(frame)
+    check_index(index, report, value_ranges, outlier_iqr)
+
+    if geojson_file is not None:
+        if not Path(geojson_file).exists():
+            report.add('read', 'warning', f"GeoJSON file not found: {geojson_file}", 1)
+            return report
+        try:
+            with open(geojson_file, 'r', encoding='utf-8') as f:
+                geojson = json.load(f)
+        except Exception as e:
+            report.add('read', 'error', f"Error reading GeoJSON: {e}", 1)
+            return report
+        check_geojson(geojson, index, matching_property, report)
+    return report
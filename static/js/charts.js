@@ -15,9 +15,94 @@ let bottomAreasChart = null;
  */
 function initCharts() {
     setupChartEventListeners();
-    loadInitialCorrelation();
-    loadInitialHeatmap();
-    loadTopAreas();
+    loadChartSections(['correlation', 'heatmap', 'areas']);
+}
+
+/**
+ * /api/batch sub-queries for each small chart section, built from the current
+ * filter values. chart needs a selected local authority; areas = top and
+ * bottom areas. The heatmap matrix is fetched separately as typed arrays.
+ */
+const CHART_SECTION_QUERIES = {
+    chart: () => {
+        const localAuthority = document.getElementById('chart-la-select').value;
+        if (!localAuthority) return null;
+        const selectedBenefits = Array.from(document.querySelectorAll('.chart-benefit-checkbox:checked'))
+            .map(cb => cb.value);
+        return {
+            chart: {
+                endpoint: 'chart-data',
+                params: { local_authority: localAuthority, benefit_types: selectedBenefits, format: 'columnar' }
+            }
+        };
+    },
+    correlation: () => {
+        const year = document.getElementById('correlation-year-select').value;
+        return { correlation: { endpoint: 'correlation', params: year ? { year: year } : {} } };
+    },
+    areas: () => {
+        // Top and bottom areas (same year/benefit type rows)
+        const params = { benefit_type: 'air_quality', year: config.currentYear, n: 10, format: 'columnar' };
+        return {
+            top: { endpoint: 'top-areas', params: { ...params, order: 'desc' } },
+            bottom: { endpoint: 'top-areas', params: { ...params, order: 'asc' } }
+        };
+    }
+};
+
+/**
+ * Heatmap query (rows = local authorities, one column per year)
+ */
+function heatmapParams() {
+    return {
+        benefit_type: document.getElementById('heatmap-benefit-select').value,
+        year_start: document.getElementById('heatmap-year-start').value,
+        year_end: document.getElementById('heatmap-year-end').value
+    };
+}
+
+/**
+ * Load chart sections: the small JSON sections in one /api/batch round trip,
+ * in parallel with the heatmap matrix as typed arrays, then render each result
+ */
+async function loadChartSections(sections) {
+    const queries = {};
+    sections.filter(section => section !== 'heatmap')
+        .forEach(section => Object.assign(queries, CHART_SECTION_QUERIES[section]()));
+    const heatmap = sections.includes('heatmap') ? heatmapParams() : null;
+    if (Object.keys(queries).length === 0 && !heatmap) return;
+    
+    try {
+        showLoading();
+        const [results, heatmapResult] = await Promise.all([
+            Object.keys(queries).length > 0 ? fetchBatch(queries) : {},
+            heatmap ? fetchTypedArrays(`/api/heatmap-data?${new URLSearchParams(heatmap)}`) : null
+        ]);
+        
+        if (results.chart && results.chart.success) {
+            const localAuthority = queries.chart.params.local_authority;
+            renderTrendChart(results.chart.data, localAuthority);
+            renderComparisonChart(results.chart.data, localAuthority);
+        }
+        if (results.correlation && results.correlation.success) {
+            renderCorrelationChart(results.correlation.data);
+        }
+        if (heatmapResult && heatmapResult.success) {
+            renderHeatmapChart(heatmapResult.data, heatmap.benefit_type);
+        }
+        if (results.top && results.top.success) {
+            renderTopAreasChart(results.top.data);
+        }
+        if (results.bottom && results.bottom.success) {
+            renderBottomAreasChart(results.bottom.data);
+        }
+        
+        hideLoading();
+    } catch (error) {
+        console.error('Error loading chart data:', error);
+        hideLoading();
+        showError('Error loading chart data.');
+    }
 }
 
 /**
@@ -29,7 +114,7 @@ function setupChartEventListeners() {
     if (laSelect) {
         laSelect.addEventListener('change', function() {
             if (this.value) {
-                loadChartData(this.value);
+                loadChartSections(['chart']);
             }
         });
     }
@@ -37,57 +122,20 @@ function setupChartEventListeners() {
     // Benefit type checkboxes for charts
     document.querySelectorAll('.chart-benefit-checkbox').forEach(checkbox => {
         checkbox.addEventListener('change', function() {
-            const la = document.getElementById('chart-la-select').value;
-            if (la) {
-                loadChartData(la);
-            }
+            loadChartSections(['chart']);
         });
     });
     
     // Correlation update button
     const corrBtn = document.getElementById('update-correlation-btn');
     if (corrBtn) {
-        corrBtn.addEventListener('click', loadInitialCorrelation);
+        corrBtn.addEventListener('click', () => loadChartSections(['correlation']));
     }
     
     // Heatmap update button
     const heatmapBtn = document.getElementById('update-heatmap-btn');
     if (heatmapBtn) {
-        heatmapBtn.addEventListener('click', loadInitialHeatmap);
-    }
-}
-
-/**
- * Load chart data for a specific local authority
- */
-async function loadChartData(localAuthority) {
-    try {
-        showLoading();
-        
-        const selectedBenefits = Array.from(document.querySelectorAll('.chart-benefit-checkbox:checked'))
-            .map(cb => cb.value);
-        
-        const params = new URLSearchParams({
-            local_authority: localAuthority
-        });
-        
-        selectedBenefits.forEach(bt => {
-            params.append('benefit_types', bt);
-        });
-        
-        const response = await fetch(`/api/chart-data?${params}`);
-        const result = await response.json();
-        
-        if (result.success) {
-            renderTrendChart(result.data, localAuthority);
-            renderComparisonChart(result.data, localAuthority);
-        }
-        
-        hideLoading();
-    } catch (error) {
-        console.error('Error loading chart data:', error);
-        hideLoading();
-        showError('Error loading chart data.');
+        heatmapBtn.addEventListener('click', () => loadChartSections(['heatmap']));
     }
 }
 
@@ -102,19 +150,19 @@ function renderTrendChart(data, localAuthority) {
         trendChart.destroy();
     }
     
-    // Prepare data
-    const years = data.map(d => d.year);
+    // Prepare data (columnar: one column per benefit type)
+    const years = getColumn(data, 'year');
     const datasets = [];
     
     // Get benefit types from data
-    const benefitTypes = Object.keys(data[0] || {}).filter(key => key !== 'year');
+    const benefitTypes = data.columns.filter(key => key !== 'year');
     
     benefitTypes.forEach(bt => {
         const btConfig = config.benefitConfigs[bt];
         if (btConfig) {
             datasets.push({
                 label: btConfig.label,
-                data: data.map(d => d[bt] || 0),
+                data: getColumn(data, bt).map(v => v || 0),
                 borderColor: btConfig.color,
                 backgroundColor: btConfig.color + '33',
                 tension: 0.4,
@@ -188,8 +236,10 @@ function renderComparisonChart(data, localAuthority) {
     }
     
     // Get latest year data
-    const latestData = data[data.length - 1] || {};
-    const benefitTypes = Object.keys(latestData).filter(key => key !== 'year');
+    const years = getColumn(data, 'year');
+    const latest = years.length - 1;
+    const latestYear = years[latest];
+    const benefitTypes = latest >= 0 ? data.columns.filter(key => key !== 'year') : [];
     
     const labels = [];
     const values = [];
@@ -199,7 +249,7 @@ function renderComparisonChart(data, localAuthority) {
         const btConfig = config.benefitConfigs[bt];
         if (btConfig) {
             labels.push(btConfig.label);
-            values.push(latestData[bt] || 0);
+            values.push(getColumn(data, bt)[latest] || 0);
             colors.push(btConfig.color);
         }
     });
@@ -222,7 +272,7 @@ function renderComparisonChart(data, localAuthority) {
             plugins: {
                 title: {
                     display: true,
-                    text: `Perbandingan Faktor (${latestData.year}) - ${localAuthority}`,
+                    text: `Perbandingan Faktor (${latestYear}) - ${localAuthority}`,
                     font: {
                         size: 16,
                         weight: 'bold'
@@ -252,31 +302,6 @@ function renderComparisonChart(data, localAuthority) {
     });
 }
 
-/**
- * Load and render correlation matrix
- */
-async function loadInitialCorrelation() {
-    try {
-        showLoading();
-        
-        const year = document.getElementById('correlation-year-select').value;
-        const params = year ? `?year=${year}` : '';
-        
-        const response = await fetch(`/api/correlation${params}`);
-        const result = await response.json();
-        
-        if (result.success) {
-            renderCorrelationChart(result.data);
-        }
-        
-        hideLoading();
-    } catch (error) {
-        console.error('Error loading correlation data:', error);
-        hideLoading();
-        showError('Error loading correlation data.');
-    }
-}
-
 /**
  * Render correlation heatmap chart
  */
@@ -402,38 +427,6 @@ function renderCorrelationChart(correlationData) {
     });
 }
 
-/**
- * Load and render heatmap
- */
-async function loadInitialHeatmap() {
-    try {
-        showLoading();
-        
-        const benefitType = document.getElementById('heatmap-benefit-select').value;
-        const yearStart = document.getElementById('heatmap-year-start').value;
-        const yearEnd = document.getElementById('heatmap-year-end').value;
-        
-        const params = new URLSearchParams({
-            benefit_type: benefitType,
-            year_start: yearStart,
-            year_end: yearEnd
-        });
-        
-        const response = await fetch(`/api/heatmap-data?${params}`);
-        const result = await response.json();
-        
-        if (result.success) {
-            renderHeatmapChart(result.data, benefitType);
-        }
-        
-        hideLoading();
-    } catch (error) {
-        console.error('Error loading heatmap data:', error);
-        hideLoading();
-        showError('Error loading heatmap data.');
-    }
-}
-
 /**
  * Render heatmap chart
  */
@@ -510,34 +503,6 @@ function renderHeatmapChart(data, benefitType) {
     });
 }
 
-/**
- * Load top and bottom areas
- */
-async function loadTopAreas() {
-    try {
-        const benefitType = 'air_quality'; // Default
-        const year = config.currentYear;
-        
-        // Top areas
-        const topResponse = await fetch(`/api/top-areas?benefit_type=${benefitType}&year=${year}&n=10&order=desc`);
-        const topResult = await topResponse.json();
-        
-        // Bottom areas
-        const bottomResponse = await fetch(`/api/top-areas?benefit_type=${benefitType}&year=${year}&n=10&order=asc`);
-        const bottomResult = await bottomResponse.json();
-        
-        if (topResult.success) {
-            renderTopAreasChart(topResult.data);
-        }
-        
-        if (bottomResult.success) {
-            renderBottomAreasChart(bottomResult.data);
-        }
-    } catch (error) {
-        console.error('Error loading top areas:', error);
-    }
-}
-
 /**
  * Render top areas chart
  */
@@ -548,8 +513,8 @@ function renderTopAreasChart(data) {
         topAreasChart.destroy();
     }
     
-    const labels = data.map(d => d.local_authority);
-    const values = data.map(d => d.value_total);
+    const labels = getColumn(data, 'local_authority');
+    const values = getColumn(data, 'value_total');
     
     topAreasChart = new Chart(ctx, {
         type: 'bar',
@@ -598,8 +563,8 @@ function renderBottomAreasChart(data) {
         bottomAreasChart.destroy();
     }
     
-    const labels = data.map(d => d.local_authority);
-    const values = data.map(d => d.value_total);
+    const labels = getColumn(data, 'local_authority');
+    const values = getColumn(data, 'value_total');
     
     bottomAreasChart = new Chart(ctx, {
         type: 'bar',
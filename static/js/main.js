@@ -97,6 +97,87 @@ function formatNumber(num) {
     });
 }
 
+/**
+ * Run several API queries in one request (/api/batch) against one dataset version.
+ * queries: {id: {endpoint, params}}; returns {id: response body} (each with its own success flag).
+ */
+async function fetchBatch(queries) {
+    const response = await fetch('/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            queries: Object.entries(queries).map(([id, query]) => ({ id: id, ...query }))
+        })
+    });
+    const result = await response.json();
+    if (!result.success) {
+        throw new Error(result.error);
+    }
+    return Object.fromEntries(result.results.map(item => [item.id, item.body]));
+}
+
+// Binary response format for columnar API data (see controllers/serialization.py)
+const TYPED_ARRAYS_MIMETYPE = 'application/vnd.cobenefits.typed-arrays';
+
+/**
+ * Get one column from a columnar API response ({columns, data})
+ */
+function getColumn(table, name) {
+    const i = table.columns.indexOf(name);
+    return i >= 0 ? table.data[i] : [];
+}
+
+/**
+ * Fetch an API endpoint in the binary typed-array format (columnar data).
+ * Error responses are still JSON and are returned as-is.
+ */
+async function fetchTypedArrays(url) {
+    const response = await fetch(url, {
+        headers: { Accept: TYPED_ARRAYS_MIMETYPE }
+    });
+    const contentType = response.headers.get('Content-Type') || '';
+    if (!contentType.startsWith(TYPED_ARRAYS_MIMETYPE)) {
+        return response.json();
+    }
+    return decodeTypedArrays(await response.arrayBuffer());
+}
+
+/**
+ * Decode typed-array response: uint32 header length, JSON header, then
+ * 8-byte aligned little-endian buffers referenced as {"$array": i}.
+ * Numeric buffers become typed array views (no copy); 2D arrays become
+ * an array of row views; categorical columns become arrays of strings.
+ */
+function decodeTypedArrays(buffer) {
+    const headerLength = new DataView(buffer).getUint32(0, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)));
+    const base = Math.ceil((4 + headerLength) / 8) * 8;
+    const constructors = { float32: Float32Array, int32: Int32Array, uint8: Uint8Array };
+    
+    const arrays = header.arrays.map(spec => {
+        const size = spec.shape.reduce((a, b) => a * b, 1);
+        const flat = new constructors[spec.dtype](buffer, base + spec.offset, size);
+        if (spec.categories) {
+            return Array.from(flat, code => (code < 0 ? null : spec.categories[code]));
+        }
+        if (spec.shape.length === 2) {
+            const cols = spec.shape[1];
+            return Array.from({ length: spec.shape[0] }, (_, r) => flat.subarray(r * cols, (r + 1) * cols));
+        }
+        return flat;
+    });
+    
+    function resolve(value) {
+        if (Array.isArray(value)) return value.map(resolve);
+        if (value && typeof value === 'object') {
+            if ('$array' in value) return arrays[value.$array];
+            return Object.fromEntries(Object.entries(value).map(([k, v]) => [k, resolve(v)]));
+        }
+        return value;
+    }
+    return resolve(header.payload);
+}
+
 /**
  * Download data as CSV
  */
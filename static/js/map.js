@@ -12,6 +12,13 @@ let legendControl = null;
 let currentPopup = null;
 let geojsonData = null; // Store GeoJSON data for area lookup
 let currentSelectedArea = null; // Track selected area for focus
+let currentMapData = []; // Last values from /api/map-data
+let currentGeometryLevel = null; // Simplification level of geojsonData
+let currentClassBreaks = []; // Class breaks from /api/class-breaks for currentMapData
+let loadedBBoxes = null; // Viewport bboxes [west, south, east, north] in currentMapData, null = all areas
+const geojsonCache = {}; // GeoJSON per simplification level
+const CLASS_BREAKS_METHOD = 'jenks'; // 'jenks' (natural breaks) or 'quantile'
+const VIEWPORT_GRID = 0.5; // Viewport bbox is snapped to this grid (degrees) so responses can be cached
 
 // Factor-specific color schemes
 const factorColorSchemes = {
@@ -69,6 +76,108 @@ function initMap() {
     
     // Setup event listeners
     setupMapEventListeners();
+    
+    // Swap in more detailed boundaries when zooming in
+    map.on('zoomend', refineGeometry);
+    
+    // Zoomed-in views only load values for visible areas; fetch the rest when panning
+    map.on('moveend', loadVisibleMapData);
+}
+
+/**
+ * Pick the simplification level for a zoom level (highest min_zoom <= zoom)
+ */
+function geometryLevelForZoom(zoom) {
+    const levels = (typeof config !== 'undefined' && config.geometryLevels) || {};
+    let best = null;
+    Object.entries(levels).forEach(([level, minZoom]) => {
+        if (minZoom <= zoom && (best === null || minZoom > levels[best])) {
+            best = level;
+        }
+    });
+    return best || 'full';
+}
+
+/**
+ * Load GeoJSON for a simplification level (cached per level)
+ */
+async function loadGeoJSON(level) {
+    if (!geojsonCache[level]) {
+        const version = (typeof config !== 'undefined' && config.dataVersion) || '';
+        const params = new URLSearchParams({ level: level, v: version });
+        const response = await fetch(`/api/geojson?${params}`);
+        geojsonCache[level] = await response.json();
+    }
+    return geojsonCache[level];
+}
+
+/**
+ * Re-render with the geometry level matching the current zoom
+ */
+async function refineGeometry() {
+    const level = geometryLevelForZoom(map.getZoom());
+    if (level === currentGeometryLevel || !geojsonData) return;
+    
+    try {
+        const geojson = await loadGeoJSON(level);
+        currentGeometryLevel = level;
+        geojsonData = geojson;
+        renderMap(geojsonData, currentMapData);
+        if (currentSelectedArea) {
+            focusOnArea(currentSelectedArea, false);
+        }
+    } catch (error) {
+        console.error('Error loading geometry level:', level, error);
+    }
+}
+
+/**
+ * Viewport bbox for /api/map-data when zoomed in (null = load all areas)
+ */
+function viewportBBox() {
+    const minZoom = (typeof config !== 'undefined' && config.viewportMinZoom) || Infinity;
+    if (map.getZoom() < minZoom) return null;
+    
+    const bounds = map.getBounds().pad(0.25);
+    const floor = value => Math.floor(value / VIEWPORT_GRID) * VIEWPORT_GRID;
+    const ceil = value => Math.ceil(value / VIEWPORT_GRID) * VIEWPORT_GRID;
+    return [floor(bounds.getWest()), floor(bounds.getSouth()), ceil(bounds.getEast()), ceil(bounds.getNorth())];
+}
+
+/**
+ * Load values for areas that became visible after panning or zooming out
+ */
+async function loadVisibleMapData() {
+    if (!loadedBBoxes || !geojsonData) return;
+    
+    const bbox = viewportBBox();
+    if (bbox && loadedBBoxes.some(loaded => bbox[0] >= loaded[0] && bbox[1] >= loaded[1] &&
+                                            bbox[2] <= loaded[2] && bbox[3] <= loaded[3])) {
+        return;
+    }
+    
+    const year = currentYear;
+    const benefitType = currentBenefitType;
+    const params = new URLSearchParams({ year: year, benefit_type: benefitType });
+    if (bbox) params.set('bbox', bbox.join(','));
+    
+    try {
+        const result = await fetchTypedArrays(`/api/map-data?${params}`);
+        if (!result.success || year !== currentYear || benefitType !== currentBenefitType) return;
+        
+        const values = {};
+        currentMapData.forEach(item => { values[item.local_authority] = item.value; });
+        const names = getColumn(result.data, 'local_authority');
+        getColumn(result.data, 'value').forEach((value, i) => { values[names[i]] = value; });
+        currentMapData = Object.entries(values).map(([name, value]) => ({ local_authority: name, value: value }));
+        loadedBBoxes = bbox ? [...loadedBBoxes, bbox] : null;
+        renderMap(geojsonData, currentMapData);
+        if (currentSelectedArea) {
+            focusOnArea(currentSelectedArea, false);
+        }
+    } catch (error) {
+        console.error('Error loading visible map data:', error);
+    }
 }
 
 /**
@@ -110,24 +219,35 @@ async function loadMapData() {
     try {
         showLoading();
         
-        // Load GeoJSON
-        const geojsonResponse = await fetch('/api/geojson');
-        geojsonData = await geojsonResponse.json(); // Store for area lookup
+        // Load GeoJSON for the current zoom (versioned URL is cached long-term by the browser)
+        currentGeometryLevel = geometryLevelForZoom(map.getZoom());
+        geojsonData = await loadGeoJSON(currentGeometryLevel); // Store for area lookup
         
         // Populate area dropdown
         populateAreaDropdown(geojsonData);
         
-        // Load map data with selected benefit type
-        const params = new URLSearchParams({
+        // Map values as typed arrays, fetched in parallel with the class breaks
+        // (color scale from the server)
+        const params = {
             year: currentYear,
             benefit_type: currentBenefitType
-        });
-
-        const dataResponse = await fetch(`/api/map-data?${params}`);
-        const result = await dataResponse.json();
+        };
+        const bbox = viewportBBox();
+        const mapParams = new URLSearchParams(params);
+        if (bbox) mapParams.set('bbox', bbox.join(','));
+        const breaksParams = new URLSearchParams({ ...params, method: CLASS_BREAKS_METHOD });
+        const [result, breaks] = await Promise.all([
+            fetchTypedArrays(`/api/map-data?${mapParams}`),
+            fetch(`/api/class-breaks?${breaksParams}`).then(response => response.json())
+        ]);
 
         if (result.success) {
-            renderMap(geojsonData, result.data || []);
+            currentClassBreaks = breaks.success ? breaks.data : [];
+            const names = getColumn(result.data, 'local_authority');
+            const values = getColumn(result.data, 'value');
+            currentMapData = names.map((name, i) => ({ local_authority: name, value: values[i] }));
+            loadedBBoxes = bbox ? [bbox] : null;
+            renderMap(geojsonData, currentMapData);
         }
         
         hideLoading();
@@ -160,39 +280,27 @@ function renderMap(geojson, data) {
     
     // Create data lookup map
     const dataMap = {};
-    let maxValue = -Infinity;
-    let minValue = Infinity;
     
     console.log('Rendering map with data count:', data.length);
     console.log('Current benefit type:', currentBenefitType);
     console.log('Matching property:', matchingProperty);
     
     data.forEach(item => {
-        const key = item.local_authority;
-        dataMap[key] = item.value;
-        
-        if (item.value > maxValue) maxValue = item.value;
-        if (item.value < minValue) minValue = item.value;
+        dataMap[item.local_authority] = item.value;
     });
     
     console.log('Data map keys count:', Object.keys(dataMap).length);
-    console.log('Value range:', { minValue, maxValue });
+    console.log('Class breaks:', currentClassBreaks);
     console.log('Sample data entries:', Object.entries(dataMap).slice(0, 3));
     
-    // Color scale function using factor-specific colors
+    // Use factor-specific color scheme
+    const colorScheme = factorColorSchemes[currentBenefitType] || factorColorSchemes['air_quality'];
+    const colors = colorScheme.colors;
+    
+    // Color scale function: class of the value within the server class breaks
     function getColor(value) {
-        if (value === null || value === undefined) return '#cccccc';
-
-        const normalized = maxValue !== minValue
-            ? (value - minValue) / (maxValue - minValue)
-            : 0.5;
-
-        // Use factor-specific color scheme
-        const colorScheme = factorColorSchemes[currentBenefitType] || factorColorSchemes['air_quality'];
-        const colors = colorScheme.colors;
-
-        const index = Math.min(Math.floor(normalized * colors.length), colors.length - 1);
-        return colors[index];
+        if (value === null || value === undefined || currentClassBreaks.length < 2) return '#cccccc';
+        return classColor(classIndex(value, currentClassBreaks), currentClassBreaks.length - 1, colors);
     }
     
     // Style function
@@ -292,23 +400,42 @@ function renderMap(geojson, data) {
     }).addTo(map);
     
     // Add legend
-    addLegend(minValue, maxValue);
+    addLegend(currentClassBreaks);
+}
+
+/**
+ * Class of a value: first class whose upper break is >= value (binary search)
+ */
+function classIndex(value, breaks) {
+    let low = 1;
+    let high = breaks.length - 1;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (value <= breaks[mid]) {
+            high = mid;
+        } else {
+            low = mid + 1;
+        }
+    }
+    return low - 1;
+}
+
+/**
+ * Colour for a class; fewer classes than colours are spread over the whole scheme
+ */
+function classColor(index, classes, colors) {
+    if (classes >= colors.length || classes < 2) return colors[Math.min(index, colors.length - 1)];
+    return colors[Math.round(index * (colors.length - 1) / (classes - 1))];
 }
 
 /**
  * Add legend to map
  */
-function addLegend(minValue, maxValue) {
+function addLegend(grades) {
     legendControl = L.control({position: 'bottomright'});
     
     legendControl.onAdd = function(map) {
         const div = L.DomUtil.create('div', 'map-legend');
-        const grades = [];
-        const steps = 8;
-        
-        for (let i = 0; i <= steps; i++) {
-            grades.push(minValue + (maxValue - minValue) * i / steps);
-        }
         
         // Get factor-specific colors
         const colorScheme = factorColorSchemes[currentBenefitType] || factorColorSchemes['air_quality'];
@@ -322,7 +449,7 @@ function addLegend(minValue, maxValue) {
         for (let i = 0; i < grades.length - 1; i++) {
             div.innerHTML +=
                 '<div class="legend-item">' +
-                '<i style="background:' + colors[i] + '"></i> ' +
+                '<i style="background:' + classColor(i, grades.length - 1, colors) + '"></i> ' +
                 grades[i].toFixed(2) + ' &ndash; ' + grades[i + 1].toFixed(2) +
                 '</div>';
         }
@@ -354,7 +481,7 @@ function viewAreaDetails(areaName) {
 /**
  * Focus map on selected area
  */
-function focusOnArea(areaName) {
+function focusOnArea(areaName, fit = true) {
     if (!geojsonData || !areaName) return;
 
     // Find the feature for the selected area
@@ -364,8 +491,10 @@ function focusOnArea(areaName) {
 
     if (feature) {
         // Fit map bounds to the selected area
-        const bounds = L.geoJSON(feature).getBounds();
-        map.fitBounds(bounds, { padding: [20, 20] });
+        if (fit) {
+            const bounds = L.geoJSON(feature).getBounds();
+            map.fitBounds(bounds, { padding: [20, 20] });
+        }
 
         // Highlight the selected area (optional visual feedback)
         if (geojsonLayer) {
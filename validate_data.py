@@ -0,0 +1,73 @@
+"""
+Validate Data
+Validasi CSV dan GeoJSON (skema, key duplikat, cakupan tahun, join nama, rentang nilai) dengan laporan JSON
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from models.geojson_blob import write_atomic
+from models.validation import validate_files
+
+parser = argparse.ArgumentParser(description='Validasi data CSV dan GeoJSON, dengan laporan JSON')
+parser.add_argument('--csv', default=str(Config.CSV_FILE))
+parser.add_argument('--geojson', default=str(Config.GEOJSON_FILE))
+parser.add_argument('--output', help="Path laporan JSON ('-' = stdout); default di samping file --csv, "
+                                      "atau Config.VALIDATION_REPORT_FILE untuk CSV dashboard")
+parser.add_argument('--fail-on-warning', action='store_true', help='Exit code 1 juga jika ada warning')
+args = parser.parse_args()
+
+if args.output is None:
+    # Laporan CSV lain tidak boleh menimpa laporan dataset dashboard
+    csv_path = Path(args.csv)
+    if csv_path.resolve() == Path(Config.CSV_FILE).resolve():
+        args.output = str(Config.VALIDATION_REPORT_FILE)
+    else:
+        args.output = str(csv_path.with_name(csv_path.stem + '.validation_report.json'))
+
+report = validate_files(
+    args.csv,
+    args.geojson,
+    Config.MATCHING_PROPERTY,
+    Config.VALIDATION_VALUE_RANGES,
+    Config.VALIDATION_OUTLIER_IQR
+)
+
+if args.output == '-':
+    sys.stdout.buffer.write(report.to_json() + b'\n')
+else:
+    summary = report.summary
+    print("=" * 60)
+    print("VALIDASI DATA")
+    print("=" * 60)
+    if summary.get('years'):
+        years = summary['years']
+        print(f"\n  Baris: {summary['rows']}, local authority: {summary['local_authorities']}, "
+              f"tahun: {years['first']} - {years['last']}")
+        for benefit_type, stats in summary['benefit_types'].items():
+            print(f"  - {benefit_type}: {stats['rows']} baris, nilai {stats['min']} .. {stats['max']}")
+    if 'geojson' in summary:
+        geojson = summary['geojson']
+        print(f"\n  GeoJSON: {geojson['features']} feature, {geojson['matched']} cocok ({geojson['match_rate']}%)")
+    
+    print()
+    for issue in report.issues:
+        mark = '✗' if issue['severity'] == 'error' else '!'
+        print(f"  {mark} [{issue['check']}] {issue['message']}: {issue['count']}")
+        for example in issue['examples'][:3]:
+            print(f"      {example}")
+    if not report.issues:
+        print("  ✓ Tidak ada temuan")
+    
+    path = Path(args.output)
+    if not write_atomic(path, report.to_json()):
+        print(f"\nLaporan tidak bisa ditulis ke {path}")
+        sys.exit(2)
+    print(f"\n{len(report.errors)} error, {len(report.warnings)} warning. Laporan: {path}")
+    print("=" * 60)
+
+sys.exit(1 if report.errors or (args.fail_on_warning and report.warnings) else 0)